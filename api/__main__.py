@@ -0,0 +1,42 @@
+"""헤드리스 API 서버 실행
+
+uvicorn은 requirements.txt에 포함되어 있지 않으므로 API 서버를 띄우는 환경에만
+따로 설치합니다.
+
+    pip install "uvicorn>=0.30"
+    python -m api --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import argparse
+
+try:
+    import uvicorn
+except ImportError:
+    # 설정(.env) 검증보다 먼저 알려 주도록 모듈 로드 시점에 확인
+    raise SystemExit(
+        "API 서버를 실행하려면 uvicorn 패키지가 필요합니다 "
+        '(requirements.txt에 없음): pip install "uvicorn>=0.30"'
+    )
+
+from config.settings import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG 파이프라인 HTTP API")
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--port", type=int, default=settings.API_PORT)
+    parser.add_argument("--workers", type=int, default=settings.API_WORKERS)
+    args = parser.parse_args()
+
+    # 워커 프로세스마다 api.app을 새로 import하여 RAGApp과 커넥션 풀을 따로 생성
+    uvicorn.run(
+        "api.app:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        lifespan="on",
+    )
+
+
+if __name__ == "__main__":
+    main()
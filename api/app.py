@@ -0,0 +1,324 @@
+"""RAG 파이프라인 헤드리스 HTTP API (ASGI)
+
+Streamlit 없이 파이프라인을 HTTP로 제공합니다. 워커 프로세스를 여러 개 띄워
+로드 밸런서 뒤에 둘 수 있으며 워커마다 RAGApp과 커넥션 풀을 따로 가집니다.
+
+공고 선택은 요청마다 bid_notice_no로 보내거나, session_id를 보내 세션
+저장소(core.session)에 둘 수 있습니다. 여러 워커가 세션을 공유하려면
+SESSION_BACKEND를 sqlite(한 호스트) 또는 redis로 설정합니다.
+
+    python -m api --workers 4
+
+엔드포인트
+    GET  /health
+    POST /route           {"query"}                  -> {"db_type"}
+    POST /notices/search  {"query", "limit", "session_id"?}  -> 공고 후보 (hybrid_search)
+    POST /notices/select  {"bid_notice_no" | "index", "session_id"?} -> 공고 정보
+    POST /query           {"query", "bid_notice_no"?, "session_id"?} -> 답변 SSE 스트림
+    POST /sessions/reset  {"session_id"}             -> 공고 선택 초기화
+    GET  /metrics         워커의 단계별 메트릭 (Prometheus 텍스트)
+    GET  /metrics.json    워커의 단계별 메트릭 (JSON)
+
+/query 스트림 이벤트
+    route            {"db_type"}
+    token            {"text"}
+    notice_required  {}  vector 질문인데 선택된 공고가 없음
+    error            {"message"}
+    done             {}
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Optional
+
+from core.metrics import get_metrics
+from core.pipeline import RAGApp
+from core.session import SessionState, get_session_store
+from utils.helpers import start_encoding_load
+
+SSE_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    # 프록시(nginx)가 스트림을 모아서 보내지 않도록
+    (b"x-accel-buffering", b"no"),
+]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    # numpy 스칼라
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_default)
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {dumps(data)}\n\n".encode()
+
+
+def _require(body: dict, key: str) -> str:
+    value = body.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f"'{key}' 값이 필요합니다")
+    return value
+
+
+class RAGAPI:
+    """RAGApp을 감싼 ASGI 애플리케이션"""
+
+    def __init__(self, rag_app: Optional[RAGApp] = None):
+        self.rag_app = rag_app or RAGApp()
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("POST", "/route"): self.route,
+            ("POST", "/notices/search"): self.search_notices,
+            ("POST", "/notices/select"): self.select_notice,
+            ("POST", "/query"): self.query,
+            ("POST", "/sessions/reset"): self.reset_session,
+            ("GET", "/metrics"): self.metrics,
+            ("GET", "/metrics.json"): self.metrics_json,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        try:
+            handler = self.routes.get((scope["method"], scope["path"]))
+            if handler is None:
+                paths = {path for _, path in self.routes}
+                if scope["path"] in paths:
+                    raise HTTPError(405, "허용되지 않는 메서드입니다")
+                raise HTTPError(404, "없는 경로입니다")
+            body = await self._read_json(receive) if scope["method"] == "POST" else {}
+            result = await handler(body)
+        except HTTPError as e:
+            await self._send(send, e.status, dumps({"error": str(e)}).encode())
+            return
+        except Exception as e:
+            logging.exception(f"API 요청 처리 실패: {scope['path']}")
+            await self._send(send, 500, dumps({"error": str(e)}).encode())
+            return
+
+        if inspect.isasyncgen(result):
+            await self._stream(result, receive, send)
+        elif isinstance(result, tuple):
+            content_type, payload = result
+            await self._send(send, 200, payload, content_type)
+        else:
+            await self._send(send, 200, dumps(result).encode())
+
+    # ---- 엔드포인트 ----
+
+    async def health(self, body: dict) -> dict:
+        return {"status": "ok"}
+
+    async def route(self, body: dict) -> dict:
+        return {"db_type": await self.rag_app.router.aroute(_require(body, "query"))}
+
+    async def search_notices(self, body: dict) -> dict:
+        limit = body.get("limit", 5)
+        if not isinstance(limit, int) or not 1 <= limit <= 50:
+            raise HTTPError(400, "'limit'은 1~50 사이의 정수여야 합니다")
+        session = await self._load_session(body)
+        result = await self.rag_app.embedding_manager.ahybrid_search(
+            _require(body, "query"), limit=limit
+        )
+        if session is not None and result["results"]:
+            session.candidates = result["results"]
+            await self._save_session(session)
+        return result
+
+    async def select_notice(self, body: dict) -> dict:
+        session = await self._load_session(body)
+        index = body.get("index")
+        if index is not None:
+            # 세션에 저장된 검색 후보 중에서 선택
+            if session is None or not isinstance(index, int):
+                raise HTTPError(
+                    400, "'index'는 'session_id'와 함께 정수로 보내야 합니다"
+                )
+            if not 0 <= index < len(session.candidates):
+                raise HTTPError(404, f"후보 범위를 벗어났습니다: {index}")
+            notice = session.candidates[index]
+        else:
+            bid_notice_no = _require(body, "bid_notice_no")
+            notice = await self.rag_app.aselect_notice(bid_notice_no)
+            if notice is None:
+                raise HTTPError(404, f"공고를 찾을 수 없습니다: {bid_notice_no}")
+        if session is not None:
+            session.select(notice)
+            await self._save_session(session)
+        return notice
+
+    async def reset_session(self, body: dict) -> dict:
+        _require(body, "session_id")
+        session = await self._load_session(body)
+        session.reset()
+        await self._save_session(session)
+        return {"session_id": session.session_id}
+
+    async def query(self, body: dict) -> AsyncIterator[bytes]:
+        query = _require(body, "query")
+        bid_notice_no = body.get("bid_notice_no") or None
+        if bid_notice_no is not None and not isinstance(bid_notice_no, str):
+            raise HTTPError(400, "'bid_notice_no'는 문자열이어야 합니다")
+        session = await self._load_session(body) or SessionState()
+        if bid_notice_no:
+            # 요청에 공고번호가 있으면 이번 질문에만 적용 (세션에는 저장하지 않음)
+            session.selected_bid_no = bid_notice_no
+        return self._answer_events(query, session)
+
+    async def metrics(self, body: dict) -> tuple[str, bytes]:
+        return (
+            "text/plain; version=0.0.4; charset=utf-8",
+            get_metrics().to_prometheus().encode(),
+        )
+
+    async def metrics_json(self, body: dict) -> dict:
+        return get_metrics().snapshot()
+
+    # ---- 스트리밍 ----
+
+    async def _answer_events(
+        self, query: str, session: SessionState
+    ) -> AsyncIterator[bytes]:
+        with get_metrics().trace():
+            try:
+                stream, db_type = await self.rag_app.aprocess_query(query, session)
+                yield sse_event("route", {"db_type": db_type})
+                if stream is None:
+                    yield sse_event("notice_required", {})
+                else:
+                    async for chunk in stream:
+                        text = getattr(chunk, "content", chunk)
+                        if text:
+                            yield sse_event("token", {"text": str(text)})
+            except Exception as e:
+                logging.exception("질의 처리 실패")
+                yield sse_event("error", {"message": str(e)})
+        yield sse_event("done", {})
+
+    @staticmethod
+    async def _stream(events: AsyncIterator[bytes], receive, send):
+        """SSE 이벤트를 보내고, 클라이언트가 끊으면 답변 생성을 취소합니다."""
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": SSE_HEADERS}
+        )
+
+        async def pump():
+            async for event in events:
+                await send(
+                    {"type": "http.response.body", "body": event, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        pump_task = asyncio.ensure_future(pump())
+        watch_task = asyncio.ensure_future(disconnected())
+        try:
+            await asyncio.wait(
+                {pump_task, watch_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for task in (pump_task, watch_task):
+                task.cancel()
+            await asyncio.gather(pump_task, watch_task, return_exceptions=True)
+        if not pump_task.cancelled():
+            pump_task.result()
+
+    # ---- 세션 ----
+
+    @staticmethod
+    async def _load_session(body: dict) -> Optional[SessionState]:
+        session_id = body.get("session_id")
+        if session_id is None:
+            return None
+        if not isinstance(session_id, str) or not session_id:
+            raise HTTPError(400, "'session_id'는 비어 있지 않은 문자열이어야 합니다")
+        # sqlite/redis 저장소는 블로킹 I/O이므로 스레드에서 실행
+        return await asyncio.to_thread(get_session_store().load, session_id)
+
+    @staticmethod
+    async def _save_session(session: SessionState):
+        await asyncio.to_thread(get_session_store().save, session)
+
+    # ---- ASGI 헬퍼 ----
+
+    @staticmethod
+    async def _read_json(receive) -> dict:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "요청 본문을 받기 전에 연결이 끊어졌습니다")
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        raw = b"".join(chunks)
+        if not raw:
+            return {}
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            raise HTTPError(400, "요청 본문이 올바른 JSON이 아닙니다")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "요청 본문은 JSON 객체여야 합니다")
+        return body
+
+    @staticmethod
+    async def _send(
+        send,
+        status: int,
+        payload: bytes,
+        content_type: str = "application/json; charset=utf-8",
+    ):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", content_type.encode()),
+                    (b"content-length", str(len(payload)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # 첫 요청이 토큰 수 근사치를 쓰는 시간을 줄이도록 미리 로드
+                start_encoding_load()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+app = RAGAPI()
@@ -0,0 +1,117 @@
+"""헤드리스 API(api.app)를 호출하는 RAGApp 대체 클라이언트
+
+Streamlit UI는 RAG_API_URL이 설정되어 있으면 RAGApp 대신 이 클라이언트를
+사용하므로, 파이프라인은 API 워커에서만 실행되고 UI 프로세스는 화면만 그립니다.
+"""
+
+import json
+from typing import Iterator, Optional
+
+import httpx
+
+from config.settings import settings
+from core.exceptions import APIError
+from core.session import SessionState
+
+
+def parse_sse(lines: Iterator[str]) -> Iterator[tuple[str, dict]]:
+    """SSE 줄 스트림을 (이벤트 이름, 데이터) 쌍으로 변환합니다."""
+    event, data = "message", []
+    for line in lines:
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip())
+
+
+class RAGClient:
+    """RAGApp.process_query와 EmbeddingManager.hybrid_search의 HTTP 버전"""
+
+    def __init__(self, base_url: str, timeout: Optional[float] = None):
+        self.http = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            timeout=settings.RAG_API_TIMEOUT if timeout is None else timeout,
+        )
+
+    @property
+    def embedding_manager(self) -> "RAGClient":
+        """NamespaceFinder가 hybrid_search를 호출할 대상"""
+        return self
+
+    def _request(self, method: str, path: str, payload: dict = None):
+        try:
+            response = self.http.request(method, path, json=payload)
+        except httpx.HTTPError as e:
+            raise APIError(f"API 호출 실패 ({path}): {e}") from e
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("error", response.text)
+            except ValueError:
+                message = response.text
+            raise APIError(f"API 오류 {response.status_code} ({path}): {message}")
+        return response.json()
+
+    def route(self, query: str) -> str:
+        return self._request("POST", "/route", {"query": query})["db_type"]
+
+    def hybrid_search(self, query: str, limit: int = 5) -> dict:
+        try:
+            return self._request(
+                "POST", "/notices/search", {"query": query, "limit": limit}
+            )
+        except APIError as e:
+            print(f"검색 중 오류 발생: {str(e)}")
+            return {"results": [], "keywords": [], "error": str(e)}
+
+    def select_notice(self, bid_notice_no: str) -> dict:
+        return self._request(
+            "POST", "/notices/select", {"bid_notice_no": bid_notice_no}
+        )
+
+    def metrics_snapshot(self) -> dict:
+        return self._request("GET", "/metrics.json")
+
+    def _events(self, payload: dict) -> Iterator[tuple[str, dict]]:
+        try:
+            with self.http.stream("POST", "/query", json=payload) as response:
+                if response.status_code >= 400:
+                    response.read()
+                    raise APIError(
+                        f"API 오류 {response.status_code} (/query): {response.text}"
+                    )
+                for event, data in parse_sse(response.iter_lines()):
+                    if event == "error":
+                        raise APIError(data["message"])
+                    if event == "done":
+                        return
+                    yield event, data
+        except httpx.HTTPError as e:
+            raise APIError(f"API 호출 실패 (/query): {e}") from e
+
+    def process_query(self, query: str, session: Optional[SessionState] = None):
+        """RAGApp.process_query와 같은 (응답 텍스트 스트림, db_type)을 반환합니다.
+
+        세션은 UI 프로세스에 있으므로 선택된 공고번호만 요청에 담아 보냅니다.
+        """
+        bid_notice_no = session.selected_bid_no if session else None
+        events = self._events({"query": query, "bid_notice_no": bid_notice_no})
+        event, data = next(events, ("done", {}))
+        if event != "route":
+            events.close()
+            raise APIError(f"예상하지 못한 응답 이벤트: {event}")
+        db_type = data["db_type"]
+
+        def tokens():
+            for event, data in events:
+                if event == "token":
+                    yield data["text"]
+
+        # 공고가 필요한 vector 질문이면 스트림 없이 반환
+        if db_type != "rdb" and not bid_notice_no:
+            events.close()
+            return None, db_type
+        return tokens(), db_type
@@ -0,0 +1,354 @@
+"""EmbeddingManager.hybrid_search EXPLAIN ANALYZE 벤치마크
+
+로컬 Postgres/pgvector에 합성 공고 데이터를 규모별 스키마(bench_10000 등)로
+적재한 뒤, 변경 전 쿼리와 인덱스 친화적으로 재작성한 쿼리를 인덱스 적용
+전후로 EXPLAIN (ANALYZE, BUFFERS) 하여 실행 시간 중앙값과 최상위 플랜 노드를
+비교합니다. 재작성한 쿼리(HNSW 인덱스 스캔 포함)가 변경 전 쿼리와 같은 행을
+반환하는지도 확인하며, 다르면 실패로 종료합니다.
+
+    python -m benchmarks.bench_hybrid_search \\
+        --dsn postgresql://postgres@localhost/bench --rows 10000 100000 1000000
+
+데이터는 서버 측 generate_series로 생성하며, 같은 규모의 스키마가 이미 있으면
+재사용합니다 (--reload로 다시 생성).
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Optional
+
+import psycopg2
+
+from core.migrations import MIGRATIONS
+from config.settings import settings
+from utils.embedding_utils import HYBRID_SEARCH_QUERY, HYBRID_SEARCH_SETTINGS
+
+# 변경 전 쿼리 (비교용)
+LEGACY_HYBRID_SEARCH_QUERY = """
+    WITH vector_matches AS (
+        SELECT
+            nb.*,
+            (content_embedding <#> %(embedding)s::vector) * -1 + 1 as vector_similarity
+        FROM naramarket_bids nb
+        WHERE
+            bid_notice_nm ILIKE ANY(%(patterns)s)
+            OR ntce_kind_nm ILIKE ANY(%(patterns)s)
+            OR dminstt_nm ILIKE ANY(%(patterns)s)
+            OR pub_prcrmnt_clsfc_nm ILIKE ANY(%(patterns)s)
+    )
+    SELECT
+        id,
+        bid_notice_no,
+        bid_notice_nm,
+        ntce_kind_nm,
+        dminstt_nm,
+        pub_prcrmnt_clsfc_nm,
+        vector_similarity as score
+    FROM vector_matches
+    WHERE vector_similarity > 0.6
+    ORDER BY vector_similarity DESC
+    LIMIT %(limit)s
+"""
+
+TITLE_WORDS = [
+    "정보시스템",
+    "유지보수",
+    "구축",
+    "고도화",
+    "클라우드",
+    "전환",
+    "홈페이지",
+    "개편",
+    "데이터베이스",
+    "보안",
+    "관제",
+    "네트워크",
+    "장비",
+    "구매",
+    "통합",
+    "플랫폼",
+    "인공지능",
+    "컨설팅",
+    "청사",
+    "시설",
+    "공사",
+    "청소",
+    "용역",
+    "교육",
+    "운영",
+]
+KIND_WORDS = ["일반", "긴급", "재공고", "변경", "취소"]
+INSTT_WORDS = [
+    "조달청",
+    "행정안전부",
+    "국토교통부",
+    "서울특별시",
+    "부산광역시",
+    "한국전력공사",
+    "국민건강보험공단",
+    "한국도로공사",
+]
+CLSFC_WORDS = [
+    "소프트웨어개발",
+    "정보시스템유지관리",
+    "건축공사",
+    "시설관리",
+    "학술연구",
+    "물품구매",
+]
+
+
+def _sql_pick(words: list[str]) -> str:
+    """서버 측에서 단어 하나를 무작위로 고르는 SQL 식"""
+    array = ",".join(f"'{word}'" for word in words)
+    return f"(ARRAY[{array}])[1 + floor(random() * {len(words)})::int]"
+
+
+def load(conn, schema: str, rows: int, dim: int, reload: bool = False):
+    """합성 공고 데이터를 적재합니다."""
+    with conn.cursor() as cur:
+        if not reload:
+            cur.execute(
+                "SELECT to_regclass(%s) IS NOT NULL", (f"{schema}.naramarket_bids",)
+            )
+            if cur.fetchone()[0]:
+                cur.execute(f"SELECT count(*) FROM {schema}.naramarket_bids")
+                if cur.fetchone()[0] == rows:
+                    print(f"{schema}: 기존 데이터 재사용")
+                    return
+
+        started = time.perf_counter()
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cur.execute(f"CREATE SCHEMA {schema}")
+        cur.execute(
+            f"""
+            CREATE TABLE {schema}.naramarket_bids (
+                id BIGSERIAL PRIMARY KEY,
+                bid_notice_no TEXT NOT NULL,
+                bid_notice_nm TEXT,
+                ntce_kind_nm TEXT,
+                dminstt_nm TEXT,
+                pub_prcrmnt_clsfc_nm TEXT,
+                content_embedding vector({dim})
+            )
+            """
+        )
+        title = " || ' ' || ".join([_sql_pick(TITLE_WORDS)] * 3)
+        # 내적 검색이 의미 있도록 단위 벡터로 정규화
+        cur.execute(
+            f"""
+            INSERT INTO {schema}.naramarket_bids (
+                bid_notice_no, bid_notice_nm, ntce_kind_nm, dminstt_nm,
+                pub_prcrmnt_clsfc_nm, content_embedding
+            )
+            SELECT
+                'R' || lpad(g::text, 11, '0'),
+                {title},
+                {_sql_pick(KIND_WORDS)},
+                {_sql_pick(INSTT_WORDS)},
+                {_sql_pick(CLSFC_WORDS)},
+                (
+                    SELECT array_agg(v / norm)::vector
+                    FROM (
+                        SELECT v, sqrt(sum(v * v) OVER ()) AS norm
+                        FROM (
+                            SELECT random() - 0.5 + g * 0 AS v
+                            FROM generate_series(1, {dim})
+                        ) r
+                    ) n
+                )
+            FROM generate_series(1, %s) g
+            """,
+            (rows,),
+        )
+        cur.execute(f"ANALYZE {schema}.naramarket_bids")
+        print(f"{schema}: {rows:,}행 적재 {time.perf_counter() - started:.1f}s")
+
+
+def create_indexes(conn, schema: str):
+    """core.migrations의 인덱스 정의를 벤치마크 스키마에 적용합니다."""
+    with conn.cursor() as cur:
+        cur.execute(f"SET search_path TO {schema}, public")
+        for migration in MIGRATIONS:
+            for statement in migration.statements:
+                if statement.startswith("CREATE EXTENSION"):
+                    continue
+                started = time.perf_counter()
+                cur.execute(statement)
+                print(f"  {statement[:70]}... {time.perf_counter() - started:.1f}s")
+        cur.execute("ANALYZE naramarket_bids")
+
+
+def drop_indexes(conn, schema: str):
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT indexname FROM pg_indexes
+            WHERE schemaname = %s AND indexname NOT LIKE '%%_pkey'
+            """,
+            (schema,),
+        )
+        for (index,) in cur.fetchall():
+            cur.execute(f"DROP INDEX {schema}.{index}")
+
+
+def _run(cur, query: str, params: dict, setup: Optional[str]) -> list:
+    """setup(세션 설정)과 query를 한 트랜잭션에서 실행하고 결과 행을 반환합니다."""
+    cur.execute("BEGIN")
+    try:
+        if setup:
+            cur.execute(setup, params)
+        cur.execute(query, params)
+        return cur.fetchall()
+    finally:
+        cur.execute("ROLLBACK")
+
+
+def explain(
+    conn, schema: str, query: str, params: dict, repeat: int, setup=None
+) -> dict:
+    """EXPLAIN ANALYZE를 반복 실행하여 실행 시간 중앙값과 플랜 요약을 반환합니다."""
+    timings = []
+    plan = None
+    with conn.cursor() as cur:
+        cur.execute(f"SET search_path TO {schema}, public")
+        for _ in range(repeat):
+            result = _run(
+                cur, "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, params, setup
+            )[0][0]
+            result = json.loads(result) if isinstance(result, str) else result
+            plan = result[0]
+            timings.append(plan["Execution Time"])
+    return {
+        "median_ms": statistics.median(timings),
+        "node": _summarize(plan["Plan"]),
+    }
+
+
+def _summarize(node: dict) -> str:
+    """인덱스 사용 여부를 알 수 있도록 스캔 노드 이름을 모읍니다."""
+    scans = []
+
+    def walk(n):
+        if "Scan" in n["Node Type"]:
+            name = n["Node Type"]
+            if n.get("Index Name"):
+                name += f"({n['Index Name']})"
+            scans.append(name)
+        for child in n.get("Plans", ()):
+            walk(child)
+
+    walk(node)
+    return f"{node['Node Type']}: " + ", ".join(dict.fromkeys(scans))
+
+
+def fetch_ids(conn, schema: str, query: str, params: dict, setup=None) -> list:
+    with conn.cursor() as cur:
+        cur.execute(f"SET search_path TO {schema}, public")
+        return [row[0] for row in _run(cur, query, params, setup)]
+
+
+def _params(conn, schema: str, keywords: list[str], limit: int) -> dict:
+    """키워드에 맞는 공고 하나의 임베딩에 잡음을 더해 질문 임베딩으로 사용합니다.
+
+    무작위 벡터는 유사도 조건(> 0.6)을 만족하는 행이 없어 결과 비교가 의미 없으므로
+    실제 행 근처의 벡터로 검색합니다.
+    """
+    patterns = [f"%{keyword}%" for keyword in keywords]
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT content_embedding::text FROM {schema}.naramarket_bids
+            WHERE bid_notice_nm ILIKE ANY(%s)
+            ORDER BY random() LIMIT 1
+            """,
+            (patterns,),
+        )
+        base = json.loads(cur.fetchone()[0])
+    vector = [v + random.gauss(0, 0.5 / len(base) ** 0.5) for v in base]
+    norm = sum(v * v for v in vector) ** 0.5
+    return {
+        "embedding": [v / norm for v in vector],
+        "patterns": patterns,
+        "limit": limit,
+        "ef_search": str(max(settings.HYBRID_SEARCH_EF_SEARCH, limit)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="hybrid_search EXPLAIN 벤치마크")
+    parser.add_argument("--dsn", default="postgresql://postgres@localhost/bench")
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument(
+        "--keywords", nargs="+", default=["정보시스템", "유지보수", "조달청"]
+    )
+    parser.add_argument("--reload", action="store_true")
+    args = parser.parse_args()
+
+    random.seed(0)
+    conn = psycopg2.connect(args.dsn)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("SET statement_timeout = 0")
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    queries = {
+        "legacy": (LEGACY_HYBRID_SEARCH_QUERY, None),
+        "rewritten": (HYBRID_SEARCH_QUERY, HYBRID_SEARCH_SETTINGS),
+    }
+    report = []
+    mismatches = []
+    try:
+        for rows in args.rows:
+            schema = f"bench_{rows}"
+            load(conn, schema, rows, args.dim, reload=args.reload)
+            params = _params(conn, schema, args.keywords, args.limit)
+            drop_indexes(conn, schema)
+            for indexed in (False, True):
+                if indexed:
+                    create_indexes(conn, schema)
+                ids = {
+                    name: fetch_ids(conn, schema, query, params, setup)
+                    for name, (query, setup) in queries.items()
+                }
+                if ids["rewritten"] != ids["legacy"]:
+                    mismatches.append((rows, indexed, ids))
+                for name, (query, setup) in queries.items():
+                    result = explain(conn, schema, query, params, args.repeat, setup)
+                    result["rows"] = len(ids[name])
+                    report.append((rows, indexed, name, result))
+                    print(
+                        f"{rows:>9,} | {'indexes' if indexed else 'no index':<8} | "
+                        f"{name:<9} | {result['median_ms']:>10.2f} ms | "
+                        f"{result['rows']}행 | {result['node']}"
+                    )
+    finally:
+        conn.close()
+
+    print("\n행 수 | 인덱스 | 쿼리 | 실행 시간 중앙값")
+    for rows, indexed, name, result in report:
+        print(
+            f"{rows:,} | {'O' if indexed else 'X'} | {name} | "
+            f"{result['median_ms']:.2f} ms"
+        )
+
+    for rows, indexed, ids in mismatches:
+        print(
+            f"결과 불일치 - {rows:,}행, 인덱스 {'O' if indexed else 'X'}: "
+            f"legacy {ids['legacy']} / rewritten {ids['rewritten']}"
+        )
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
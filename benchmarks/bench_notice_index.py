@@ -0,0 +1,133 @@
+"""NoticeIndex 후보 검색 지연 시간 벤치마크
+
+합성 공고를 임시 디렉터리의 인덱스에 적재한 뒤, 키워드 필터 + 내적 정렬
+결과가 단순 구현(부분 문자열 검사 + 전체 내적)과 같은지 확인하고 검색 지연
+시간을 측정합니다. 기본 행 수는 델타 역색인을 CSR로 합치는 기준(10만 행)을
+넘겨, 합친 뒤에도 색인과 검색 결과가 유지되는지 함께 확인합니다.
+
+    python -m benchmarks.bench_notice_index --rows 150000 --dim 1536 --ivf 256
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_hybrid_search import (
+    CLSFC_WORDS,
+    INSTT_WORDS,
+    KIND_WORDS,
+    TITLE_WORDS,
+)
+from utils.notice_index import SEARCH_FIELDS, NoticeIndex
+
+
+def synthetic_rows(count: int, dim: int, start_id: int = 1, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    picker = random.Random(seed)
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [
+        {
+            "id": start_id + i,
+            "bid_notice_no": f"R{start_id + i:011d}",
+            "bid_notice_nm": " ".join(picker.choices(TITLE_WORDS, k=3)),
+            "ntce_kind_nm": picker.choice(KIND_WORDS),
+            "dminstt_nm": picker.choice(INSTT_WORDS),
+            "pub_prcrmnt_clsfc_nm": picker.choice(CLSFC_WORDS),
+            "content_embedding": vectors[i],
+        }
+        for i in range(count)
+    ]
+
+
+def reference_search(rows, keywords, query, limit, min_score=0.6):
+    """HYBRID_SEARCH_QUERY의 단순 구현 (비교용)"""
+    matches = []
+    for row in rows:
+        if any(
+            keyword.lower() in (row[field] or "").lower()
+            for keyword in keywords
+            for field in SEARCH_FIELDS
+        ):
+            score = float(np.dot(row["content_embedding"], query)) + 1.0
+            if score > min_score:
+                matches.append((score, row["id"]))
+    matches.sort(reverse=True)
+    return [row_id for _, row_id in matches[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NoticeIndex 검색 벤치마크")
+    parser.add_argument("--rows", type=int, default=150_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--ivf", type=int, default=0, help="IVF 리스트 수 (0: 미사용)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        index = NoticeIndex(path, dim=args.dim)
+        rows = []
+        started = time.perf_counter()
+        for start in range(0, args.rows, 10_000):
+            batch = synthetic_rows(
+                min(10_000, args.rows - start), args.dim, start + 1, seed=start
+            )
+            index.append(batch)
+            rows.extend(batch)
+        print(f"적재 {args.rows:,}행: {time.perf_counter() - started:.1f}s")
+
+        if args.ivf:
+            started = time.perf_counter()
+            index.build_ivf(args.ivf)
+            print(f"IVF {args.ivf}: {time.perf_counter() - started:.1f}s")
+
+        # 다른 워커 프로세스처럼 디스크에서 새로 여는 경우
+        started = time.perf_counter()
+        reader = NoticeIndex(path, dim=args.dim)
+        reader.refresh(force=True)
+        print(f"인덱스 열기 (역색인 구축): {time.perf_counter() - started:.2f}s")
+
+        picker = random.Random(1)
+        rng = np.random.default_rng(1)
+        words = TITLE_WORDS + INSTT_WORDS + CLSFC_WORDS
+        timings = []
+        checked = mismatches = 0
+        for i in range(args.queries):
+            keywords = [
+                word[: picker.randint(2, len(word))] for word in picker.sample(words, 2)
+            ]
+            query = rng.standard_normal(args.dim).astype(np.float32)
+            query /= np.linalg.norm(query)
+            # 무작위 질의는 유사도 0.6을 넘기 어려우므로 기존 행 근처로 이동
+            query = query * 0.3 + rows[picker.randrange(len(rows))]["content_embedding"]
+            query /= np.linalg.norm(query)
+
+            started = time.perf_counter()
+            results = reader.search(keywords, query, limit=args.limit)
+            timings.append((time.perf_counter() - started) * 1000)
+
+            if not args.ivf and i < 20:
+                checked += 1
+                expected = reference_search(rows, keywords, query, args.limit)
+                if [r["id"] for r in results] != expected:
+                    mismatches += 1
+
+        timings.sort()
+        print(
+            f"검색 {args.queries}회: p50 {statistics.median(timings):.2f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms, "
+            f"max {timings[-1]:.2f} ms"
+        )
+        if checked:
+            print(f"단순 구현과 결과 비교: {checked - mismatches}/{checked} 일치")
+            if mismatches:
+                raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
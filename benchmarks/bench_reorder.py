@@ -0,0 +1,126 @@
+"""DiversityReorder MMR 마이크로 벤치마크
+
+기존 순수 파이썬 구현과 NumPy 구현을 같은 입력으로 비교합니다.
+
+    python -m benchmarks.bench_reorder --candidates 100 --top-k 10
+"""
+
+import argparse
+import random
+import time
+
+from models.schema import QueryResult
+from postprocessors.reorder import DiversityReorder
+
+WORDS = [
+    "입찰",
+    "공고",
+    "용역",
+    "구축",
+    "시스템",
+    "유지보수",
+    "소프트웨어",
+    "정보화",
+    "사업",
+    "평가",
+    "기준",
+    "자격",
+    "요건",
+    "제안서",
+    "기술",
+    "규격",
+    "계약",
+    "가격",
+    "협상",
+    "서버",
+    "네트워크",
+    "보안",
+    "데이터",
+    "클라우드",
+]
+
+
+def legacy_mmr_selection(results, diversity_threshold):
+    """변경 전 구현 (비교용)"""
+
+    def similarity(doc1, doc2):
+        return len(set(doc1.content.split()) & set(doc2.content.split())) / len(
+            set(doc1.content.split()) | set(doc2.content.split())
+        )
+
+    selected = []
+    remaining = list(range(len(results)))
+
+    while remaining:
+        if not selected:
+            best_idx = max(remaining, key=lambda i: results[i].score)
+        else:
+            scores = []
+            for i in remaining:
+                relevance = results[i].score
+                diversity = max(similarity(results[i], results[j]) for j in selected)
+                mmr = relevance - diversity_threshold * diversity
+                scores.append((i, mmr))
+            best_idx = max(scores, key=lambda x: x[1])[0]
+
+        selected.append(best_idx)
+        remaining.remove(best_idx)
+
+    return selected
+
+
+def make_results(n: int, words_per_doc: int, seed: int = 0) -> list[QueryResult]:
+    rng = random.Random(seed)
+    vocabulary = WORDS + [f"항목{i}" for i in range(500)]
+    return [
+        QueryResult(
+            content=" ".join(rng.choices(vocabulary, k=words_per_doc)),
+            metadata={"id": i},
+            score=rng.random(),
+        )
+        for i in range(n)
+    ]
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MMR 재정렬 벤치마크")
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--words", type=int, default=120)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = make_results(args.candidates, args.words)
+    reorder = DiversityReorder()
+
+    legacy = legacy_mmr_selection(results, reorder.diversity_threshold)
+    current = reorder._mmr_selection(results)
+    assert legacy == current, "NumPy 구현의 선택 순서가 기존 구현과 다릅니다."
+
+    legacy_time = timeit(
+        lambda: legacy_mmr_selection(results, reorder.diversity_threshold),
+        args.repeat,
+    )
+    full_time = timeit(lambda: reorder._mmr_selection(results), args.repeat)
+    top_k_time = timeit(
+        lambda: reorder._mmr_selection(results, args.top_k), args.repeat
+    )
+
+    print(f"후보 수: {args.candidates}, 문서당 단어 수: {args.words}")
+    print(f"기존 구현:          {legacy_time * 1000:9.2f} ms")
+    print(f"NumPy (전체 정렬):  {full_time * 1000:9.2f} ms")
+    print(f"NumPy (top_k={args.top_k:<3}): {top_k_time * 1000:9.2f} ms")
+    print(f"속도 향상: {legacy_time / full_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
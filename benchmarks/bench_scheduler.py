@@ -0,0 +1,94 @@
+"""스케줄러 우선순위 효과 측정
+
+OpenAI RPM을 작게 잡고 임베딩 백필이 한도를 채우고 있는 동안 사용자 질문을
+보내, 우선순위 없이(모두 default, 도착 순서대로) 한도를 나눠 쓸 때와 백필은
+background, 질문은 interactive로 보낼 때의 질문 대기 시간과 대기열 길이를
+비교합니다.
+
+    python -m benchmarks.bench_scheduler --rpm 600 --backfill 200 --users 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+# 오프라인 환경 변수 설정 (import 시 설정되므로 config.settings보다 먼저)
+import benchmarks.run  # noqa: F401
+from benchmarks.harness import percentile
+from config.settings import settings
+
+
+async def _backfill(embeddings, batches: int):
+    for i in range(batches):
+        await embeddings.aembed_documents([f"공고 본문 {i}"])
+
+
+async def _ask(embeddings, i: int) -> float:
+    started = time.perf_counter()
+    await embeddings.aembed_query(f"사용자 질문 {i}")
+    return time.perf_counter() - started
+
+
+async def run(args, enabled: bool) -> tuple[list[float], int]:
+    from benchmarks.fakes import FakeEmbeddings
+    from core.scheduler import ProviderQueue, get_scheduler
+    from utils.embedding_cache import ScheduledEmbeddings
+
+    settings.SCHEDULER_ENABLED = True
+    # 실행마다 빈 버킷과 대기열로 시작
+    queue = get_scheduler().queues["openai"] = ProviderQueue(
+        "openai", args.rpm, 0, settings.SCHEDULER_BURST_SECONDS, max_wait=600
+    )
+    fake = FakeEmbeddings(latency=args.latency)
+    background = ScheduledEmbeddings(
+        fake, priority="background" if enabled else "default"
+    )
+    interactive = ScheduledEmbeddings(
+        fake, priority="interactive" if enabled else "default"
+    )
+
+    backfill = [
+        asyncio.create_task(_backfill(background, args.backfill // args.workers))
+        for _ in range(args.workers)
+    ]
+    await asyncio.sleep(args.delay)
+    depth = queue.depth
+    samples = []
+    for i in range(args.users):
+        samples.append(await _ask(interactive, i))
+        await asyncio.sleep(args.interval)
+    for task in backfill:
+        task.cancel()
+    await asyncio.gather(*backfill, return_exceptions=True)
+    return samples, depth
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스케줄러 우선순위 벤치마크")
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--backfill", type=int, default=400, help="백필 배치 수")
+    parser.add_argument("--workers", type=int, default=8, help="백필 동시 실행 수")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--delay", type=float, default=0.5, help="백필 시작 후 대기")
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(
+        f"RPM {args.rpm}, 백필 {args.backfill}배치 x 동시 {args.workers}, "
+        f"사용자 질문 {args.users}건\n"
+        f"{'우선순위':<10} {'대기열':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"
+    )
+    for enabled in (False, True):
+        samples, depth = asyncio.run(run(args, enabled))
+        print(
+            f"{'on' if enabled else 'off':<10} {depth:>6} "
+            f"{statistics.median(samples) * 1000:>9.1f} "
+            f"{percentile(samples, 95) * 1000:>9.1f} "
+            f"{max(samples) * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
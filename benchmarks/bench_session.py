@@ -0,0 +1,94 @@
+"""세션 저장소 백엔드별 지연 시간 벤치마크
+
+질문 한 번에 해당하는 load + save 왕복을 백엔드별로 측정합니다. redis는
+benchmarks.fakes.FakeRedisServer(로컬 RESP 서버)를 사용하며,
+BENCH_REDIS_URL이 있으면 그 서버를 사용합니다.
+
+    python -m benchmarks.bench_session --sessions 2000 --candidates 5
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from contextlib import nullcontext
+
+from benchmarks.fakes import FakeRedisServer
+from benchmarks.harness import percentile
+from core.session import (
+    MemorySessionStore,
+    RedisSessionStore,
+    SessionState,
+    SessionStore,
+    SQLiteSessionStore,
+)
+
+
+def make_candidates(count: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "bid_notice_no": f"R24BK{i:08d}",
+            "bid_notice_nm": f"정보시스템 유지보수 용역 {i}",
+            "ntce_kind_nm": "일반",
+            "dminstt_nm": "조달청",
+            "pub_prcrmnt_clsfc_nm": "소프트웨어 유지 및 지원 서비스",
+            "score": 0.8,
+        }
+        for i in range(count)
+    ]
+
+
+def measure(store: SessionStore, sessions: int, candidates: list[dict]) -> list[float]:
+    """세션마다 load -> 후보 저장 -> save -> load 한 번의 소요 시간"""
+    samples = []
+    for i in range(sessions):
+        started = time.perf_counter()
+        session = store.load(f"bench-{i}")
+        session.candidates = candidates
+        session.select(candidates[0])
+        store.save(session)
+        assert store.load(session.session_id).selected_bid_no == session.selected_bid_no
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="세션 저장소 벤치마크")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--candidates", type=int, default=5)
+    parser.add_argument("--ttl", type=float, default=3600)
+    args = parser.parse_args()
+
+    candidates = make_candidates(args.candidates)
+    size = len(SessionState(candidates=candidates).to_json().encode())
+    print(f"세션 크기 {size} bytes, 세션 {args.sessions}개")
+    print(f"{'backend':<10} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+
+    external = os.environ.get("BENCH_REDIS_URL")
+    with tempfile.TemporaryDirectory() as tmp, (
+        nullcontext(external) if external else FakeRedisServer()
+    ) as redis_url:
+        stores = {
+            "memory": MemorySessionStore(args.ttl, maxsize=args.sessions // 2),
+            "sqlite": SQLiteSessionStore(os.path.join(tmp, "sessions.db"), args.ttl),
+            "redis": RedisSessionStore(redis_url, args.ttl),
+        }
+        for name, store in stores.items():
+            samples = measure(store, args.sessions, candidates)
+            store.close()
+            print(
+                f"{name:<10} {statistics.median(samples) * 1000:>8.3f} "
+                f"{percentile(samples, 95) * 1000:>8.3f} "
+                f"{statistics.fmean(samples) * 1000:>8.3f}"
+            )
+        memory = stores["memory"]
+        print(
+            f"\nmemory 저장소 세션 수 {len(memory.sessions)} "
+            f"(최대 {memory.sessions.maxsize}개로 제한)"
+        )
+
+
+if __name__ == "__main__":
+    main()
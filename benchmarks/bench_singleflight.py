@@ -0,0 +1,159 @@
+"""동시 동일 질문의 호출 합치기(single-flight) 효과 측정
+
+같은 공고에 대해 사용자 여러 명이 같은 질문을 동시에 보내는 상황을 흉내 내어,
+SINGLEFLIGHT_ENABLED를 끄고 켰을 때의 요청 지연 시간과 외부 서비스 호출 수
+(LLM, 임베딩, Pinecone, Cohere)를 비교합니다. 라운드마다 질문을 바꿔 캐시가
+적중하지 않도록 합니다.
+
+    python -m benchmarks.bench_singleflight --users 16 --rounds 5
+    python -m benchmarks.bench_singleflight --mode thread   # Streamlit 세션처럼 스레드로
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.harness import percentile
+from benchmarks.run import NAMESPACE, install_fakes, load_corpus
+from config.settings import settings
+from core.session import SessionState
+
+
+class CallCounter:
+    """대역 서비스 메서드의 호출 수를 세는 래퍼"""
+
+    def __init__(self):
+        self.counts: dict[str, int] = {}
+        self._patched = []
+
+    def patch(self, owner, name: str, label: str):
+        original = getattr(owner, name)
+        self._patched.append((owner, name, original))
+        counts = self.counts
+        counts.setdefault(label, 0)
+
+        if asyncio.iscoroutinefunction(original):
+
+            async def wrapper(*args, **kwargs):
+                counts[label] += 1
+                return await original(*args, **kwargs)
+
+        else:
+
+            def wrapper(*args, **kwargs):
+                counts[label] += 1
+                return original(*args, **kwargs)
+
+        setattr(owner, name, wrapper)
+
+    def reset(self):
+        for label in self.counts:
+            self.counts[label] = 0
+
+
+def _text(chunk) -> str:
+    return getattr(chunk, "content", chunk)
+
+
+async def _aask(app, query: str) -> float:
+    started = time.perf_counter()
+    stream, _ = await app.aprocess_query(query, SessionState(selected_bid_no=NAMESPACE))
+    answer = "".join([_text(chunk) async for chunk in stream])
+    assert answer
+    return time.perf_counter() - started
+
+
+def _ask(app, query: str) -> float:
+    started = time.perf_counter()
+    stream, _ = app.process_query(query, SessionState(selected_bid_no=NAMESPACE))
+    assert "".join(_text(chunk) for chunk in stream)
+    return time.perf_counter() - started
+
+
+def run_rounds(app, mode: str, users: int, rounds: int, label: str) -> list[float]:
+    samples = []
+    for i in range(rounds):
+        # 캐시를 피하기 위해 라운드마다 다른 질문 (라운드 안에서는 같은 질문)
+        query = f"이 공고의 {label} {i}차 평가 기준 알려줘"
+        if mode == "async":
+
+            async def burst():
+                return await asyncio.gather(*(_aask(app, query) for _ in range(users)))
+
+            samples.extend(asyncio.run(burst()))
+        else:
+            with ThreadPoolExecutor(max_workers=users) as pool:
+                samples.extend(pool.map(lambda _: _ask(app, query), range(users)))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="single-flight 호출 합치기 벤치마크")
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--mode", choices=("async", "thread"), default="async")
+    parser.add_argument("--latency-scale", type=float, default=0.1)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+
+    from streamlit import config as st_config
+    from streamlit import logger as st_logger
+
+    st_config.get_option("logger.level")
+    st_logger.set_log_level("error")
+
+    fakes = install_fakes(args.latency_scale, args.dim)
+    load_corpus(fakes.index, args.dim)
+
+    from benchmarks.fakes import (
+        FakeAsyncCohereClient,
+        FakeChatModel,
+        FakeCohereClient,
+        FakeEmbeddings,
+    )
+    from core.pipeline import RAGApp
+    from utils.singleflight import flight_stats
+
+    counter = CallCounter()
+    for name in ("_generate", "_agenerate", "_stream", "_astream"):
+        counter.patch(FakeChatModel, name, "llm")
+    counter.patch(FakeEmbeddings, "embed_query", "embedding")
+    counter.patch(FakeEmbeddings, "aembed_query", "embedding")
+    counter.patch(fakes.index, "query", "pinecone")
+    counter.patch(FakeCohereClient, "rerank", "cohere")
+    counter.patch(FakeAsyncCohereClient, "rerank", "cohere")
+
+    app = RAGApp()
+    run_rounds(app, args.mode, 1, 1, "준비")
+
+    services = list(counter.counts)
+    print(
+        f"동시 사용자 {args.users}명 x {args.rounds}라운드 ({args.mode})\n"
+        f"{'single-flight':<14} {'p50 ms':>8} {'p95 ms':>8} "
+        + " ".join(f"{name:>9}" for name in services)
+    )
+    for enabled in (False, True):
+        settings.SINGLEFLIGHT_ENABLED = enabled
+        counter.reset()
+        samples = run_rounds(
+            app, args.mode, args.users, args.rounds, "켬" if enabled else "끔"
+        )
+        print(
+            f"{'on' if enabled else 'off':<14} "
+            f"{statistics.median(samples) * 1000:>8.1f} "
+            f"{percentile(samples, 95) * 1000:>8.1f} "
+            + " ".join(f"{counter.counts[name]:>9}" for name in services)
+        )
+
+    print(f"\n{'단계':<20} {'calls':>6} {'coalesced':>10} {'rate':>6}")
+    for stage, stats in flight_stats().items():
+        print(
+            f"{stage:<20} {stats['calls']:>6} {stats['coalesced']:>10} "
+            f"{stats['coalesce_rate']:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""SQL 프롬프트 동적 few-shot 선택 평가
+
+고정 질문 세트에 대해 다음을 비교합니다.
+
+1. tokens: 전체 스키마 + 고정 예시 프롬프트와 동적 선택 프롬프트의 토큰 수
+2. recall: 정답 SQL이 사용하는 테이블이 줄인 스키마에 모두 포함된 비율
+   (스키마를 줄여도 필요한 테이블이 남는지만 보며, 실행 정확도가 아님)
+3. accuracy (--accuracy): 고정/동적 프롬프트로 생성한 SQL의 실행 결과가
+   정답 SQL의 결과와 같은 비율 (실제 LLM과 POSTGRES_URI의 데이터 필요)
+
+기본 실행은 benchmarks.fakes의 해시 임베딩을 사용하므로 네트워크 없이 동작하며,
+이때 예시 선택은 단어 겹침 기준이라 실제 임베딩보다 부정확합니다.
+
+    python -m benchmarks.bench_sql_prompt
+    python -m benchmarks.bench_sql_prompt --accuracy --bid-notice-no R24BK00000001
+"""
+
+import argparse
+import statistics
+from collections import Counter
+from typing import Optional
+
+from config.settings import settings
+
+# (질문, 선택된 공고 대상 여부, 정답 SQL, 정답 SQL이 사용하는 테이블)
+QUESTIONS = [
+    (
+        "2024년 월별 공고 건수를 보여주세요",
+        False,
+        """SELECT EXTRACT(MONTH FROM bid_notice_date) as month, COUNT(*) as total
+        FROM naramarket_bids
+        WHERE EXTRACT(YEAR FROM bid_notice_date) = 2024
+        GROUP BY 1 ORDER BY 1""",
+        {"naramarket_bids"},
+    ),
+    (
+        "유찰된 공고가 가장 많은 공고기관 5곳을 보여주세요",
+        False,
+        """SELECT nb.ntce_instt_nm, COUNT(*) as fail_count
+        FROM bid_result_fails brf
+        JOIN naramarket_bids nb ON brf.bid_notice_no = nb.bid_notice_no
+        GROUP BY nb.ntce_instt_nm ORDER BY fail_count DESC, 1 LIMIT 5""",
+        {"bid_result_fails", "naramarket_bids"},
+    ),
+    (
+        "낙찰 건수가 가장 많은 업체 10곳을 보여주세요",
+        False,
+        """SELECT prcbdr_nm, COUNT(*) as success_count
+        FROM bid_result_successes WHERE openg_rank = 1
+        GROUP BY prcbdr_nm ORDER BY success_count DESC, 1 LIMIT 10""",
+        {"bid_result_successes"},
+    ),
+    (
+        "입찰 방식별 공고 건수와 평균 배정예산을 보여주세요",
+        False,
+        """SELECT bid_method_nm, COUNT(*) as total, AVG(asign_bdgt_amt) as avg_budget
+        FROM naramarket_bids GROUP BY bid_method_nm""",
+        {"naramarket_bids"},
+    ),
+    (
+        "유찰 사유 중 가장 흔한 3가지를 알려주세요",
+        False,
+        """SELECT nobid_rsn, COUNT(*) as fail_count
+        FROM bid_result_fails WHERE nobid_rsn IS NOT NULL
+        GROUP BY nobid_rsn ORDER BY fail_count DESC, 1 LIMIT 3""",
+        {"bid_result_fails"},
+    ),
+    (
+        "용역구분별 평균 낙찰률을 보여주세요",
+        False,
+        """SELECT nb.srvce_div_nm, AVG(brs.bidprc_rt) as avg_ratio
+        FROM naramarket_bids nb
+        JOIN bid_result_successes brs ON nb.bid_notice_no = brs.bid_notice_no
+        WHERE brs.openg_rank = 1 GROUP BY nb.srvce_div_nm""",
+        {"naramarket_bids", "bid_result_successes"},
+    ),
+    (
+        "진행상태별 공고 건수를 보여주세요",
+        False,
+        """SELECT bid_prgs_stat_nm, COUNT(*) as total
+        FROM naramarket_bids GROUP BY bid_prgs_stat_nm""",
+        {"naramarket_bids"},
+    ),
+    (
+        "1순위 업체명과 투찰 금액을 알려주세요",
+        True,
+        """SELECT prcbdr_nm, bidprc_amt FROM bid_result_successes
+        WHERE bid_notice_no = '{bid_notice_no}' AND openg_rank = 1""",
+        {"bid_result_successes"},
+    ),
+    (
+        "몇 개 업체가 입찰에 참여했나요?",
+        True,
+        """SELECT COUNT(*) FROM bid_result_successes
+        WHERE bid_notice_no = '{bid_notice_no}'""",
+        {"bid_result_successes"},
+    ),
+    (
+        "담당자 이름과 이메일을 알려주세요",
+        True,
+        """SELECT ntce_instt_ofcl_nm, ntce_instt_ofcl_email_adrs
+        FROM naramarket_bids WHERE bid_notice_no = '{bid_notice_no}'""",
+        {"naramarket_bids"},
+    ),
+    (
+        "개찰일시와 입찰마감일시를 알려주세요",
+        True,
+        """SELECT openg_dt, bid_close_dt
+        FROM naramarket_bids WHERE bid_notice_no = '{bid_notice_no}'""",
+        {"naramarket_bids"},
+    ),
+    (
+        "유찰 사유가 있으면 알려주세요",
+        True,
+        """SELECT nobid_rsn FROM bid_result_fails
+        WHERE bid_notice_no = '{bid_notice_no}'""",
+        {"bid_result_fails"},
+    ),
+]
+
+DEFAULT_NOTICE = "R00BK00000000"
+
+
+def measure_tokens(bid_notice_no: str) -> list[dict]:
+    """질문별 고정/동적 프롬프트 토큰 수와 스키마 테이블 재현율"""
+    from utils.sql_examples import (
+        build_prompt_inputs,
+        count_tokens,
+        static_inputs,
+    )
+    from utils.helpers import start_encoding_load
+    from utils.sql_prompt import generate_prompt, generate_prompt_with_number
+
+    # 질문마다 같은 기준(tiktoken 또는 근사치)으로 세도록 로드를 기다림
+    start_encoding_load().join()
+    rows = []
+    for question, with_number, _, tables in QUESTIONS:
+        notice = bid_notice_no if with_number else None
+        template = generate_prompt_with_number if with_number else generate_prompt
+        dynamic = build_prompt_inputs(question, notice)
+        kept = {
+            line.split(":", 1)[1].strip()
+            for line in dynamic["schema"].splitlines()
+            if "Table:" in line
+        }
+        rows.append(
+            {
+                "question": question,
+                "static": count_tokens(template(question, **static_inputs(notice))),
+                "dynamic": count_tokens(template(question, **dynamic)),
+                "examples": dynamic["examples"].count("Example "),
+                "recall": tables <= kept,
+            }
+        )
+    return rows
+
+
+def result_signature(cursor, sql: str) -> Optional[Counter]:
+    """열 순서와 행 순서를 무시한 실행 결과 (실패 시 None)"""
+    try:
+        cursor.execute(sql)
+        return Counter(tuple(sorted(map(str, row))) for row in cursor.fetchall())
+    except Exception:
+        cursor.connection.rollback()
+        return None
+
+
+def measure_accuracy(bid_notice_no: str) -> dict[str, float]:
+    """고정/동적 프롬프트별 실행 정확도"""
+    import psycopg2
+
+    from processors.sql_processor import SQLProcessor
+
+    conn = psycopg2.connect(settings.POSTGRES_URI)
+    accuracy = {}
+    try:
+        with conn.cursor() as cursor:
+            gold = [
+                result_signature(cursor, sql.replace("{bid_notice_no}", bid_notice_no))
+                for _, _, sql, _ in QUESTIONS
+            ]
+            for mode, enabled in (("static", False), ("dynamic", True)):
+                settings.SQL_FEWSHOT_ENABLED = enabled
+                processor = SQLProcessor()
+                correct = 0
+                for (question, with_number, _, _), expected in zip(QUESTIONS, gold):
+                    plan = processor._generate_sql(
+                        question, bid_notice_no if with_number else None
+                    )
+                    actual = result_signature(cursor, plan.render())
+                    correct += expected is not None and actual == expected
+                accuracy[mode] = correct / len(QUESTIONS)
+    finally:
+        conn.close()
+    return accuracy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQL 프롬프트 few-shot 선택 평가")
+    parser.add_argument("--accuracy", action="store_true")
+    parser.add_argument("--bid-notice-no", default=DEFAULT_NOTICE)
+    args = parser.parse_args()
+
+    if not args.accuracy:
+        # 오프라인 환경 변수 설정과 해시 임베딩 대역 설치
+        from benchmarks.run import install_fakes
+
+        install_fakes(scale=0.0, dim=256)
+
+    rows = measure_tokens(args.bid_notice_no)
+    print(f"{'질문':<34} {'static':>7} {'dynamic':>8} {'예시':>4} {'recall':>6}")
+    for row in rows:
+        print(
+            f"{row['question']:<34} {row['static']:>7} {row['dynamic']:>8} "
+            f"{row['examples']:>4} {'O' if row['recall'] else 'X':>6}"
+        )
+
+    static = statistics.fmean(row["static"] for row in rows)
+    dynamic = statistics.fmean(row["dynamic"] for row in rows)
+    recall = sum(row["recall"] for row in rows) / len(rows)
+    print(
+        f"\n평균 프롬프트 토큰 {static:.0f} -> {dynamic:.0f} "
+        f"({(1 - dynamic / static) * 100:.1f}% 절감), 테이블 재현율 {recall:.0%}"
+    )
+
+    if args.accuracy:
+        accuracy = measure_accuracy(args.bid_notice_no)
+        print(
+            f"실행 정확도 static {accuracy['static']:.0%}, "
+            f"dynamic {accuracy['dynamic']:.0%}"
+        )
+    else:
+        print("실행 정확도: 측정하지 않음 (--accuracy, 실제 LLM과 데이터 필요)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Streamlit 세션 시작 비용 벤치마크
+
+1. import: 새 프로세스에서 streamlit_app을 import하는 데 걸리는 시간
+2. first_session: 첫 세션이 공유 RAGApp을 얻는 시간 (get_rag_app 첫 호출)
+3. per_session: 이후 세션이 RAGApp을 얻는 시간 (st.cache_resource 적중)
+4. eager: 세션마다 모든 구성 요소를 생성하던 방식의 비용 (비교용)
+
+외부 서비스는 benchmarks.fakes 대역을 사용하므로 네트워크 없이 실행됩니다.
+Postgres 픽스처가 없으면 eager 측정에서 SQLProcessor(스키마 조회)는 제외되고,
+PineconeVectorStore 생성(인덱스 조회 API 호출)은 항상 제외됩니다.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import nullcontext
+
+# 오프라인 환경 변수 설정과 대역 설치 함수 (import 시 환경 변수가 설정됨)
+from benchmarks.run import install_fakes
+from benchmarks.postgres import local_postgres
+from config.settings import settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SCRIPT = """
+import time
+started = time.perf_counter()
+import streamlit_app
+print(time.perf_counter() - started)
+"""
+
+
+def measure_import(runs: int) -> list[float]:
+    """새 인터프리터에서 streamlit_app import 시간을 측정합니다."""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT],
+            cwd=ROOT,
+            env=os.environ,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return samples
+
+
+def measure_eager(runs: int, with_sql: bool) -> list[float]:
+    """세션마다 RAGApp 구성 요소를 모두 생성하던 방식의 소요 시간"""
+    from core.pipeline import RAGApp
+
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        app = RAGApp()
+        app.router
+        app.vector_processor
+        app.sql_formatter
+        app.embedding_manager
+        if with_sql:
+            processor = app.sql_processor
+            processor.sql_chain
+            processor.sql_chain_with_number
+            processor.result_cache
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def measure_shared(runs: int) -> tuple[float, list[float]]:
+    """공유 RAGApp의 첫 세션 / 이후 세션 소요 시간"""
+    import streamlit as st
+    from streamlit_app import get_rag_app
+
+    st.cache_resource.clear()
+    started = time.perf_counter()
+    get_rag_app()
+    first = time.perf_counter() - started
+
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        get_rag_app()
+        samples.append(time.perf_counter() - started)
+    return first, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="세션 시작 비용 벤치마크")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-postgres", action="store_true")
+    args = parser.parse_args()
+
+    from streamlit import config as st_config
+    from streamlit import logger as st_logger
+
+    st_config.get_option("logger.level")
+    st_logger.set_log_level("error")
+
+    imports = measure_import(args.runs)
+
+    install_fakes(scale=0.0, dim=256)
+    postgres = nullcontext(None) if args.no_postgres else local_postgres(rows=1000)
+    with postgres as uri:
+        if uri:
+            settings.POSTGRES_URI = uri
+        first, shared = measure_shared(args.runs)
+        eager = measure_eager(args.runs, with_sql=bool(uri))
+
+    def ms(values: list[float]) -> float:
+        return statistics.median(values) * 1000
+
+    print(f"{'항목':<28} {'median ms':>12}")
+    print(f"{'import streamlit_app':<28} {ms(imports):>12.1f}")
+    print(f"{'first_session (lazy)':<28} {first * 1000:>12.1f}")
+    print(f"{'per_session (cached)':<28} {ms(shared):>12.3f}")
+    label = "eager (SQL 포함)" if uri else "eager (SQL 제외)"
+    print(f"{label:<28} {ms(eager):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
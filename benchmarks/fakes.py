@@ -0,0 +1,346 @@
+"""오프라인 벤치마크용 외부 서비스 대역
+
+OpenAI/Anthropic 채팅 모델, OpenAI 임베딩, Pinecone 인덱스, BM25 인코더,
+Cohere 재순위화 API를 네트워크 없이 흉내 냅니다. 모든 호출은 설정한 지연
+시간만큼 기다리므로 단계별 지연 시간 비율을 실제와 비슷하게 재현합니다.
+세션 저장소용으로 RESP 프로토콜을 말하는 로컬 Redis 대역도 제공합니다.
+"""
+
+import asyncio
+import hashlib
+import re
+import socketserver
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_WORD = re.compile(r"\w+")
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest())
+
+
+class FakeChatModel(BaseChatModel):
+    """응답 함수와 지연 시간(첫 토큰, 토큰당)을 설정할 수 있는 채팅 모델"""
+
+    responder: Callable[[str], str]
+    first_token_latency: float = 0.3
+    token_latency: float = 0.01
+    # 스트리밍 시 한 번에 내보낼 글자 수 (대략 한 토큰)
+    chunk_chars: int = 2
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        return self.responder("\n".join(str(m.content) for m in messages))
+
+    def _chunks(self, text: str) -> list[str]:
+        return [
+            text[i : i + self.chunk_chars]
+            for i in range(0, len(text), self.chunk_chars)
+        ]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = self._respond(messages)
+        time.sleep(
+            self.first_token_latency + self.token_latency * len(self._chunks(text))
+        )
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = self._respond(messages)
+        await asyncio.sleep(
+            self.first_token_latency + self.token_latency * len(self._chunks(text))
+        )
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_latency)
+        for piece in self._chunks(self._respond(messages)):
+            time.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ):
+        await asyncio.sleep(self.first_token_latency)
+        for piece in self._chunks(self._respond(messages)):
+            await asyncio.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+
+def hash_vector(text: str, dim: int) -> np.ndarray:
+    """단어별 난수 벡터의 합 (단어를 공유하는 텍스트끼리 유사도가 높음)"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in _WORD.findall(text.lower()) or [text]:
+        vector += np.random.default_rng(_seed(word)).standard_normal(dim, np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class FakeEmbeddings(Embeddings):
+    """결정적 해시 임베딩 (호출당 지연 시간 설정 가능)"""
+
+    def __init__(self, dim: int = 256, latency: float = 0.05, **_):
+        self.dim = dim
+        self.latency = latency
+        self.calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return [hash_vector(text, self.dim).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return [hash_vector(text, self.dim).tolist() for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class FakeSparseEncoder:
+    """BM25Encoder 대역 (단어 해시를 희소 인덱스로 사용)"""
+
+    @staticmethod
+    def _encode(text: str) -> dict:
+        counts: dict[int, float] = {}
+        for word in _WORD.findall(text.lower()):
+            index = _seed(word) % (2**31)
+            counts[index] = counts.get(index, 0.0) + 1.0
+        return {"indices": list(counts), "values": list(counts.values())}
+
+    def encode_queries(self, texts):
+        if isinstance(texts, str):
+            return self._encode(texts)
+        return [self._encode(text) for text in texts]
+
+    encode_documents = encode_queries
+
+    def default(self):
+        return self
+
+
+class InMemoryPineconeIndex:
+    """Pinecone Index.query/upsert의 메모리 구현 (밀집 내적 + 희소 내적)"""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.namespaces: dict[str, dict] = {}
+
+    def upsert(self, vectors: list[dict], namespace: str = ""):
+        space = self.namespaces.setdefault(
+            namespace, {"ids": [], "dense": [], "sparse": [], "metadata": []}
+        )
+        for vector in vectors:
+            space["ids"].append(vector["id"])
+            space["dense"].append(np.asarray(vector["values"], dtype=np.float32))
+            sparse = vector.get("sparse_values") or {"indices": [], "values": []}
+            space["sparse"].append(dict(zip(sparse["indices"], sparse["values"])))
+            space["metadata"].append(dict(vector.get("metadata") or {}))
+        space.pop("matrix", None)
+
+    def query(
+        self,
+        vector,
+        top_k: int = 10,
+        sparse_vector: Optional[dict] = None,
+        include_metadata: bool = False,
+        namespace: str = "",
+        **_,
+    ) -> dict:
+        time.sleep(self.latency)
+        space = self.namespaces.get(namespace)
+        if not space or not space["ids"]:
+            return {"matches": [], "namespace": namespace}
+        if "matrix" not in space:
+            space["matrix"] = np.stack(space["dense"])
+
+        scores = space["matrix"] @ np.asarray(vector, dtype=np.float32)
+        if sparse_vector:
+            query = dict(zip(sparse_vector["indices"], sparse_vector["values"]))
+            scores = scores + np.array(
+                [
+                    sum(value * doc.get(index, 0.0) for index, value in query.items())
+                    for doc in space["sparse"]
+                ],
+                dtype=np.float32,
+            )
+        top = np.argsort(-scores)[:top_k]
+        return {
+            "matches": [
+                {
+                    "id": space["ids"][i],
+                    "score": float(scores[i]),
+                    # 호출 측에서 metadata를 변경하므로 복사본 반환
+                    "metadata": dict(space["metadata"][i]) if include_metadata else {},
+                }
+                for i in top
+            ],
+            "namespace": namespace,
+        }
+
+
+class FakePinecone:
+    """pinecone.Pinecone 대역 (모든 인덱스 이름이 같은 메모리 인덱스를 가리킴)"""
+
+    index: InMemoryPineconeIndex = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def Index(self, name: str = None, **_):
+        return self.index
+
+
+def _rerank_response(query: str, documents: list[str], top_n: int):
+    query_words = set(_WORD.findall(query.lower()))
+    scored = []
+    for index, document in enumerate(documents):
+        words = set(_WORD.findall(document.lower()))
+        overlap = len(query_words & words) / (len(query_words) or 1)
+        scored.append(SimpleNamespace(index=index, relevance_score=overlap))
+    scored.sort(key=lambda item: item.relevance_score, reverse=True)
+    return SimpleNamespace(results=scored[:top_n])
+
+
+class FakeCohereClient:
+    """cohere.Client 대역 (단어 겹침 비율을 관련도 점수로 사용)"""
+
+    latency: float = 0.15
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def rerank(self, model: str, query: str, documents: list[str], top_n: int, **_):
+        time.sleep(self.latency)
+        return _rerank_response(query, documents, top_n)
+
+
+class FakeAsyncCohereClient(FakeCohereClient):
+    async def rerank(self, model: str, query: str, documents: list[str], top_n, **_):
+        await asyncio.sleep(self.latency)
+        return _rerank_response(query, documents, top_n)
+
+
+class FakeRedisServer:
+    """세션 저장소가 사용하는 명령만 지원하는 로컬 RESP 서버
+
+    PING, AUTH, SELECT, GET, GETEX, SET(EX), DEL을 처리합니다.
+
+        with FakeRedisServer() as url:
+            store = RedisSessionStore(url, ttl=60)
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.data: dict[bytes, tuple[bytes, Optional[float]]] = {}
+        self.lock = threading.Lock()
+        self.server = None
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    @staticmethod
+    def _expiry(args: list[bytes]) -> Optional[float]:
+        for i, arg in enumerate(args):
+            if arg.upper() == b"EX":
+                return time.monotonic() + int(args[i + 1])
+        return None
+
+    def handle(self, command: list[bytes]) -> bytes:
+        name, args = command[0].upper(), command[1:]
+        with self.lock:
+            if name in (b"PING", b"AUTH", b"SELECT"):
+                return b"+OK\r\n" if name != b"PING" else b"+PONG\r\n"
+            if name in (b"GET", b"GETEX"):
+                value = self._get(args[0])
+                if value is None:
+                    return b"$-1\r\n"
+                expires_at = self._expiry(args[1:])
+                if expires_at is not None:
+                    self.data[args[0]] = (value, expires_at)
+                return b"$%d\r\n%s\r\n" % (len(value), value)
+            if name == b"SET":
+                self.data[args[0]] = (args[1], self._expiry(args[2:]))
+                return b"+OK\r\n"
+            if name == b"DEL":
+                removed = sum(self.data.pop(key, None) is not None for key in args)
+                return b":%d\r\n" % removed
+        return b"-ERR unknown command '%s'\r\n" % name
+
+    def __enter__(self) -> str:
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = []
+                    for _ in range(int(line[1:])):
+                        length = int(self.rfile.readline()[1:])
+                        command.append(self.rfile.read(length + 2)[:-2])
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                    self.wfile.write(fake.handle(command))
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        return f"redis://{host}:{port}/0"
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,123 @@
+"""단계별 지연 시간 측정과 기준선(baseline) 비교"""
+
+import functools
+import inspect
+import json
+import os
+import statistics
+import time
+from collections import defaultdict
+from typing import Optional
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class StageTimer:
+    """메서드를 감싸 호출별 소요 시간을 단계 이름으로 기록합니다.
+
+    제너레이터(스트리밍 응답)를 반환하는 메서드는 첫 청크까지의 시간을
+    "<단계>.first_chunk"로, 모두 소비될 때까지의 시간을 "<단계>"로 기록합니다.
+    """
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self._patched: list[tuple[object, str, object]] = []
+
+    def record(self, stage: str, seconds: float):
+        self.samples[stage].append(seconds)
+
+    def measure(self, stage: str):
+        timer = self
+
+        class _Span:
+            def __enter__(self):
+                self.started = time.perf_counter()
+                return self
+
+            def __exit__(self, *exc):
+                timer.record(stage, time.perf_counter() - self.started)
+
+        return _Span()
+
+    def instrument(self, target, attr: str, stage: str):
+        """target.attr(인스턴스 또는 클래스의 메서드)를 측정 래퍼로 교체합니다."""
+        saved = vars(target).get(attr)
+        original = getattr(target, attr)
+
+        def _wrap_stream(stream, started):
+            first = True
+            for chunk in stream:
+                if first:
+                    self.record(f"{stage}.first_chunk", time.perf_counter() - started)
+                    first = False
+                yield chunk
+            self.record(stage, time.perf_counter() - started)
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = original(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return _wrap_stream(result, started)
+            self.record(stage, time.perf_counter() - started)
+            return result
+
+        self._patched.append((target, attr, saved))
+        setattr(target, attr, wrapper)
+
+    def restore(self):
+        for target, attr, saved in reversed(self._patched):
+            if saved is not None:
+                setattr(target, attr, saved)
+            else:
+                delattr(target, attr)
+        self._patched.clear()
+
+    def summary(self) -> dict[str, dict]:
+        return {
+            stage: {
+                "n": len(values),
+                "p50_ms": round(statistics.median(values) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "mean_ms": round(statistics.fmean(values) * 1000, 3),
+            }
+            for stage, values in sorted(self.samples.items())
+        }
+
+
+def load_baselines(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(path: str, results: dict[str, dict], config: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"config": config, "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(
+    results: dict[str, dict],
+    baselines: dict[str, dict],
+    tolerance: float = 0.25,
+    slack_ms: float = 2.0,
+) -> list[str]:
+    """p50이 기준선보다 tolerance 비율 + slack_ms 이상 느려진 단계 목록"""
+    regressions = []
+    for key, baseline in baselines.items():
+        current = results.get(key)
+        if current is None:
+            continue
+        limit = baseline["p50_ms"] * (1 + tolerance) + slack_ms
+        if current["p50_ms"] > limit:
+            regressions.append(
+                f"{key}: p50 {current['p50_ms']:.2f} ms > "
+                f"허용치 {limit:.2f} ms (기준 {baseline['p50_ms']:.2f} ms)"
+            )
+    return regressions
@@ -0,0 +1,115 @@
+"""벤치마크용 로컬 Postgres 픽스처
+
+BENCH_POSTGRES_URI가 있으면 그 데이터베이스를, 없으면 PATH(또는
+/usr/lib/postgresql/*/bin)의 initdb/pg_ctl로 임시 클러스터를 띄워 사용합니다.
+pgvector 확장이 설치되어 있어야 하며, 어느 쪽도 불가능하면 None을 반환하여
+Postgres가 필요한 벤치마크는 건너뜁니다.
+"""
+
+import glob
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Optional
+from urllib.parse import quote
+
+import psycopg2
+
+from benchmarks.bench_hybrid_search import load
+
+FIXTURE_SCHEMA = "bench_fixture"
+
+
+def _find_binary(name: str) -> Optional[str]:
+    path = shutil.which(name)
+    if path:
+        return path
+    candidates = sorted(glob.glob(f"/usr/lib/postgresql/*/bin/{name}"))
+    return candidates[-1] if candidates else None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def _temporary_cluster() -> Iterator[Optional[str]]:
+    initdb, pg_ctl = _find_binary("initdb"), _find_binary("pg_ctl")
+    if not initdb or not pg_ctl:
+        yield None
+        return
+
+    datadir = tempfile.mkdtemp(prefix="bench-pg-")
+    port = _free_port()
+    try:
+        subprocess.run(
+            [initdb, "-D", datadir, "-U", "postgres", "--auth=trust", "-E", "UTF8"],
+            check=True,
+            capture_output=True,
+        )
+        subprocess.run(
+            [
+                pg_ctl,
+                "-D",
+                datadir,
+                "-w",
+                "-l",
+                os.path.join(datadir, "server.log"),
+                "-o",
+                f"-p {port} -k {datadir} -c listen_addresses=127.0.0.1",
+                "start",
+            ],
+            check=True,
+            capture_output=True,
+        )
+        yield f"postgresql://postgres@127.0.0.1:{port}/postgres"
+    finally:
+        subprocess.run(
+            [pg_ctl, "-D", datadir, "-m", "immediate", "stop"], capture_output=True
+        )
+        shutil.rmtree(datadir, ignore_errors=True)
+
+
+@contextmanager
+def local_postgres(rows: int = 10_000, dim: int = 256) -> Iterator[Optional[str]]:
+    """합성 공고가 적재된 Postgres URI를 반환합니다 (사용 불가 시 None).
+
+    반환되는 URI는 search_path가 픽스처 스키마로 설정되어 있어 애플리케이션
+    코드의 naramarket_bids 참조가 그대로 픽스처 테이블을 가리킵니다.
+    """
+    external = os.environ.get("BENCH_POSTGRES_URI")
+    with nullcontext(external) if external else _temporary_cluster() as base_uri:
+        if base_uri is None:
+            yield None
+            return
+        try:
+            conn = psycopg2.connect(base_uri)
+        except psycopg2.OperationalError as e:
+            logging.warning(f"벤치마크 Postgres 연결 실패: {e}")
+            yield None
+            return
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+                cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            started = time.perf_counter()
+            load(conn, FIXTURE_SCHEMA, rows, dim)
+            logging.info(f"픽스처 준비 {time.perf_counter() - started:.1f}s")
+        except psycopg2.Error as e:
+            logging.warning(f"벤치마크 픽스처 준비 실패 (pgvector 필요): {e}")
+            conn.close()
+            yield None
+            return
+        conn.close()
+
+        separator = "&" if "?" in base_uri else "?"
+        options = quote(f"-c search_path={FIXTURE_SCHEMA},public")
+        yield f"{base_uri}{separator}options={options}"
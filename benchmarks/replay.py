@@ -0,0 +1,240 @@
+"""질문 JSONL 일괄 재생(replay)
+
+질문 목록을 Streamlit 없이 RAGApp 파이프라인(비동기 경로)으로 동시에 처리하고,
+질문별 라우팅 결과, 생성된 SQL, 검색된 청크 id, 답변, 단계별 소요 시간을 JSONL로
+기록한 뒤 처리량과 지연 시간 분위수(p50/p95/p99)를 출력합니다. 회귀 점검과 용량
+산정에 사용하며, 실제 서비스 또는 --offline(benchmarks.fakes 대역)으로 실행합니다.
+
+입력 한 줄의 형식 (question 대신 query도 허용)
+
+    {"id": "q1", "question": "이 공고의 평가 기준 알려줘", "bid_notice_no": "R24BK00000001"}
+
+    python -m benchmarks.replay requests.jsonl --concurrency 8 --output replay.jsonl
+    python -m benchmarks.replay requests.jsonl --offline --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from contextlib import nullcontext
+from typing import Optional
+
+from benchmarks.harness import percentile
+
+DEFAULT_INPUT = "requests.jsonl"
+DEFAULT_OUTPUT = "replay_results.jsonl"
+
+
+def load_questions(path: str) -> list[dict]:
+    """질문 JSONL을 읽습니다 (형식이 맞지 않는 줄은 경고 후 건너뜀)."""
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logging.warning(f"{path}:{number} JSON이 아니어서 건너뜁니다")
+                continue
+            if isinstance(record, dict):
+                question = record.get("question") or record.get("query")
+            if not isinstance(record, dict) or not isinstance(question, str):
+                logging.warning(f"{path}:{number} question 값이 없어 건너뜁니다")
+                continue
+            questions.append(
+                {
+                    "id": record.get("id", number),
+                    "question": question,
+                    "bid_notice_no": record.get("bid_notice_no") or None,
+                }
+            )
+    return questions
+
+
+def _stage_timings(trace) -> dict[str, float]:
+    """같은 단계가 여러 번 기록되면 합산합니다."""
+    stages: dict[str, float] = {}
+    for stage, seconds in trace.spans:
+        stages[stage] = round(stages.get(stage, 0.0) + seconds, 4)
+    return stages
+
+
+async def replay_one(app, item: dict) -> dict:
+    """질문 하나를 처리하고 결과 레코드를 반환합니다."""
+    from core.metrics import get_metrics
+    from core.session import SessionState
+
+    record = {
+        "id": item["id"],
+        "question": item["question"],
+        "bid_notice_no": item["bid_notice_no"],
+        "status": "ok",
+        "route": None,
+        "sql": None,
+        "chunk_ids": [],
+        "answer": None,
+        "error": None,
+    }
+    session = SessionState(selected_bid_no=item["bid_notice_no"])
+    first_token: Optional[float] = None
+    with get_metrics().trace() as trace:
+        started = time.perf_counter()
+        try:
+            db_type, result = await app.aprocess(item["question"], session)
+            record["route"] = db_type
+            if db_type == "rdb":
+                record["sql"] = result.results[0].metadata["sql_query"]
+            elif result is not None:
+                record["chunk_ids"] = [
+                    r.metadata.get("chunk_id") for r in result.results
+                ]
+                if not result.results and isinstance(result.raw_response, str):
+                    # VectorProcessor는 검색 오류를 빈 결과로 반환
+                    record["error"] = result.raw_response
+
+            stream = app.aanswer(item["question"], db_type, result)
+            if stream is None:
+                record["status"] = "notice_required"
+            else:
+                chunks = []
+                async for chunk in stream:
+                    text = getattr(chunk, "content", chunk)
+                    if text and first_token is None:
+                        first_token = time.perf_counter() - started
+                    chunks.append(str(text))
+                record["answer"] = "".join(chunks)
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+        latency = time.perf_counter() - started
+
+    record["latency"] = round(latency, 4)
+    record["first_token"] = round(first_token, 4) if first_token else None
+    record["stages"] = _stage_timings(trace)
+    return record
+
+
+async def replay(app, questions: list[dict], concurrency: int, output) -> list[dict]:
+    """최대 concurrency개씩 동시에 처리하며 끝나는 순서대로 output에 기록합니다."""
+    semaphore = asyncio.Semaphore(concurrency)
+    records = []
+
+    async def run(index: int, item: dict):
+        async with semaphore:
+            record = await replay_one(app, item)
+        record["index"] = index
+        records.append(record)
+        output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        output.flush()
+
+    await asyncio.gather(*(run(i, item) for i, item in enumerate(questions)))
+    records.sort(key=lambda record: record["index"])
+    return records
+
+
+def summarize(records: list[dict], elapsed: float) -> dict:
+    latencies = [r["latency"] for r in records if r["status"] != "error"]
+    summary = {
+        "requests": len(records),
+        "elapsed": round(elapsed, 3),
+        "throughput": round(len(records) / elapsed, 3) if elapsed else 0.0,
+        "status": dict(Counter(r["status"] for r in records)),
+        "routes": dict(Counter(r["route"] for r in records if r["route"])),
+    }
+    if latencies:
+        summary.update(
+            {
+                "mean": round(statistics.fmean(latencies), 4),
+                **{f"p{q}": round(percentile(latencies, q), 4) for q in (50, 95, 99)},
+            }
+        )
+    first_tokens = [r["first_token"] for r in records if r["first_token"]]
+    if first_tokens:
+        summary["first_token_p50"] = round(percentile(first_tokens, 50), 4)
+    return summary
+
+
+def print_summary(summary: dict):
+    print(
+        f"\n요청 {summary['requests']}건, {summary['elapsed']:.2f}초 "
+        f"({summary['throughput']:.2f} req/s)"
+    )
+    print(f"상태: {summary['status']}  라우팅: {summary['routes']}")
+    if "p50" in summary:
+        print(
+            f"지연 시간 ms  mean {summary['mean'] * 1000:.1f}  "
+            f"p50 {summary['p50'] * 1000:.1f}  p95 {summary['p95'] * 1000:.1f}  "
+            f"p99 {summary['p99'] * 1000:.1f}"
+        )
+    if "first_token_p50" in summary:
+        print(f"첫 토큰 p50 {summary['first_token_p50'] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="질문 JSONL 일괄 재생")
+    parser.add_argument("input", nargs="?", default=DEFAULT_INPUT)
+    parser.add_argument("--output", "-o", default=DEFAULT_OUTPUT)
+    parser.add_argument("--concurrency", "-c", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1, help="질문 목록 반복 횟수")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="외부 서비스 대신 benchmarks.fakes 대역 사용",
+    )
+    parser.add_argument("--latency-scale", type=float, default=0.1)
+    parser.add_argument("--dim", type=int, default=256)
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency는 1 이상이어야 합니다")
+
+    logging.basicConfig(level=logging.WARNING)
+    if not os.path.exists(args.input):
+        raise SystemExit(f"입력 파일이 없습니다: {args.input}")
+    questions = load_questions(args.input)[: args.limit] * args.repeat
+    if not questions:
+        raise SystemExit(f"재생할 질문이 없습니다: {args.input}")
+
+    postgres = None
+    if args.offline:
+        # 설정을 읽기 전에 오프라인 환경 변수를 구성하므로 여기서 import
+        # (benchmarks.postgres도 config.settings를 읽으므로 benchmarks.run 먼저)
+        from benchmarks.run import install_fakes, load_corpus
+        from benchmarks.postgres import local_postgres
+
+        fakes = install_fakes(args.latency_scale, args.dim)
+        load_corpus(fakes.index, args.dim)
+        postgres = local_postgres(dim=args.dim)
+
+    from config.settings import settings
+    from core.pipeline import RAGApp
+
+    with postgres or nullcontext(None) as uri:
+        if uri:
+            settings.POSTGRES_URI = uri
+        elif args.offline:
+            print("Postgres 픽스처를 사용할 수 없어 rdb 질문은 오류로 기록됩니다.")
+        app = RAGApp()
+        print(
+            f"질문 {len(questions)}건을 동시 {args.concurrency}개로 재생합니다 "
+            f"-> {args.output}"
+        )
+        with open(args.output, "w", encoding="utf-8") as output:
+            started = time.perf_counter()
+            records = asyncio.run(replay(app, questions, args.concurrency, output))
+            elapsed = time.perf_counter() - started
+
+    summary = summarize(records, elapsed)
+    print_summary(summary)
+    sys.exit(1 if summary["status"].get("error") else 0)
+
+
+if __name__ == "__main__":
+    main()
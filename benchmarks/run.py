@@ -0,0 +1,445 @@
+"""오프라인 벤치마크 스위트
+
+외부 서비스(OpenAI, Anthropic, Pinecone, Cohere)를 benchmarks.fakes의 대역으로
+바꾼 뒤 RAGApp.process_query의 단계별 지연 시간, DiversityReorder,
+EmbeddingManager.hybrid_search, VectorProcessor.response를 측정하고
+benchmarks/baselines.json과 비교합니다. 기준선보다 느려진 단계가 있으면
+종료 코드 1로 실패합니다.
+
+    python -m benchmarks.run                     # 측정 + 기준선 비교
+    python -m benchmarks.run --update-baselines  # 기준선 갱신
+
+Postgres가 필요한 항목(rdb 경로, Postgres hybrid_search)은 benchmarks.postgres
+픽스처를 사용할 수 있을 때만 실행됩니다.
+"""
+
+import os
+import tempfile
+
+# 설정 로드 전에 오프라인 환경 구성 (실제 키와 네트워크가 필요 없음)
+for _name in (
+    "OPENAI_API_KEY",
+    "PINECONE_API_KEY",
+    "PINECONE_INDEX_NAME",
+    "PINECONE_ENVIRONMENT",
+    "COHERE_API_KEY",
+    "LANGCHAIN_ENDPOINT",
+    "LANGCHAIN_API_KEY",
+    "LANGCHAIN_PROJECT",
+    "ANTHROPIC_API_KEY",
+):
+    os.environ.setdefault(_name, "offline")
+os.environ.setdefault("POSTGRES_URI", "postgresql://offline@127.0.0.1:1/offline")
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+os.environ["KEYWORD_IDF_PATH"] = ""
+# 커넥션 풀이 생성 시점에 연결하지 않도록 (Postgres 없이도 객체 생성 가능)
+os.environ["POSTGRES_POOL_MIN"] = "0"
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+from streamlit import config as st_config
+from streamlit import logger as st_logger
+
+from benchmarks.bench_hybrid_search import INSTT_WORDS, TITLE_WORDS
+from benchmarks.bench_reorder import make_results
+from benchmarks.fakes import (
+    FakeAsyncCohereClient,
+    FakeChatModel,
+    FakeCohereClient,
+    FakeEmbeddings,
+    FakePinecone,
+    FakeSparseEncoder,
+    InMemoryPineconeIndex,
+    hash_vector,
+)
+from benchmarks.harness import StageTimer, compare, load_baselines, save_baselines
+from benchmarks.postgres import local_postgres
+from config.settings import settings
+from core.session import SessionState
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+NAMESPACE = "R00000000001"
+
+# 실제 서비스의 대략적인 지연 시간 (초) - --latency-scale로 축소
+LATENCY = {
+    "router": (0.5, 0.0),
+    "keywords": (0.4, 0.0),
+    "sql": (1.5, 0.0),
+    "summary": (0.3, 0.01),
+    "response": (0.6, 0.02),
+    "embedding": 0.1,
+    "pinecone": 0.08,
+    "cohere": 0.2,
+}
+
+VECTOR_QUERIES = [
+    f"이 공고의 {topic} 알려줘"
+    for topic in (
+        "참가 자격요건",
+        "제안서 제출 방법",
+        "평가 기준",
+        "사업 기간",
+        "하자보수 조건",
+        "보안 요구사항",
+        "인력 투입 계획",
+        "납품 장소",
+    )
+]
+RDB_QUERIES = [f"{word} 관련 공고 목록을 보여줘" for word in TITLE_WORDS[:8]] + [
+    f"{instt}에서 낸 공고 건수는?" for instt in INSTT_WORDS
+]
+SEARCH_QUERIES = [
+    f"{a} {b} 공고 찾아줘"
+    for a, b in zip(TITLE_WORDS, TITLE_WORDS[7:] + TITLE_WORDS[:7])
+]
+
+# 지연 로드(프롬프트, 형태소 분석기 등)를 측정에서 제외하기 위한 첫 질의
+WARMUP_QUERY = "벤치마크 준비용 질의"
+
+SQL_RESPONSE = """<thought_process>
+1. naramarket_bids에서 공고명 조건으로 조회
+</thought_process>
+<sql>
+SELECT bid_notice_no, bid_notice_nm, dminstt_nm
+FROM naramarket_bids
+WHERE bid_notice_nm ILIKE '%정보시스템%'
+ORDER BY id
+LIMIT 20;
+</sql>"""
+
+RESPONSE_TEXT = (
+    "제안서는 공고서에 명시된 기한까지 국가종합전자조달시스템을 통해 제출해야 하며, "
+    "참가 자격은 소프트웨어사업자로 신고된 업체로 제한됩니다. 평가는 기술능력평가와 "
+    "가격평가를 합산하여 협상적격자를 선정하며, 세부 기준은 제안요청서를 따릅니다. "
+) * 2
+
+
+def _route_responder(prompt: str) -> str:
+    return "rdb" if any(query in prompt for query in RDB_QUERIES) else "vector"
+
+
+RESPONDERS = {
+    "router": _route_responder,
+    "keywords": lambda prompt: '{"search_keywords": ["정보시스템"]}',
+    "sql": lambda prompt: SQL_RESPONSE,
+    "summary": lambda prompt: "정보시스템 관련 공고 20건이 조회되었습니다.",
+    "response": lambda prompt: RESPONSE_TEXT,
+}
+
+
+def install_fakes(scale: float, dim: int) -> SimpleNamespace:
+    """애플리케이션 모듈의 외부 서비스 클래스를 대역으로 바꾸고 싱글톤을 초기화합니다."""
+    import core.database
+    import core.router
+    import cohere
+    import langchain_anthropic
+    import postprocessors.reranker
+    import processors.keyword_extractor
+    import processors.retriever
+    import processors.sql_formatter
+    import processors.vector_processor
+    import utils.embedding_cache
+    import utils.notice_index
+
+    def chat(role):
+        first, per_token = LATENCY[role]
+
+        def factory(*args, **kwargs):
+            # 스케줄러 연결(rate_limiter, 사용량 콜백)은 대역 모델에도 그대로 적용
+            return FakeChatModel(
+                responder=RESPONDERS[role],
+                first_token_latency=first * scale,
+                token_latency=per_token * scale,
+                rate_limiter=kwargs.get("rate_limiter"),
+                callbacks=kwargs.get("callbacks"),
+            )
+
+        return factory
+
+    index = InMemoryPineconeIndex(latency=LATENCY["pinecone"] * scale)
+    FakePinecone.index = index
+    FakeCohereClient.latency = LATENCY["cohere"] * scale
+
+    core.router.ChatOpenAI = chat("router")
+    processors.keyword_extractor.ChatOpenAI = chat("keywords")
+    # SQLProcessor와 재순위화기는 사용할 때 import하므로 원래 모듈의 클래스를 교체
+    langchain_anthropic.ChatAnthropic = chat("sql")
+    cohere.Client = FakeCohereClient
+    cohere.AsyncClient = FakeAsyncCohereClient
+    processors.sql_formatter.ChatOpenAI = chat("summary")
+    processors.vector_processor.ChatOpenAI = chat("response")
+    utils.embedding_cache.OpenAIEmbeddings = lambda *args, **kwargs: FakeEmbeddings(
+        dim=dim, latency=LATENCY["embedding"] * scale
+    )
+    processors.retriever.Pinecone = FakePinecone
+    processors.retriever.BM25Encoder = FakeSparseEncoder
+
+    # 이전 설정으로 만들어진 프로세스 전역 객체 초기화
+    utils.embedding_cache._cache = None
+    utils.embedding_cache._embeddings.clear()
+    processors.retriever._index = None
+    processors.retriever._sparse_encoder = None
+    processors.retriever._pool = None
+    postprocessors.reranker._reranker = None
+    utils.notice_index._index = None
+    core.database._pool = None
+    return SimpleNamespace(index=index)
+
+
+def load_corpus(index: InMemoryPineconeIndex, dim: int, chunks: int = 300):
+    """선택된 공고 네임스페이스에 합성 제안요청서 청크를 적재합니다."""
+    picker = random.Random(0)
+    words = RESPONSE_TEXT.split() + [q.split()[2] for q in VECTOR_QUERIES]
+    sparse = FakeSparseEncoder()
+    vectors = []
+    for i in range(chunks):
+        text = " ".join(picker.choices(words, k=60))
+        vectors.append(
+            {
+                "id": f"{NAMESPACE}-{i}",
+                "values": hash_vector(text, dim).tolist(),
+                "sparse_values": sparse.encode_documents(text),
+                "metadata": {
+                    "context": text,
+                    "file_name": "제안요청서.pdf",
+                    "page": i // 3 + 1,
+                    "type": "table" if i % 10 == 0 else "text",
+                },
+            }
+        )
+    index.upsert(vectors, namespace=NAMESPACE)
+
+
+def _consume(stream) -> str:
+    return "".join(getattr(chunk, "content", chunk) for chunk in stream)
+
+
+def case_process_query_vector(app, iterations: int) -> StageTimer:
+    from postprocessors.reranker import CohereDocumentReranker
+    from processors.retriever import HybridRetriever
+
+    session = SessionState(selected_bid_no=NAMESPACE)
+    _consume(app.process_query(WARMUP_QUERY, session)[0])
+    timer = StageTimer()
+    timer.instrument(app.router, "route", "route")
+    timer.instrument(HybridRetriever, "retrieve", "vector.retrieve")
+    timer.instrument(CohereDocumentReranker, "rerank", "vector.rerank")
+    timer.instrument(app.vector_processor, "response", "vector.response")
+    try:
+        for i in range(iterations):
+            query = VECTOR_QUERIES[i % len(VECTOR_QUERIES)]
+            with timer.measure("total"):
+                stream, db_type = app.process_query(query, session)
+                assert db_type == "vector", db_type
+                _consume(stream)
+    finally:
+        timer.restore()
+    return timer
+
+
+def case_process_query_rdb(app, iterations: int) -> StageTimer:
+    _consume(app.process_query(RDB_QUERIES[-1])[0])
+    timer = StageTimer()
+    timer.instrument(app.router, "route", "route")
+    timer.instrument(app.sql_processor, "_generate_sql", "sql.generate")
+    timer.instrument(app.sql_processor, "_run", "sql.execute")
+    timer.instrument(app.sql_formatter, "format_result", "sql.format")
+    try:
+        for i in range(iterations):
+            query = RDB_QUERIES[i % len(RDB_QUERIES)]
+            with timer.measure("total"):
+                stream, db_type = app.process_query(query)
+                assert db_type == "rdb", db_type
+                _consume(stream)
+    finally:
+        timer.restore()
+    return timer
+
+
+def case_reorder(iterations: int) -> StageTimer:
+    from models.schema import ProcessedResult
+    from postprocessors.reorder import DiversityReorder
+
+    timer = StageTimer()
+    results = make_results(100, 120)
+    reorder = DiversityReorder(top_k=10)
+    loop = asyncio.new_event_loop()
+    try:
+        for _ in range(iterations):
+            result = ProcessedResult(results=results, source_type="vector")
+            with timer.measure("process[100->10]"):
+                loop.run_until_complete(reorder.process(result))
+    finally:
+        loop.close()
+    return timer
+
+
+def _hybrid_search(iterations: int) -> StageTimer:
+    from utils.embedding_utils import EmbeddingManager
+    from utils.notice_index import NoticeIndex
+
+    manager = EmbeddingManager()
+    # 형태소 분석기 로드 등 첫 호출 비용은 측정에서 제외
+    manager.hybrid_search(WARMUP_QUERY, limit=5)
+    timer = StageTimer()
+    timer.instrument(manager.keyword_extractor, "extract", "keywords")
+    timer.instrument(manager.embeddings, "embed_query", "embedding")
+    timer.instrument(NoticeIndex, "search", "notice_index.search")
+    try:
+        for i in range(iterations):
+            with timer.measure("total"):
+                result = manager.hybrid_search(
+                    SEARCH_QUERIES[i % len(SEARCH_QUERIES)], limit=5
+                )
+            assert "error" not in result, result.get("error")
+    finally:
+        timer.restore()
+    return timer
+
+
+def case_hybrid_search_index(iterations: int, dim: int, rows: int) -> StageTimer:
+    from benchmarks.bench_notice_index import synthetic_rows
+    from utils.notice_index import NoticeIndex
+
+    with tempfile.TemporaryDirectory() as path:
+        settings.NOTICE_INDEX_ENABLED = True
+        settings.NOTICE_INDEX_PATH = path
+        settings.NOTICE_INDEX_DIM = dim
+        writer = NoticeIndex(path, dim)
+        for start in range(0, rows, 10_000):
+            batch = synthetic_rows(min(10_000, rows - start), dim, start + 1, start)
+            # 검색 질의와 같은 해시 임베딩 공간에 두어 유사도 필터를 통과하도록
+            for row in batch:
+                row["content_embedding"] = hash_vector(row["bid_notice_nm"], dim)
+            writer.append(batch)
+        try:
+            return _hybrid_search(iterations)
+        finally:
+            settings.NOTICE_INDEX_ENABLED = False
+
+
+def case_vector_response(iterations: int) -> StageTimer:
+    from models.schema import ProcessedResult, QueryResult
+    from processors.vector_processor import VectorProcessor
+
+    processor = VectorProcessor()
+    result = ProcessedResult(
+        results=[
+            QueryResult(
+                content=RESPONSE_TEXT,
+                metadata={"file_name": "제안요청서.pdf", "page": i, "type": "text"},
+            )
+            for i in range(5)
+        ],
+        source_type="vector",
+    )
+    _consume(processor.response(WARMUP_QUERY, result))
+    timer = StageTimer()
+    timer.instrument(processor, "response", "response")
+    try:
+        for i in range(iterations):
+            query = VECTOR_QUERIES[i % len(VECTOR_QUERIES)]
+            _consume(processor.response(query, result))
+    finally:
+        timer.restore()
+    return timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 벤치마크 스위트")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=0.1,
+        help="대역 서비스 지연 시간 배율 (1.0이면 실제 서비스와 비슷)",
+    )
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--index-rows", type=int, default=20_000)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--slack-ms", type=float, default=2.0)
+    parser.add_argument("--baselines", default=BASELINE_PATH)
+    parser.add_argument("--update-baselines", action="store_true")
+    parser.add_argument("--no-postgres", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # bare 모드 실행 경고(missing ScriptRunContext) 숨김 - 설정 파싱 시 로그
+    # 수준이 재설정되므로 설정을 먼저 읽은 뒤 변경
+    st_config.get_option("logger.level")
+    st_logger.set_log_level("error")
+
+    config = {"latency_scale": args.latency_scale, "dim": args.dim}
+    baselines = load_baselines(args.baselines)
+    if baselines and baselines["config"] != config and not args.update_baselines:
+        print(f"기준선 설정 {baselines['config']}과 현재 설정 {config}이 다릅니다.")
+        sys.exit(2)
+
+    fakes = install_fakes(args.latency_scale, args.dim)
+    from core.pipeline import RAGApp
+
+    load_corpus(fakes.index, args.dim)
+
+    timers = {}
+    postgres = local_postgres(dim=args.dim) if not args.no_postgres else None
+    with postgres or nullcontext(None) as uri:
+        if uri:
+            settings.POSTGRES_URI = uri
+        # 구성 요소는 처음 사용할 때 생성되므로 Postgres 없이도 vector 경로 측정 가능
+        app = RAGApp()
+
+        timers["process_query[vector]"] = case_process_query_vector(
+            app, args.iterations
+        )
+        timers["vector_processor.response"] = case_vector_response(args.iterations)
+        timers["diversity_reorder"] = case_reorder(args.iterations)
+        timers["hybrid_search[notice_index]"] = case_hybrid_search_index(
+            args.iterations, args.dim, args.index_rows
+        )
+        if uri:
+            timers["process_query[rdb]"] = case_process_query_rdb(app, args.iterations)
+            timers["hybrid_search[postgres]"] = _hybrid_search(args.iterations)
+        else:
+            print("Postgres 픽스처를 사용할 수 없어 rdb/Postgres 항목은 건너뜁니다.")
+
+    results = {
+        f"{case}/{stage}": stats
+        for case, timer in timers.items()
+        for stage, stats in timer.summary().items()
+    }
+    print(f"{'단계':<60} {'n':>4} {'p50 ms':>10} {'p95 ms':>10}")
+    for key, stats in results.items():
+        print(
+            f"{key:<60} {stats['n']:>4} {stats['p50_ms']:>10.2f} "
+            f"{stats['p95_ms']:>10.2f}"
+        )
+
+    if args.update_baselines:
+        previous = baselines["results"] if baselines else {}
+        # 이번에 건너뛴 항목의 기존 기준선은 유지
+        save_baselines(args.baselines, {**previous, **results}, config)
+        print(f"기준선 저장: {args.baselines}")
+        return
+    if not baselines:
+        print("기준선이 없습니다. --update-baselines로 먼저 생성하세요.")
+        return
+
+    regressions = compare(results, baselines["results"], args.tolerance, args.slack_ms)
+    if regressions:
+        print("\n성능 회귀:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\n모든 단계가 기준선 이내입니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,108 @@ class Settings(BaseSettings):
     LANGCHAIN_PROJECT: str
     ANTHROPIC_API_KEY: str
 
+    # 라우팅 캐시 설정
+    ROUTE_CACHE_SIZE: int = 1024
+    ROUTE_CACHE_TTL: int = 3600
+    ROUTE_CACHE_THRESHOLD: float = 0.95
+    ROUTE_CACHE_SEMANTIC: bool = True
+
+    # 임베딩 캐시 설정 (경로를 비우면 디스크 캐시 비활성화)
+    EMBEDDING_CACHE_PATH: str = ".cache/embeddings.sqlite"
+    EMBEDDING_CACHE_MEMORY_SIZE: int = 10000
+
+    # 네임스페이스별 리트리버 풀 설정
+    RETRIEVER_POOL_SIZE: int = 64
+    RETRIEVER_POOL_TTL: int = 1800
+
+    # 공유 Postgres 커넥션 풀 설정
+    POSTGRES_POOL_MIN: int = 1
+    POSTGRES_POOL_MAX: int = 10
+    POSTGRES_POOL_TIMEOUT: float = 10.0
+    POSTGRES_STATEMENT_TIMEOUT_MS: int = 15000
+    # 생성된 SQL 실행에 적용할 문장별 timeout
+    SQL_STATEMENT_TIMEOUT_MS: int = 10000
+    # 생성된 SQL 결과의 최대 행 수와 서버 측 커서에서 한 번에 가져올 행 수
+    SQL_MAX_ROWS: int = 500
+    SQL_FETCH_BATCH_SIZE: int = 100
+
+    # 생성된 SQL 계획 캐시 설정
+    SQL_PLAN_CACHE_SIZE: int = 512
+    SQL_PLAN_CACHE_TTL: int = 86400
+
+    # SQL 결과 캐시 설정 (테이블 버전 조회 주기, 메모리 예산)
+    TABLE_VERSION_REFRESH_INTERVAL: float = 30.0
+    SQL_RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    # 버전이 한 번도 기록되지 않은 테이블을 참조하는 결과의 유효 시간 (초)
+    SQL_RESULT_CACHE_UNVERSIONED_TTL: float = 300.0
+
+    # SQL 프롬프트 동적 few-shot 예시 선택 (예시 수, 예시 토큰 예산)
+    SQL_FEWSHOT_ENABLED: bool = True
+    SQL_FEWSHOT_K: int = 3
+    SQL_FEWSHOT_TOKEN_BUDGET: int = 600
+
+    # 라우팅과 rdb/vector 분기 동시 실행 (비동기 파이프라인 전용)
+    SPECULATIVE_EXECUTION: bool = False
+    SPECULATION_CONFIDENCE: float = 0.9
+
+    # 프로세스 내 공고 검색 인덱스 (utils.notice_index, 기본 비활성)
+    NOTICE_INDEX_ENABLED: bool = False
+    NOTICE_INDEX_PATH: str = ".cache/notice_index"
+    NOTICE_INDEX_DIM: int = 1536
+    NOTICE_INDEX_NPROBE: int = 8
+    NOTICE_INDEX_BRUTE_FORCE_LIMIT: int = 20000
+    NOTICE_INDEX_REFRESH_INTERVAL: float = 10.0
+
+    # 공고 하이브리드 검색의 HNSW 후보 수 (pgvector hnsw.ef_search)
+    HYBRID_SEARCH_EF_SEARCH: int = 100
+
+    # 로컬 키워드 추출 (신뢰도가 낮을 때만 LLM 사용)
+    KEYWORD_LOCAL_ENABLED: bool = True
+    KEYWORD_CONFIDENCE_THRESHOLD: float = 0.5
+    KEYWORD_IDF_PATH: str = ".cache/title_idf.json"
+    KEYWORD_CACHE_SIZE: int = 4096
+    KEYWORD_CACHE_TTL: int = 86400
+
+    # 단계별 지연 시간 메트릭 엔드포인트 (포트 0이면 비활성)
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 0
+    # 분위수 계산에 사용할 단계별 최근 관측값 수
+    METRICS_WINDOW: int = 1024
+
+    # 헤드리스 HTTP API (python -m api)
+    API_HOST: str = "127.0.0.1"
+    API_PORT: int = 8000
+    API_WORKERS: int = 1
+    # 설정하면 Streamlit UI가 파이프라인을 직접 실행하지 않고 이 API를 호출
+    RAG_API_URL: str = ""
+    RAG_API_TIMEOUT: float = 120.0
+
+    # 세션 상태 저장소 (memory, sqlite, redis)와 유휴 세션 만료 시간
+    SESSION_BACKEND: str = "memory"
+    SESSION_TTL: int = 21600
+    SESSION_MAX_ENTRIES: int = 10000
+    SESSION_SQLITE_PATH: str = ".cache/sessions.db"
+    SESSION_REDIS_URL: str = "redis://127.0.0.1:6379/0"
+
+    # 동시에 들어온 같은 입력의 LLM/임베딩/검색 호출을 하나로 합치기
+    SINGLEFLIGHT_ENABLED: bool = True
+
+    # 모델 API 호출 스케줄러 (제공자별 분당 요청/토큰 한도, 0이면 무제한)
+    SCHEDULER_ENABLED: bool = True
+    OPENAI_RPM: int = 500
+    OPENAI_TPM: int = 200000
+    ANTHROPIC_RPM: int = 50
+    ANTHROPIC_TPM: int = 40000
+    COHERE_RPM: int = 1000
+    # 버킷 크기 (몇 초 분량의 한도까지 몰아서 보낼지)
+    SCHEDULER_BURST_SECONDS: float = 10.0
+    # 대기열에서 기다리는 최대 시간
+    SCHEDULER_MAX_WAIT: float = 60.0
+    # 일시적 오류(429, 5xx, 연결 오류) 재시도 (첫 시도 포함 횟수, 백오프 초)
+    SCHEDULER_MAX_ATTEMPTS: int = 4
+    SCHEDULER_BACKOFF_BASE: float = 0.5
+    SCHEDULER_BACKOFF_MAX: float = 20.0
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,470 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Optional, Sequence
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+from psycopg2.extras import RealDictCursor
+
+from config.settings import settings
+from core.exceptions import PoolTimeoutError
+
+
+async def _wait(conn):
+    """psycopg2 비동기 커넥션의 I/O 준비를 이벤트 루프에서 기다립니다."""
+    loop = asyncio.get_running_loop()
+    fd = conn.fileno()
+    while True:
+        state = conn.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            return
+
+        future = loop.create_future()
+
+        def ready():
+            if not future.done():
+                future.set_result(None)
+
+        if state == psycopg2.extensions.POLL_READ:
+            loop.add_reader(fd, ready)
+            try:
+                await future
+            finally:
+                loop.remove_reader(fd)
+        elif state == psycopg2.extensions.POLL_WRITE:
+            loop.add_writer(fd, ready)
+            try:
+                await future
+            finally:
+                loop.remove_writer(fd)
+        else:
+            raise psycopg2.OperationalError(f"알 수 없는 poll 상태: {state}")
+
+
+class AsyncConnection:
+    """psycopg2 비동기 모드 기반의 asyncio Postgres 커넥션
+
+    비동기 커넥션은 항상 autocommit이며 한 번에 하나의 쿼리만 실행할 수 있으므로
+    내부 락으로 직렬화합니다.
+    """
+
+    def __init__(self, dsn: Optional[str] = None, **connect_kwargs):
+        self.dsn = dsn or settings.POSTGRES_URI
+        self.connect_kwargs = connect_kwargs
+        self._conn = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self._conn is None or bool(self._conn.closed)
+
+    async def connect(self):
+        if self.closed:
+            self._conn = psycopg2.connect(self.dsn, async_=True, **self.connect_kwargs)
+            await _wait(self._conn)
+        return self
+
+    async def fetchall(
+        self, query: str, params: Optional[Sequence[Any]] = None, dict_rows=True
+    ) -> list:
+        """쿼리를 실행하고 전체 결과를 반환합니다."""
+        async with self._lock:
+            await self.connect()
+            cursor_factory = RealDictCursor if dict_rows else None
+            cur = self._conn.cursor(cursor_factory=cursor_factory)
+            try:
+                cur.execute(query, params)
+                await _wait(self._conn)
+                return cur.fetchall() if cur.description else []
+            except BaseException:
+                # 취소/오류 시 커넥션 상태를 알 수 없으므로 폐기 후 재연결
+                self._conn.close()
+                raise
+            finally:
+                cur.close()
+
+    async def close(self):
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+        self._conn = None
+
+
+def _session_options(statement_timeout_ms: int) -> str:
+    """커넥션 생성 시 적용할 기본 세션 옵션"""
+    return f"-c statement_timeout={int(statement_timeout_ms)}"
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """close() 호출 시 실제로 닫지 않고 풀에 반환하는 커넥션
+
+    SQLAlchemy 엔진(creator=pool.borrow)도 같은 풀을 사용할 수 있도록 합니다.
+    """
+
+    pool: Optional["ConnectionPool"] = None
+
+    def close(self):
+        if self.pool is not None and not self.closed:
+            self.pool.release(self)
+        else:
+            super().close()
+
+    def terminate(self):
+        """풀을 거치지 않고 커넥션을 실제로 닫습니다."""
+        super().close()
+
+
+class ConnectionPool:
+    """프로세스 전역에서 공유하는 psycopg2 커넥션 풀
+
+    최대 크기를 넘으면 timeout 동안 반환을 기다리고, 오래 쉬던 커넥션은
+    빌려주기 전에 SELECT 1로 상태를 확인합니다. 모든 커넥션은 기본
+    statement_timeout을 가지며, 빌릴 때 읽기 전용 여부와 문장별 timeout을
+    지정할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        minsize: int = 1,
+        maxsize: int = 10,
+        timeout: float = 10.0,
+        statement_timeout_ms: int = 15000,
+        healthcheck_interval: float = 30.0,
+    ):
+        self.dsn = dsn or settings.POSTGRES_URI
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self.healthcheck_interval = healthcheck_interval
+
+        self._idle: deque = deque()
+        self._slots = threading.BoundedSemaphore(maxsize)
+        self._lock = threading.Lock()
+        self._size = 0
+        self.stats = {"borrowed": 0, "created": 0, "discarded": 0, "timeouts": 0}
+
+        for _ in range(minsize):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self) -> PooledConnection:
+        conn = psycopg2.connect(
+            self.dsn,
+            connection_factory=PooledConnection,
+            options=_session_options(self.statement_timeout_ms),
+        )
+        conn.pool = self
+        with self._lock:
+            self._size += 1
+            self.stats["created"] += 1
+        return conn
+
+    def _discard(self, conn: PooledConnection):
+        with self._lock:
+            self._size -= 1
+            self.stats["discarded"] += 1
+        try:
+            conn.terminate()
+        except Exception:
+            pass
+
+    def _healthy(self, conn: PooledConnection, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.healthcheck_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception as e:
+            logging.warning(f"Postgres 커넥션 상태 확인 실패: {e}")
+            return False
+
+    def borrow(self) -> PooledConnection:
+        """커넥션을 빌립니다. 사용 후 close() 또는 release()로 반환해야 합니다."""
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise PoolTimeoutError(
+                f"{self.timeout}초 안에 Postgres 커넥션을 얻지 못했습니다."
+            )
+        try:
+            while True:
+                with self._lock:
+                    item = self._idle.pop() if self._idle else None
+                if item is None:
+                    conn = self._connect()
+                    break
+                conn, idle_since = item
+                if self._healthy(conn, idle_since):
+                    break
+                self._discard(conn)
+            with self._lock:
+                self.stats["borrowed"] += 1
+            return conn
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: PooledConnection, discard: bool = False):
+        """열린 트랜잭션을 롤백하고 세션 설정을 복구한 뒤 풀에 반환합니다."""
+        try:
+            if not discard and not conn.closed:
+                try:
+                    if (
+                        conn.get_transaction_status()
+                        != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+                    ):
+                        conn.rollback()
+                    conn.autocommit = False
+                    conn.readonly = None
+                except Exception:
+                    discard = True
+            if discard or conn.closed:
+                self._discard(conn)
+                return
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, readonly: bool = False, statement_timeout_ms: int = None):
+        """커넥션을 빌려 트랜잭션 하나를 실행합니다.
+
+        정상 종료 시 커밋, 예외 시 롤백하며 세션 설정은 반환 시 복구됩니다.
+        """
+        conn = self.borrow()
+        discard = False
+        try:
+            conn.readonly = readonly
+            if statement_timeout_ms is not None:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "SELECT set_config('statement_timeout', %s, true)",
+                        (str(int(statement_timeout_ms)),),
+                    )
+            yield conn
+            conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.release(conn, discard)
+
+    @contextmanager
+    def dedicated(self):
+        """풀 밖의 전용 커넥션을 엽니다 (백필처럼 오래 걸리는 작업용).
+
+        풀의 슬롯을 차지하지 않으며, 커밋은 호출자가 관리하고 종료 시 닫습니다.
+        """
+        conn = psycopg2.connect(
+            self.dsn, options=_session_options(self.statement_timeout_ms)
+        )
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {"size": self._size, "idle": len(self._idle), **self.stats}
+
+    def close(self):
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+class AsyncConnectionPool:
+    """이벤트 루프별 AsyncConnection 풀"""
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        maxsize: int = 10,
+        timeout: float = 10.0,
+        statement_timeout_ms: int = 15000,
+    ):
+        self.dsn = dsn or settings.POSTGRES_URI
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self._idle: deque = deque()
+        self._slots = asyncio.Semaphore(maxsize)
+
+    @asynccontextmanager
+    async def connection(self):
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeoutError(
+                f"{self.timeout}초 안에 Postgres 커넥션을 얻지 못했습니다."
+            )
+        conn = None
+        try:
+            while self._idle and conn is None:
+                candidate = self._idle.pop()
+                if not candidate.closed:
+                    conn = candidate
+            if conn is None:
+                conn = AsyncConnection(
+                    self.dsn, options=_session_options(self.statement_timeout_ms)
+                )
+            await conn.connect()
+            yield conn
+        finally:
+            # 오류로 닫힌 커넥션은 풀에 돌려놓지 않음
+            if conn is not None and not conn.closed:
+                self._idle.append(conn)
+            self._slots.release()
+
+    async def fetchall(self, query: str, params: Optional[Sequence[Any]] = None):
+        async with self.connection() as conn:
+            return await conn.fetchall(query, params)
+
+    async def close(self):
+        while self._idle:
+            await self._idle.pop().close()
+
+
+class TableVersions:
+    """테이블별 데이터 버전 카운터
+
+    데이터 적재 작업이 bump()로 table_versions 테이블의 버전을 올리면, 캐시는
+    refresh_interval마다 한 번만 버전을 다시 읽어 무효화 여부를 판단합니다.
+    naramarket_bids, bid_result_* 테이블을 쓰는 적재 작업은 반드시 커밋 후
+    bump_table_version을 호출해야 하며, 버전이 없는 테이블의 결과는
+    SQL_RESULT_CACHE_UNVERSIONED_TTL 동안만 캐시됩니다.
+    """
+
+    def __init__(self, pool: ConnectionPool, refresh_interval: float = 30.0):
+        self.pool = pool
+        self.refresh_interval = refresh_interval
+        self.versions: dict[str, int] = {}
+        self._fetched_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            with self.pool.connection(readonly=True) as conn, conn.cursor() as cur:
+                cur.execute("SELECT table_name, version FROM table_versions")
+                versions = dict(cur.fetchall())
+        except psycopg2.errors.UndefinedTable:
+            # 아직 한 번도 bump되지 않은 경우
+            versions = {}
+        except Exception as e:
+            # 조회 실패 시 기존 버전을 유지하고 다음 주기에 다시 시도
+            logging.warning(f"테이블 버전 조회 실패: {e}")
+            self._fetched_at = time.monotonic()
+            return
+        with self._lock:
+            for table, version in versions.items():
+                self.versions[table] = max(self.versions.get(table, 0), version)
+            self._fetched_at = time.monotonic()
+
+    def snapshot(self, tables) -> tuple:
+        """주어진 테이블들의 현재 버전을 반환합니다."""
+        if time.monotonic() - self._fetched_at > self.refresh_interval:
+            self._refresh()
+        return tuple((table, self.versions.get(table, 0)) for table in sorted(tables))
+
+    def bump(self, *tables: str):
+        """데이터 적재 후 호출하여 관련 캐시를 무효화합니다."""
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS table_versions (
+                    table_name TEXT PRIMARY KEY,
+                    version BIGINT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+                """
+            )
+            for table in tables:
+                cur.execute(
+                    """
+                    INSERT INTO table_versions (table_name, version)
+                    VALUES (%s, 1)
+                    ON CONFLICT (table_name)
+                    DO UPDATE SET
+                        version = table_versions.version + 1,
+                        updated_at = now()
+                    RETURNING version
+                    """,
+                    (table,),
+                )
+                version = cur.fetchone()[0]
+                with self._lock:
+                    self.versions[table] = max(self.versions.get(table, 0), version)
+
+
+_pool: Optional[ConnectionPool] = None
+_table_versions: Optional[TableVersions] = None
+_async_pools: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """프로세스 전역 Postgres 커넥션 풀을 반환합니다."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                settings.POSTGRES_URI,
+                minsize=settings.POSTGRES_POOL_MIN,
+                maxsize=settings.POSTGRES_POOL_MAX,
+                timeout=settings.POSTGRES_POOL_TIMEOUT,
+                statement_timeout_ms=settings.POSTGRES_STATEMENT_TIMEOUT_MS,
+            )
+        return _pool
+
+
+def get_async_pool() -> AsyncConnectionPool:
+    """현재 이벤트 루프에서 공유하는 비동기 커넥션 풀을 반환합니다."""
+    loop = asyncio.get_running_loop()
+    with _pool_lock:
+        pool = _async_pools.get(loop)
+        if pool is None:
+            pool = AsyncConnectionPool(
+                settings.POSTGRES_URI,
+                maxsize=settings.POSTGRES_POOL_MAX,
+                timeout=settings.POSTGRES_POOL_TIMEOUT,
+                statement_timeout_ms=settings.POSTGRES_STATEMENT_TIMEOUT_MS,
+            )
+            _async_pools[loop] = pool
+        return pool
+
+
+def get_table_versions() -> TableVersions:
+    """프로세스 전역 테이블 버전 카운터를 반환합니다."""
+    global _table_versions
+    pool = get_pool()
+    with _pool_lock:
+        if _table_versions is None:
+            _table_versions = TableVersions(
+                pool, refresh_interval=settings.TABLE_VERSION_REFRESH_INTERVAL
+            )
+        return _table_versions
+
+
+def bump_table_version(*tables: str):
+    """데이터 적재 작업에서 커밋 후 호출하여 테이블 버전을 올립니다.
+
+    이 저장소 밖의 적재 작업(공고/개찰 결과 수집)도 반드시 호출해야 SQL 결과
+    캐시가 바로 무효화됩니다.
+    """
+    get_table_versions().bump(*tables)
@@ -0,0 +1,18 @@
+class DatabaseError(Exception):
+    """데이터베이스 접근 관련 오류"""
+
+
+class PoolTimeoutError(DatabaseError):
+    """커넥션 풀에서 제한 시간 안에 커넥션을 얻지 못한 경우"""
+
+
+class APIError(Exception):
+    """헤드리스 API 호출이 실패하거나 오류 이벤트를 보낸 경우"""
+
+
+class SessionStoreError(Exception):
+    """세션 저장소에 접근하지 못한 경우"""
+
+
+class SchedulerTimeoutError(Exception):
+    """모델 API 호출이 스케줄러 대기열에서 제한 시간 안에 차례를 얻지 못한 경우"""
@@ -0,0 +1,444 @@
+"""파이프라인 단계별 지연 시간과 카운터 수집
+
+각 단계(라우팅, 키워드 추출, 임베딩, 검색, 재순위화, SQL 생성/실행, 답변
+스트리밍)를 span으로 측정해 단계별 히스토그램(p50/p95/p99)에 모으고,
+LLM 토큰 사용량과 캐시 적중을 카운터로, 대기열 길이 등 현재 값을 게이지로
+집계합니다. 집계 결과는 Prometheus
+텍스트/JSON HTTP 엔드포인트와 Streamlit 사이드바에서 확인할 수 있습니다.
+엔드포인트는 인증이 없으므로 METRICS_PORT를 지정한 경우에만 시작합니다.
+
+    METRICS_PORT=9464 streamlit run streamlit_app.py
+    curl localhost:9464/metrics       # Prometheus 텍스트 형식
+    curl localhost:9464/metrics.json  # JSON (최근 요청별 단계 소요 시간 포함)
+"""
+
+import bisect
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+import numpy as np
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+from config.settings import settings
+
+# 히스토그램 버킷 경계 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUANTILES = (0.5, 0.95, 0.99)
+PREFIX = "rag"
+
+
+class Histogram:
+    """누적 버킷(Prometheus용)과 최근 관측값 창(분위수용)을 함께 유지합니다."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window: int = 1024):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.sum += seconds
+            self.recent.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = np.fromiter(self.recent, dtype=np.float64)
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        quantiles = (
+            np.quantile(recent, QUANTILES) if len(recent) else [0.0] * len(QUANTILES)
+        )
+        return {
+            "count": count,
+            "sum": total,
+            **{f"p{round(q * 100)}": float(v) for q, v in zip(QUANTILES, quantiles)},
+            "buckets": dict(zip([*self.buckets, float("inf")], np.cumsum(counts))),
+        }
+
+
+class Trace:
+    """요청 하나가 단계별로 소비한 시간"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.spans: list[tuple[str, float]] = []
+        self.total: Optional[float] = None
+
+    def add(self, stage: str, seconds: float):
+        self.spans.append((stage, seconds))
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "started": self.started,
+            "total": self.total,
+            "spans": [{"stage": s, "seconds": round(v, 4)} for s, v in self.spans],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("rag_trace", default=None)
+
+
+def _content(chunk) -> Any:
+    return getattr(chunk, "content", chunk)
+
+
+def _escape(value) -> str:
+    """Prometheus 레이블 값 이스케이프"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """단계별 히스토그램, 카운터, 게이지, 최근 요청 기록"""
+
+    def __init__(self, window: int = 1024, recent_traces: int = 20):
+        self.window = window
+        self.histograms: dict[str, Histogram] = {}
+        self.counters: dict[tuple[str, tuple], float] = {}
+        self.gauges: dict[tuple[str, tuple], float] = {}
+        self.traces: deque[Trace] = deque(maxlen=recent_traces)
+        self._lock = threading.Lock()
+
+    # ---- 기록 ----
+
+    def observe(self, stage: str, seconds: float, trace: Optional[Trace] = None):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(
+                    stage, Histogram(window=self.window)
+                )
+        histogram.observe(seconds)
+        trace = trace or _current_trace.get()
+        if trace is not None:
+            trace.add(stage, seconds)
+
+    def incr(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.gauges[key] = value
+
+    @contextmanager
+    def span(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    @contextmanager
+    def trace(self, name: Optional[str] = None):
+        """with 블록 안의 span을 하나의 요청 기록으로 묶습니다.
+
+        기록은 인증 없는 /metrics.json으로 노출되므로 이름에 사용자 질문을 넣지
+        않으며, 생략하면 무작위 요청 id를 사용합니다.
+        """
+        trace = Trace(name or uuid.uuid4().hex[:16])
+        token = _current_trace.set(trace)
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            _current_trace.reset(token)
+            trace.total = time.perf_counter() - started
+            self.observe("request", trace.total)
+            self.traces.append(trace)
+
+    def observe_stream(self, stage: str, stream):
+        """스트림을 감싸 첫 토큰까지의 시간과 전체 시간을 기록합니다."""
+        trace = _current_trace.get()
+        started = time.perf_counter()
+        first = True
+        try:
+            for chunk in stream:
+                if first and _content(chunk):
+                    self.observe(
+                        f"{stage}.first_token", time.perf_counter() - started, trace
+                    )
+                    first = False
+                yield chunk
+        finally:
+            self.observe(stage, time.perf_counter() - started, trace)
+
+    async def aobserve_stream(self, stage: str, stream):
+        """observe_stream의 비동기 버전"""
+        trace = _current_trace.get()
+        started = time.perf_counter()
+        first = True
+        try:
+            async for chunk in stream:
+                if first and _content(chunk):
+                    self.observe(
+                        f"{stage}.first_token", time.perf_counter() - started, trace
+                    )
+                    first = False
+                yield chunk
+        finally:
+            self.observe(stage, time.perf_counter() - started, trace)
+
+    # ---- 내보내기 ----
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        stages = {}
+        for stage, histogram in sorted(histograms.items()):
+            stats = histogram.snapshot()
+            stats.pop("buckets")
+            stages[stage] = {
+                k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items()
+            }
+        return {
+            "stages": stages,
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+            "gauges": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(gauges.items())
+            ],
+            "recent": [trace.as_dict() for trace in reversed(self.traces)],
+        }
+
+    def to_prometheus(self) -> str:
+        def fmt_labels(labels) -> str:
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+        with self._lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+
+        lines = []
+        name = f"{PREFIX}_stage_duration_seconds"
+        lines.append(f"# HELP {name} 파이프라인 단계별 소요 시간")
+        lines.append(f"# TYPE {name} histogram")
+        snapshots = {s: h.snapshot() for s, h in sorted(histograms.items())}
+        for stage, stats in snapshots.items():
+            for bound, count in stats["buckets"].items():
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                labels = fmt_labels([("stage", stage), ("le", le)])
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = fmt_labels([("stage", stage)])
+            lines.append(f"{name}_sum{labels} {stats['sum']}")
+            lines.append(f"{name}_count{labels} {stats['count']}")
+
+        quantile_name = f"{PREFIX}_stage_duration_quantile_seconds"
+        lines.append(f"# HELP {quantile_name} 최근 관측값 기준 단계별 분위수")
+        lines.append(f"# TYPE {quantile_name} gauge")
+        for stage, stats in snapshots.items():
+            for q in QUANTILES:
+                labels = fmt_labels([("stage", stage), ("quantile", str(q))])
+                lines.append(f"{quantile_name}{labels} {stats[f'p{round(q * 100)}']}")
+
+        families: dict[str, list] = {}
+        for (counter, labels), value in sorted(counters.items()):
+            families.setdefault(counter, []).append((labels, value))
+        for counter, samples in families.items():
+            metric = f"{PREFIX}_{counter}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in samples:
+                lines.append(f"{metric}{fmt_labels(labels)} {value}")
+
+        families = {}
+        for (gauge, labels), value in sorted(gauges.items()):
+            families.setdefault(gauge, []).append((labels, value))
+        for gauge, samples in families.items():
+            metric = f"{PREFIX}_{gauge}"
+            lines.append(f"# TYPE {metric} gauge")
+            for labels, value in samples:
+                lines.append(f"{metric}{fmt_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def llm_usage(response) -> tuple[int, int]:
+    """LLMResult의 (입력, 출력) 토큰 수 (사용량 정보가 없으면 0)"""
+    input_tokens = output_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None) or {}
+            input_tokens += usage.get("input_tokens", 0)
+            output_tokens += usage.get("output_tokens", 0)
+    return input_tokens, output_tokens
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """모든 LLM 호출의 모델별 토큰 사용량을 집계하는 콜백
+
+    사용량 정보가 없는 스트리밍 응답은 스트리밍된 청크 수를 출력 토큰으로
+    근사합니다.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._runs: dict[Any, dict] = {}
+
+    def _start(self, run_id, kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or "unknown"
+        self._runs[run_id] = {"model": model, "streamed": 0}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, kwargs)
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs):
+        run = self._runs.get(run_id)
+        if run is not None and token:
+            run["streamed"] += 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        run = self._runs.pop(run_id, None) or {"model": "unknown", "streamed": 0}
+        input_tokens, output_tokens = llm_usage(response)
+        if not output_tokens:
+            output_tokens = run["streamed"]
+
+        model = run["model"]
+        self.registry.incr("llm_calls", model=model)
+        if input_tokens:
+            self.registry.incr("llm_tokens", input_tokens, model=model, kind="input")
+        if output_tokens:
+            self.registry.incr("llm_tokens", output_tokens, model=model, kind="output")
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        run = self._runs.pop(run_id, None) or {"model": "unknown"}
+        self.registry.incr("llm_errors", model=run["model"])
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+_llm_handler_var: Optional[ContextVar] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """프로세스 전역 메트릭 레지스트리를 반환합니다."""
+    global _registry, _llm_handler_var
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = MetricsRegistry(window=settings.METRICS_WINDOW)
+                # 기본값이 콜백인 컨텍스트 변수를 등록해 모든 LangChain 실행에 연결
+                _llm_handler_var = ContextVar(
+                    "rag_llm_metrics", default=LLMMetricsHandler(registry)
+                )
+                register_configure_hook(_llm_handler_var, inheritable=True)
+                _registry = registry
+    return _registry
+
+
+def timed(stage: str):
+    """함수 실행 시간을 stage로 기록하는 데코레이터
+
+    (비동기) 스트림을 반환하는 함수는 스트림이 모두 소비될 때까지를
+    측정하고 첫 토큰까지의 시간을 "<stage>.first_token"으로 함께 기록합니다.
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_metrics().span(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = get_metrics()
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            if inspect.isgenerator(result):
+                return metrics.observe_stream(stage, result)
+            if inspect.isasyncgen(result):
+                return metrics.aobserve_stream(stage, result)
+            metrics.observe(stage, time.perf_counter() - started)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        metrics = get_metrics()
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = metrics.to_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = json.dumps(metrics.snapshot(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(
+    host: Optional[str] = None, port: Optional[int] = None
+) -> Optional[ThreadingHTTPServer]:
+    """메트릭 HTTP 엔드포인트를 백그라운드 스레드로 한 번만 시작합니다.
+
+    포트가 0이거나 이미 사용 중이면 None을 반환합니다.
+    """
+    global _server
+    host = host or settings.METRICS_HOST
+    port = settings.METRICS_PORT if port is None else port
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                logging.warning(f"메트릭 엔드포인트 시작 실패 (포트 {port}): {e}")
+                return None
+            _server.daemon_threads = True
+            threading.Thread(
+                target=_server.serve_forever, name="metrics-server", daemon=True
+            ).start()
+            logging.info(f"메트릭 엔드포인트 시작 - http://{host}:{port}/metrics")
+        return _server
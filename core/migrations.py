@@ -0,0 +1,183 @@
+"""Postgres 스키마 마이그레이션
+
+naramarket_bids 검색용 인덱스를 추가합니다. 인덱스는 CREATE INDEX CONCURRENTLY로
+만들기 때문에 트랜잭션 밖(autocommit)에서 실행하며, 적용 이력은
+schema_migrations 테이블에 기록합니다. CONCURRENTLY 빌드가 실패하면 INVALID
+인덱스가 남고 IF NOT EXISTS가 이를 건너뛰므로, 인덱스가 INVALID이면 지우고 다시
+만들며 이미 적용된 마이그레이션도 다시 실행합니다.
+
+    python -m core.migrations            # 미적용 마이그레이션 실행
+    python -m core.migrations --dry-run  # 실행할 SQL만 출력
+"""
+
+import argparse
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+import psycopg2
+
+from config.settings import settings
+from core.exceptions import DatabaseError
+
+# 키워드 검색 대상 컬럼 (EmbeddingManager.hybrid_search의 ILIKE 조건)
+TRIGRAM_COLUMNS = (
+    "bid_notice_nm",
+    "ntce_kind_nm",
+    "dminstt_nm",
+    "pub_prcrmnt_clsfc_nm",
+)
+
+
+_INDEX_NAME = re.compile(r"CREATE INDEX CONCURRENTLY IF NOT EXISTS\s+(\w+)")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple[str, ...]
+
+    @property
+    def indexes(self) -> list[str]:
+        """CONCURRENTLY로 만드는 인덱스 이름"""
+        return [
+            match.group(1) for match in map(_INDEX_NAME.match, self.statements) if match
+        ]
+
+
+MIGRATIONS = (
+    Migration(
+        1,
+        "pg_trgm GIN indexes on naramarket_bids search columns",
+        ("CREATE EXTENSION IF NOT EXISTS pg_trgm",)
+        + tuple(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS naramarket_bids_{column}_trgm_idx "
+            f"ON naramarket_bids USING gin ({column} gin_trgm_ops)"
+            for column in TRIGRAM_COLUMNS
+        ),
+    ),
+    Migration(
+        2,
+        "HNSW index on naramarket_bids.content_embedding",
+        (
+            "CREATE EXTENSION IF NOT EXISTS vector",
+            # <#>(음의 내적) 연산자로 정렬하므로 vector_ip_ops 사용 (pgvector >= 0.5)
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+            "naramarket_bids_content_embedding_hnsw_idx "
+            "ON naramarket_bids USING hnsw (content_embedding vector_ip_ops) "
+            "WITH (m = 16, ef_construction = 64)",
+        ),
+    ),
+)
+
+
+def _connect(dsn: Optional[str] = None):
+    conn = psycopg2.connect(dsn or settings.POSTGRES_URI)
+    # CONCURRENTLY 인덱스 생성은 트랜잭션 블록 안에서 실행할 수 없음
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        # 대용량 테이블 인덱스 생성은 기본 문장 timeout을 넘길 수 있음
+        cur.execute("SET statement_timeout = 0")
+    return conn
+
+
+def applied_versions(conn) -> set[int]:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """
+        )
+        cur.execute("SELECT version FROM schema_migrations")
+        return {version for (version,) in cur.fetchall()}
+
+
+def invalid_indexes(conn, migration: Migration) -> list[str]:
+    """마이그레이션의 인덱스 중 INVALID 상태(빌드 실패)인 것"""
+    invalid = []
+    with conn.cursor() as cur:
+        for index in migration.indexes:
+            cur.execute(
+                "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)",
+                (index,),
+            )
+            row = cur.fetchone()
+            if row and row[0]:
+                invalid.append(index)
+    return invalid
+
+
+def apply_migration(conn, migration: Migration):
+    """마이그레이션 하나를 실행합니다 (IF NOT EXISTS로 재실행해도 안전)."""
+    with conn.cursor() as cur:
+        for index in invalid_indexes(conn, migration):
+            logging.warning(f"[{migration.version}] INVALID 인덱스 재생성: {index}")
+            cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+        for statement in migration.statements:
+            logging.info(f"[{migration.version}] {statement}")
+            cur.execute(statement)
+        invalid = invalid_indexes(conn, migration)
+        if invalid:
+            raise DatabaseError(
+                f"[{migration.version}] 인덱스 생성이 완료되지 않았습니다: {invalid}"
+            )
+        cur.execute(
+            """
+            INSERT INTO schema_migrations (version, name) VALUES (%s, %s)
+            ON CONFLICT (version) DO NOTHING
+            """,
+            (migration.version, migration.name),
+        )
+
+
+def migrate(conn=None, target: Optional[int] = None) -> list[int]:
+    """미적용 마이그레이션을 순서대로 실행하고 적용한 버전 목록을 반환합니다."""
+    own_conn = conn is None
+    conn = conn or _connect()
+    try:
+        done = applied_versions(conn)
+        applied = []
+        for migration in MIGRATIONS:
+            if migration.version in done and not invalid_indexes(conn, migration):
+                continue
+            if target is not None and migration.version > target:
+                break
+            apply_migration(conn, migration)
+            applied.append(migration.version)
+        return applied
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Postgres 스키마 마이그레이션")
+    parser.add_argument("--dsn", default=None, help="기본값: settings.POSTGRES_URI")
+    parser.add_argument("--target", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.dry_run:
+        for migration in MIGRATIONS:
+            print(f"-- {migration.version}: {migration.name}")
+            for statement in migration.statements:
+                print(f"{statement};")
+        return
+
+    conn = _connect(args.dsn)
+    try:
+        applied = migrate(conn, target=args.target)
+    finally:
+        conn.close()
+    print(f"적용된 마이그레이션: {applied or '없음'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import logging
+from functools import cached_property
+from typing import Optional
+
+from config.settings import settings
+from core.database import get_async_pool
+from core.router import QueryRouter
+from core.session import SessionState
+from core.speculative import SpeculativeExecutor
+from models.schema import ProcessedResult
+from processors.sql_processor import SQLProcessor
+from processors.vector_processor import VectorProcessor
+from processors.sql_formatter import SQLResultFormatter
+from utils.embedding_utils import EmbeddingManager
+
+# 공고 선택 시 후보 목록(hybrid_search 결과)과 같은 컬럼을 조회
+NOTICE_QUERY = """
+    SELECT
+        id,
+        bid_notice_no,
+        bid_notice_nm,
+        ntce_kind_nm,
+        dminstt_nm,
+        pub_prcrmnt_clsfc_nm
+    FROM naramarket_bids
+    WHERE bid_notice_no = %s
+    LIMIT 1
+"""
+
+
+class RAGApp:
+    """Streamlit 세션과 API 요청이 공유하는 질의 처리기
+
+    구성 요소는 처음 사용할 때 생성합니다. 예를 들어 SQLProcessor(스키마
+    조회, Sonnet 체인)는 첫 rdb 질문에서, EmbeddingManager(Postgres 풀)는
+    첫 공고 검색에서 만들어집니다. 선택된 공고 등 사용자별 상태는 인자로 받은
+    SessionState에서 읽습니다.
+    """
+
+    @cached_property
+    def router(self) -> QueryRouter:
+        return QueryRouter()
+
+    @cached_property
+    def sql_processor(self) -> SQLProcessor:
+        return SQLProcessor()
+
+    @cached_property
+    def vector_processor(self) -> VectorProcessor:
+        return VectorProcessor()
+
+    @cached_property
+    def sql_formatter(self) -> SQLResultFormatter:
+        return SQLResultFormatter()
+
+    @cached_property
+    def embedding_manager(self) -> EmbeddingManager:
+        return EmbeddingManager()
+
+    @cached_property
+    def speculative_executor(self):
+        if not settings.SPECULATIVE_EXECUTION:
+            return None
+        return SpeculativeExecutor(
+            self.router,
+            self.sql_processor,
+            self.vector_processor,
+            confidence_threshold=settings.SPECULATION_CONFIDENCE,
+        )
+
+    def process_query(self, query: str, session: Optional[SessionState] = None):
+        bid_notice_no = session.selected_bid_no if session else None
+
+        # 쿼리 라우팅
+        db_type = self.router.route(query)
+
+        print(f"{db_type} 조회...")
+
+        # 프로세서 선택 및 실행
+        if db_type == "rdb":
+            result = self.sql_processor.process(query, bid_notice_no)
+            print(f"rdb결과.. {result}")
+            return (
+                self.sql_formatter.format_result(
+                    result.results[0].metadata["sql_query"],
+                    result.raw_response,
+                    bool(result.results[0].score),
+                ),
+                db_type,
+            )
+
+        logging.info("Processing Vector query...")
+        # Vector 검색은 공고가 선택된 경우에만 가능
+        if not bid_notice_no:
+            return None, db_type
+
+        print("Using namespace:", bid_notice_no)
+        result = self.vector_processor.process(query, namespace=bid_notice_no)
+
+        formatted_response = self.vector_processor.response(query, result)
+
+        return formatted_response, db_type
+
+    async def aprocess_query(self, query: str, session: Optional[SessionState] = None):
+        """process_query의 비동기 버전 (응답은 비동기 스트림으로 반환)"""
+        db_type, result = await self.aprocess(query, session)
+        return self.aanswer(query, db_type, result), db_type
+
+    async def aprocess(
+        self, query: str, session: Optional[SessionState] = None
+    ) -> tuple[str, Optional[ProcessedResult]]:
+        """라우팅 후 SQL 실행 또는 문서 검색까지 수행합니다 (답변 생성 전).
+
+        vector 질문인데 선택된 공고가 없으면 결과는 None입니다.
+        """
+        bid_notice_no = session.selected_bid_no if session else None
+        if self.speculative_executor is not None:
+            db_type, result, _ = await self.speculative_executor.run(
+                query, bid_notice_no
+            )
+        else:
+            db_type = await self.router.aroute(query)
+            result = None
+            if db_type == "rdb":
+                result = await self.sql_processor.aprocess(query, bid_notice_no)
+            elif bid_notice_no:
+                result = await self.vector_processor.aprocess(
+                    query, namespace=bid_notice_no
+                )
+        return db_type, result
+
+    def aanswer(self, query: str, db_type: str, result: Optional[ProcessedResult]):
+        """aprocess 결과로 답변 비동기 스트림을 만듭니다 (결과가 없으면 None)."""
+        if db_type == "rdb":
+            return self.sql_formatter.aformat_result(
+                result.results[0].metadata["sql_query"],
+                result.raw_response,
+                bool(result.results[0].score),
+            )
+
+        # Vector 검색은 공고가 선택된 경우에만 가능
+        if result is None:
+            return None
+        return self.vector_processor.aresponse(query, result)
+
+    async def aselect_notice(self, bid_notice_no: str) -> Optional[dict]:
+        """공고번호로 공고 정보를 조회합니다 (없으면 None)."""
+        rows = await get_async_pool().fetchall(NOTICE_QUERY, (bid_notice_no,))
+        return dict(rows[0]) if rows else None
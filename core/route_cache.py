@@ -0,0 +1,131 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from utils.cache import CacheStats, TTLCache, normalize_text
+
+
+@dataclass
+class RoutePrediction:
+    """캐시 기반 라우팅 예측 결과"""
+
+    route: Optional[str] = None
+    confidence: float = 0.0
+    hit: bool = False
+    vector: Optional[np.ndarray] = None
+
+
+class SemanticRouteCache:
+    """라우팅 결과 캐시
+
+    정규화된 질문의 정확 일치를 먼저 확인하고, 실패하면 임베딩 최근접 이웃
+    검색으로 유사 질문의 라우팅 결과를 재사용합니다.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        maxsize: int = 1024,
+        ttl: Optional[float] = 3600,
+        similarity_threshold: float = 0.95,
+    ):
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.exact = TTLCache(maxsize=maxsize, ttl=ttl)
+        # key -> (정규화된 임베딩, 라우팅 결과)
+        self.semantic = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.stats = CacheStats("route")
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._routes: list[str] = []
+        self._dirty = True
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None:
+            return None
+        try:
+            vector = np.asarray(self.embed_fn(text), dtype=np.float32)
+        except Exception as e:
+            logging.warning(f"라우팅 캐시 임베딩 실패: {e}")
+            self.stats.incr("embedding_errors")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _mark_dirty(self):
+        # 재구성 중인 스레드가 변경을 놓치지 않도록 잠금 안에서 표시
+        with self._lock:
+            self._dirty = True
+
+    def _build_matrix(self) -> tuple[Optional[np.ndarray], list[str]]:
+        """의미 검색용 임베딩 행렬을 필요할 때만 다시 만듭니다.
+
+        다른 스레드가 행렬을 바꿀 수 있으므로 호출자는 잠금 안에서 함께 읽은
+        (행렬, 라우팅 목록) 쌍만 사용합니다.
+        """
+        with self._lock:
+            if self._dirty:
+                entries = [value for _, value in self.semantic.items()]
+                if entries:
+                    self._matrix = np.stack([vector for vector, _ in entries])
+                    self._routes = [route for _, route in entries]
+                else:
+                    self._matrix = None
+                    self._routes = []
+                self._dirty = False
+            return self._matrix, self._routes
+
+    def predict(self, query: str) -> RoutePrediction:
+        """LLM 호출 없이 캐시로 라우팅 결과를 예측합니다.
+
+        캐시 적중이 아니더라도 가장 가까운 이웃의 라우팅 결과와 유사도를
+        신뢰도로 함께 반환합니다.
+        """
+        key = normalize_text(query)
+        route = self.exact.get(key)
+        if route is not None:
+            self.stats.incr("exact_hits")
+            return RoutePrediction(route=route, confidence=1.0, hit=True)
+
+        vector = self._embed(key)
+        if vector is not None:
+            if self.semantic.expire():
+                self._mark_dirty()
+            matrix, routes = self._build_matrix()
+            if matrix is not None:
+                similarities = matrix @ vector
+                best = int(np.argmax(similarities))
+                similarity = float(similarities[best])
+                route = routes[best]
+                if similarity >= self.similarity_threshold:
+                    self.stats.incr("semantic_hits")
+                    self.exact.set(key, route)
+                    return RoutePrediction(route, similarity, True, vector)
+                self.stats.incr("misses")
+                return RoutePrediction(route, similarity, False, vector)
+
+        self.stats.incr("misses")
+        return RoutePrediction(vector=vector)
+
+    def lookup(self, query: str) -> tuple[Optional[str], Optional[np.ndarray]]:
+        """캐시된 라우팅 결과와 (계산된 경우) 질문 임베딩을 반환합니다."""
+        prediction = self.predict(query)
+        return (prediction.route if prediction.hit else None), prediction.vector
+
+    def store(self, query: str, route: str, vector: Optional[np.ndarray] = None):
+        """라우팅 결과를 정확 일치 및 의미 캐시에 저장합니다."""
+        key = normalize_text(query)
+        self.exact.set(key, route)
+        if vector is None:
+            vector = self._embed(key)
+        if vector is not None:
+            self.semantic.set(key, (vector, route))
+            self._mark_dirty()
+
+    def clear(self):
+        self.exact.clear()
+        self.semantic.clear()
+        self._mark_dirty()
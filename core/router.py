@@ -1,13 +1,81 @@
+import asyncio
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import load_prompt
+from config.settings import settings
+from core.metrics import timed
+from core.route_cache import RoutePrediction, SemanticRouteCache
+from core.scheduler import get_scheduler, llm_options
+from utils.cache import normalize_text
+from utils.embedding_cache import get_embeddings
+from utils.singleflight import get_flight
+
+VALID_ROUTES = {"rdb", "vector"}
 
 
 class QueryRouter:
-    def __init__(self):
-        self.llm = ChatOpenAI(temperature=0, model_name="gpt-4o")
+    def __init__(self, use_cache: bool = True):
+        self.llm = ChatOpenAI(
+            temperature=0, model_name="gpt-4o", **llm_options("openai")
+        )
+        self.scheduler = get_scheduler()
         self.router_prompt = load_prompt("prompts/router.yaml", encoding="utf-8")
+        self.flight = get_flight("route")
+        self.cache = None
+        if use_cache and settings.ROUTE_CACHE_SIZE > 0:
+            embed_fn = None
+            if settings.ROUTE_CACHE_SEMANTIC:
+                embed_fn = get_embeddings().embed_query
+            self.cache = SemanticRouteCache(
+                embed_fn=embed_fn,
+                maxsize=settings.ROUTE_CACHE_SIZE,
+                ttl=settings.ROUTE_CACHE_TTL,
+                similarity_threshold=settings.ROUTE_CACHE_THRESHOLD,
+            )
 
+    @timed("route")
     def route(self, query: str) -> str:
+        vector = None
+        if self.cache:
+            cached, vector = self.cache.lookup(query)
+            if cached:
+                return cached
+
+        content = self.flight.do(normalize_text(query), self._invoke, query)
+        return self._store(query, content, vector)
+
+    async def apredict(self, query: str) -> RoutePrediction:
+        """LLM 호출 없이 캐시로 라우팅 결과와 신뢰도를 예측합니다."""
+        if not self.cache:
+            return RoutePrediction()
+        # 캐시 조회의 임베딩 호출이 이벤트 루프를 막지 않도록 스레드에서 실행
+        return await asyncio.to_thread(self.cache.predict, query)
+
+    @timed("route")
+    async def aroute(self, query: str, prediction: RoutePrediction = None) -> str:
+        """route의 비동기 버전 (apredict 결과가 있으면 재사용)"""
+        if prediction is None:
+            prediction = await self.apredict(query)
+        if prediction.hit:
+            return prediction.route
+
+        content = await self.flight.ado(normalize_text(query), self._ainvoke, query)
+        return self._store(query, content, prediction.vector)
+
+    def _invoke(self, query: str) -> str:
+        chain = self.router_prompt | self.llm
+        return self.scheduler.retry("openai", chain.invoke, {"question": query}).content
+
+    async def _ainvoke(self, query: str) -> str:
         chain = self.router_prompt | self.llm
-        response = chain.invoke({"question": query})
-        return response.content.lower().strip()
+        response = await self.scheduler.aretry(
+            "openai", chain.ainvoke, {"question": query}
+        )
+        return response.content
+
+    def _store(self, query: str, content: str, vector) -> str:
+        route = content.lower().strip()
+
+        # 정상적인 라우팅 결과만 캐시
+        if self.cache and route in VALID_ROUTES:
+            self.cache.store(query, route, vector)
+        return route
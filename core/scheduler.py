@@ -0,0 +1,558 @@
+"""외부 모델 API 호출 스케줄러 (제공자별 속도 제한, 우선순위, 재시도)
+
+OpenAI, Anthropic, Cohere 호출은 모두 제공자별 대기열을 거칩니다. 대기열은
+분당 요청 수(RPM)와 분당 토큰 수(TPM) 토큰 버킷으로 호출 속도를 제한하고,
+기다리는 호출이 여러 개면 우선순위(interactive > default > background)가 높은
+호출부터 내보냅니다. 따라서 백필 같은 배치 작업이 한도를 채우고 있어도 사용자
+답변 생성이 먼저 나갑니다.
+
+- ChatOpenAI/ChatAnthropic: llm_options()로 rate_limiter와 사용량 콜백을 연결
+  합니다. rate_limiter 훅은 토큰 수를 받지 않으므로 TPM은 응답에 보고된 사용량을
+  호출 후에 차감하고, 한도를 넘긴 만큼(부채)은 다음 호출이 기다립니다.
+- 임베딩, Cohere: Scheduler.call/acall로 예상 토큰 수를 미리 차감합니다.
+
+SDK 자체 재시도는 끄고(max_retries=0) 여기서 408/409/429/5xx와 연결 오류를
+지수 백오프(full jitter)로 재시도합니다. 429를 받으면 같은 제공자의 모든 호출을
+잠시 멈춥니다. 대기열 길이는 scheduler_queue_depth{provider, priority} 게이지로,
+대기 시간은 scheduler_wait.<provider> 단계로 집계됩니다.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from config.settings import settings
+from core.exceptions import SchedulerTimeoutError
+from core.metrics import get_metrics, llm_usage
+
+PRIORITIES = {"interactive": 0, "default": 1, "background": 2}
+
+RETRYABLE_STATUS = {408, 409, 429}
+# 상태 코드가 없는 일시적 오류 (openai/anthropic/httpx 예외 클래스 이름)
+TRANSIENT_ERRORS = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "TransportError",
+    "ConnectionError",
+    "TimeoutError",
+}
+
+
+class TokenBucket:
+    """분당 한도와 버스트 크기(초 단위)를 가진 토큰 버킷 (한도가 0이면 무제한)"""
+
+    def __init__(self, per_minute: float, burst_seconds: float):
+        self.rate = max(per_minute, 0) / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = max(now - self.updated, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """amount만큼 꺼내려면 더 기다려야 하는 시간 (부채가 있으면 갚을 때까지)"""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        # 버킷보다 큰 요청은 가득 찼을 때 내보내고 나머지는 부채로 남김
+        need = min(amount, self.capacity)
+        if self.tokens >= need:
+            return 0.0
+        return (need - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        if self.rate:
+            self.tokens -= amount
+
+
+class _Waiter:
+    """대기열에서 차례를 기다리는 호출"""
+
+    __slots__ = ("priority", "tokens", "wake")
+
+    def __init__(self, priority: int, tokens: int, wake: Callable[[], None]):
+        self.priority = priority
+        self.tokens = tokens
+        self.wake = wake
+
+
+class ProviderQueue:
+    """제공자 하나의 속도 제한과 우선순위 대기열
+
+    대기열 맨 앞(우선순위가 가장 높고 먼저 온) 호출만 버킷에서 토큰을 꺼내며,
+    나머지는 앞 호출이 나갈 때 깨어납니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: float,
+        tpm: float,
+        burst_seconds: float,
+        max_wait: float,
+    ):
+        self.name = name
+        self.max_wait = max_wait
+        self.requests = TokenBucket(rpm, burst_seconds)
+        self.token_bucket = TokenBucket(tpm, burst_seconds)
+        self.paused_until = 0.0
+        self._heap: list[tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    # ---- 대기열 ----
+
+    def _push(self, waiter: _Waiter):
+        heapq.heappush(self._heap, (waiter.priority, next(self._seq), waiter))
+        self._publish_depth()
+
+    def _remove(self, waiter: _Waiter):
+        """대기열에서 빼고 새 맨 앞 호출을 깨웁니다 (잠금을 잡은 상태에서 호출)."""
+        for i, (_, _, other) in enumerate(self._heap):
+            if other is waiter:
+                self._heap.pop(i)
+                heapq.heapify(self._heap)
+                break
+        self._publish_depth()
+        if self._heap:
+            self._heap[0][2].wake()
+
+    def _publish_depth(self):
+        depth = dict.fromkeys(PRIORITIES.values(), 0)
+        for priority, _, _ in self._heap:
+            depth[priority] += 1
+        metrics = get_metrics()
+        for name, priority in PRIORITIES.items():
+            metrics.set_gauge(
+                "scheduler_queue_depth",
+                depth[priority],
+                provider=self.name,
+                priority=name,
+            )
+
+    def _try_take(self, waiter: _Waiter) -> Optional[float]:
+        """차례이고 한도 안이면 토큰을 꺼내고 0을, 아니면 다시 확인할 때까지의 시간을
+        반환합니다 (None이면 깨울 때까지 대기)."""
+        if self._heap[0][2] is not waiter:
+            return None
+        now = time.monotonic()
+        delay = max(
+            self.paused_until - now,
+            self.requests.delay(1, now),
+            self.token_bucket.delay(waiter.tokens, now),
+        )
+        if delay > 0:
+            return delay
+        self.requests.take(1)
+        self.token_bucket.take(waiter.tokens)
+        self._remove(waiter)
+        return 0.0
+
+    def _timeout(self, timeout: Optional[float]) -> float:
+        return self.max_wait if timeout is None else timeout
+
+    def _observe(self, started: float, priority: str, tokens: int) -> float:
+        waited = time.monotonic() - started
+        metrics = get_metrics()
+        metrics.observe(f"scheduler_wait.{self.name}", waited)
+        metrics.incr("scheduler_requests", provider=self.name, priority=priority)
+        if tokens:
+            metrics.incr("scheduler_tokens", tokens, provider=self.name)
+        return waited
+
+    def acquire(
+        self,
+        priority: str = "default",
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """차례가 올 때까지 기다린 뒤 요청 1건과 tokens개를 차감하고 대기 시간을
+        반환합니다."""
+        started = time.monotonic()
+        deadline = started + self._timeout(timeout)
+        event = threading.Event()
+        waiter = _Waiter(PRIORITIES[priority], tokens, event.set)
+        with self._lock:
+            self._push(waiter)
+        try:
+            while True:
+                with self._lock:
+                    # 확인 직전에 지워야 확인 후 도착한 깨우기를 놓치지 않음
+                    event.clear()
+                    delay = self._try_take(waiter)
+                if delay == 0.0:
+                    return self._observe(started, priority, tokens)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SchedulerTimeoutError(
+                        f"{self.name} 호출 대기 시간 초과 ({priority})"
+                    )
+                event.wait(remaining if delay is None else min(delay, remaining))
+        except BaseException:
+            with self._lock:
+                self._remove(waiter)
+            raise
+
+    async def aacquire(
+        self,
+        priority: str = "default",
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """acquire의 비동기 버전 (다른 스레드에서도 깨울 수 있음)"""
+        started = time.monotonic()
+        deadline = started + self._timeout(timeout)
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = _Waiter(
+            PRIORITIES[priority],
+            tokens,
+            lambda: loop.call_soon_threadsafe(event.set),
+        )
+        with self._lock:
+            self._push(waiter)
+        try:
+            while True:
+                with self._lock:
+                    event.clear()
+                    delay = self._try_take(waiter)
+                if delay == 0.0:
+                    return self._observe(started, priority, tokens)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SchedulerTimeoutError(
+                        f"{self.name} 호출 대기 시간 초과 ({priority})"
+                    )
+                try:
+                    await asyncio.wait_for(
+                        event.wait(),
+                        remaining if delay is None else min(delay, remaining),
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                self._remove(waiter)
+            raise
+
+    # ---- 사용량, 재시도 ----
+
+    def charge(self, tokens: int):
+        """호출 후 보고된 토큰 사용량을 TPM 버킷에서 차감합니다."""
+        if tokens <= 0:
+            return
+        with self._lock:
+            self.token_bucket.take(tokens)
+        get_metrics().incr("scheduler_tokens", tokens, provider=self.name)
+
+    def penalize(self, seconds: float):
+        """429 응답 후 제공자 전체 호출을 seconds 동안 멈춥니다."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    @property
+    def depth(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+
+def _status(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Retry-After 헤더 값 (초, 없거나 날짜 형식이면 None)"""
+    headers = getattr(error, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def retry_reason(error: BaseException) -> Optional[str]:
+    """재시도할 오류면 사유(상태 코드 또는 connection)를, 아니면 None을 반환합니다."""
+    status = _status(error)
+    if status is not None:
+        if status in RETRYABLE_STATUS or status >= 500:
+            return str(status)
+        return None
+    if any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__):
+        return "connection"
+    return None
+
+
+class Scheduler:
+    """제공자별 대기열과 재시도 정책"""
+
+    def __init__(self):
+        burst = settings.SCHEDULER_BURST_SECONDS
+        max_wait = settings.SCHEDULER_MAX_WAIT
+        self.queues = {
+            "openai": ProviderQueue(
+                "openai", settings.OPENAI_RPM, settings.OPENAI_TPM, burst, max_wait
+            ),
+            "anthropic": ProviderQueue(
+                "anthropic",
+                settings.ANTHROPIC_RPM,
+                settings.ANTHROPIC_TPM,
+                burst,
+                max_wait,
+            ),
+            "cohere": ProviderQueue("cohere", settings.COHERE_RPM, 0, burst, max_wait),
+        }
+        self.max_attempts = max(settings.SCHEDULER_MAX_ATTEMPTS, 1)
+
+    def queue(self, provider: str) -> ProviderQueue:
+        return self.queues[provider]
+
+    def backoff(self, attempt: int) -> float:
+        """attempt번째 재시도 전 대기 시간 (full jitter)"""
+        cap = min(
+            settings.SCHEDULER_BACKOFF_MAX,
+            settings.SCHEDULER_BACKOFF_BASE * 2 ** (attempt - 1),
+        )
+        return random.uniform(0, cap)
+
+    def _retry_delay(self, provider: str, error: BaseException, attempt: int):
+        """재시도할 수 있으면 대기 시간을, 아니면 None을 반환합니다."""
+        reason = retry_reason(error)
+        if reason is None or attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        if reason == "429":
+            retry_after = _retry_after(error)
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, settings.SCHEDULER_BACKOFF_BASE)
+            # 다른 호출도 같은 한도에 걸리므로 제공자 전체를 멈춤
+            self.queue(provider).penalize(delay)
+        get_metrics().incr("scheduler_retries", provider=provider, reason=reason)
+        logging.warning(
+            f"{provider} 호출 실패 ({reason}), {delay:.2f}초 후 재시도 "
+            f"({attempt}/{self.max_attempts - 1}): {error}"
+        )
+        return delay
+
+    # ---- 일반 호출 ----
+
+    def call(
+        self,
+        provider: str,
+        fn: Callable,
+        *args,
+        priority: str = "default",
+        tokens: int = 0,
+        **kwargs,
+    ):
+        """차례를 기다려 fn(*args, **kwargs)를 호출하고 일시적 오류는 재시도합니다."""
+        if not settings.SCHEDULER_ENABLED:
+            return fn(*args, **kwargs)
+        queue = self.queue(provider)
+        for attempt in itertools.count(1):
+            queue.acquire(priority, tokens)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(provider, e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+
+    async def acall(
+        self,
+        provider: str,
+        fn: Callable,
+        *args,
+        priority: str = "default",
+        tokens: int = 0,
+        **kwargs,
+    ):
+        """call의 비동기 버전 (fn은 코루틴 함수)"""
+        if not settings.SCHEDULER_ENABLED:
+            return await fn(*args, **kwargs)
+        queue = self.queue(provider)
+        for attempt in itertools.count(1):
+            await queue.aacquire(priority, tokens)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(provider, e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    def retry(self, provider: str, fn: Callable, *args, **kwargs):
+        """재시도만 적용합니다 (rate_limiter가 연결된 채팅 모델 호출용)."""
+        if not settings.SCHEDULER_ENABLED:
+            return fn(*args, **kwargs)
+        for attempt in itertools.count(1):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(provider, e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+
+    async def aretry(self, provider: str, fn: Callable, *args, **kwargs):
+        if not settings.SCHEDULER_ENABLED:
+            return await fn(*args, **kwargs)
+        for attempt in itertools.count(1):
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(provider, e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    # ---- 스트림 ----
+
+    def retry_stream(
+        self, provider: str, factory: Callable, *args, **kwargs
+    ) -> Iterator:
+        """첫 청크를 받기 전에 실패한 스트림만 다시 엽니다 (받은 뒤에는 그대로 전파)."""
+        if not settings.SCHEDULER_ENABLED:
+            yield from factory(*args, **kwargs)
+            return
+        for attempt in itertools.count(1):
+            started = False
+            try:
+                for chunk in factory(*args, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                delay = None if started else self._retry_delay(provider, e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+
+    async def aretry_stream(
+        self, provider: str, factory: Callable, *args, **kwargs
+    ) -> AsyncIterator:
+        if not settings.SCHEDULER_ENABLED:
+            async for chunk in factory(*args, **kwargs):
+                yield chunk
+            return
+        for attempt in itertools.count(1):
+            started = False
+            try:
+                async for chunk in factory(*args, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                delay = None if started else self._retry_delay(provider, e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict[str, dict]:
+        return {
+            name: {
+                "depth": queue.depth,
+                "paused": queue.paused_until > time.monotonic(),
+            }
+            for name, queue in self.queues.items()
+        }
+
+
+class ProviderRateLimiter(BaseRateLimiter):
+    """채팅 모델 호출마다 제공자 대기열에서 차례를 기다리는 LangChain rate_limiter"""
+
+    def __init__(self, provider: str, priority: str = "interactive"):
+        self.provider = provider
+        self.priority = priority
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        if not settings.SCHEDULER_ENABLED:
+            return True
+        queue = get_scheduler().queue(self.provider)
+        try:
+            queue.acquire(self.priority, timeout=None if blocking else 0)
+        except SchedulerTimeoutError:
+            if blocking:
+                raise
+            return False
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        if not settings.SCHEDULER_ENABLED:
+            return True
+        queue = get_scheduler().queue(self.provider)
+        try:
+            await queue.aacquire(self.priority, timeout=None if blocking else 0)
+        except SchedulerTimeoutError:
+            if blocking:
+                raise
+            return False
+        return True
+
+
+class UsageHandler(BaseCallbackHandler):
+    """응답에 보고된 토큰 사용량을 제공자 TPM 버킷에서 차감하는 콜백
+
+    사용량 정보가 없는 스트리밍 응답은 스트리밍된 청크 수로 근사합니다.
+    """
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self._streamed: dict[Any, int] = {}
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs):
+        if token:
+            self._streamed[run_id] = self._streamed.get(run_id, 0) + 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        streamed = self._streamed.pop(run_id, 0)
+        input_tokens, output_tokens = llm_usage(response)
+        tokens = input_tokens + output_tokens or streamed
+        if settings.SCHEDULER_ENABLED:
+            get_scheduler().queue(self.provider).charge(tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._streamed.pop(run_id, None)
+
+
+def llm_options(provider: str, priority: str = "interactive") -> dict:
+    """채팅 모델 생성 인자 (rate_limiter, 사용량 콜백, SDK 재시도 끄기)"""
+    if not settings.SCHEDULER_ENABLED:
+        return {}
+    options = {
+        "rate_limiter": ProviderRateLimiter(provider, priority),
+        "callbacks": [UsageHandler(provider)],
+        "max_retries": 0,
+    }
+    if provider == "openai":
+        # 스트리밍 응답에도 사용량을 포함하도록 요청
+        options["stream_usage"] = True
+    return options
+
+
+_scheduler: Optional[Scheduler] = None
+_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    """프로세스 전역 스케줄러를 반환합니다."""
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+        return _scheduler
@@ -0,0 +1,331 @@
+"""질의 처리 세션 상태와 저장소
+
+선택된 공고번호, 공고 후보, 검색 완료 여부를 SessionState로 묶어 파이프라인에
+인자로 전달합니다. 저장소는 SESSION_BACKEND 설정에 따라 다음 중 하나입니다.
+
+- memory: 프로세스 내 LRU (TTL과 최대 세션 수로 메모리 제한)
+- sqlite: 로컬 파일 (같은 호스트의 여러 워커 프로세스가 공유)
+- redis: Redis 프로토콜(RESP) 서버 (여러 호스트의 워커가 공유)
+
+세션은 마지막으로 읽거나 저장한 시점부터 SESSION_TTL초 동안 유지됩니다.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+from urllib.parse import unquote, urlparse
+
+from config.settings import settings
+from core.exceptions import SessionStoreError
+from utils.cache import TTLCache
+
+
+def _json_default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    # numpy 스칼라
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+@dataclass
+class SessionState:
+    """한 사용자 세션의 공고 검색/선택 상태"""
+
+    session_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    selected_bid_no: Optional[str] = None
+    candidates: list[dict] = field(default_factory=list)
+    search_complete: bool = False
+    last_selected: Optional[dict] = None
+
+    def select(self, candidate: dict):
+        self.selected_bid_no = candidate["bid_notice_no"]
+        self.last_selected = candidate
+        self.search_complete = True
+
+    def reset(self):
+        """공고 선택을 초기화합니다."""
+        self.selected_bid_no = None
+        self.candidates = []
+        self.search_complete = False
+        self.last_selected = None
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False, default=_json_default)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "SessionState":
+        return cls(**json.loads(raw))
+
+
+class SessionStore(ABC):
+    """세션 상태 저장소 (값은 JSON 문자열로 저장)"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    @abstractmethod
+    def _get(self, session_id: str) -> Optional[str]:
+        """저장된 값을 반환하고 만료 시각을 연장합니다."""
+
+    @abstractmethod
+    def _set(self, session_id: str, value: str): ...
+
+    @abstractmethod
+    def delete(self, session_id: str): ...
+
+    def load(self, session_id: str) -> SessionState:
+        """저장된 세션을 반환합니다 (없거나 만료되었으면 빈 세션)."""
+        raw = self._get(session_id)
+        if raw is None:
+            return SessionState(session_id=session_id)
+        return SessionState.from_json(raw)
+
+    def save(self, state: SessionState):
+        self._set(state.session_id, state.to_json())
+
+    def close(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """프로세스 내 세션 저장소 (오래 사용하지 않은 세션부터 제거)"""
+
+    def __init__(self, ttl: float, maxsize: int = 10000):
+        super().__init__(ttl)
+        self.sessions = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _get(self, session_id: str) -> Optional[str]:
+        raw = self.sessions.get(session_id)
+        if raw is not None:
+            self.sessions.set(session_id, raw)
+        return raw
+
+    def _set(self, session_id: str, value: str):
+        self.sessions.set(session_id, value)
+
+    def delete(self, session_id: str):
+        self.sessions.pop(session_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite 파일 기반 세션 저장소"""
+
+    # 저장 몇 번마다 만료된 세션을 정리할지
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str, ttl: float):
+        super().__init__(ttl)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        # 여러 프로세스가 같은 파일을 쓰므로 잠금 대기 시간을 둠
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _get(self, session_id: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE id = ? AND expires_at > ?",
+                (session_id, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE sessions SET expires_at = ? WHERE id = ?",
+                (now + self.ttl, session_id),
+            )
+            self._conn.commit()
+        return row[0]
+
+    def _set(self, session_id: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+                (session_id, value, now + self.ttl),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisError(SessionStoreError):
+    """Redis 서버가 오류 응답을 보낸 경우"""
+
+
+class RedisClient:
+    """세션 저장에 필요한 명령만 사용하는 최소 RESP2 클라이언트
+
+    redis://[:password@]host[:port][/db] 형식의 URL을 받습니다. 스레드 간에
+    커넥션 하나를 잠금으로 공유하며, 연결이 끊어지면 한 번 다시 연결합니다.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"지원하지 않는 Redis URL입니다: {url}")
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            finally:
+                self._sock = self._reader = None
+
+    @staticmethod
+    def _encode(args: tuple) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Redis 연결이 끊어졌습니다")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise SessionStoreError(f"알 수 없는 Redis 응답: {line!r}")
+
+    def _call(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def execute(self, *args):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._call(*args)
+                except (OSError, ConnectionError) as e:
+                    self._disconnect()
+                    if attempt:
+                        raise SessionStoreError(f"Redis 명령 실패: {e}") from e
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+
+class RedisSessionStore(SessionStore):
+    """Redis 세션 저장소 (만료는 서버의 키 TTL로 처리)"""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "rag:session:"):
+        super().__init__(ttl)
+        self.client = RedisClient(url)
+        self.prefix = prefix
+
+    def _get(self, session_id: str) -> Optional[str]:
+        # GETEX는 값 조회와 만료 시각 연장을 한 번의 왕복으로 처리 (Redis 6.2+)
+        raw = self.client.execute(
+            "GETEX", self.prefix + session_id, "EX", int(self.ttl)
+        )
+        return raw.decode() if raw is not None else None
+
+    def _set(self, session_id: str, value: str):
+        self.client.execute(
+            "SET", self.prefix + session_id, value.encode(), "EX", int(self.ttl)
+        )
+
+    def delete(self, session_id: str):
+        self.client.execute("DEL", self.prefix + session_id)
+
+    def close(self):
+        self.client.close()
+
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    backend = backend or settings.SESSION_BACKEND
+    if backend == "memory":
+        return MemorySessionStore(settings.SESSION_TTL, settings.SESSION_MAX_ENTRIES)
+    if backend == "sqlite":
+        return SQLiteSessionStore(settings.SESSION_SQLITE_PATH, settings.SESSION_TTL)
+    if backend == "redis":
+        return RedisSessionStore(settings.SESSION_REDIS_URL, settings.SESSION_TTL)
+    raise ValueError(f"알 수 없는 세션 저장소입니다: {backend}")
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """프로세스 전역 세션 저장소를 반환합니다."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = create_session_store()
+        return _store
@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import get_buffer_string
+from langchain_core.tracers.context import register_configure_hook
+
+from core.metrics import llm_usage
+from models.schema import ProcessedResult
+from utils.helpers import count_tokens
+
+# 분기 태스크 안에서 시작된 모든 LangChain LLM 호출에 분기별 집계 콜백을 연결
+_branch_usage: ContextVar[Optional["TokenUsageHandler"]] = ContextVar(
+    "speculative_branch_usage", default=None
+)
+register_configure_hook(_branch_usage, inheritable=True)
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """분기에서 시작된 LLM 호출 수와 토큰 사용량을 집계하는 콜백
+
+    취소된 호출에는 on_llm_end가 오지 않으므로 시작 시 프롬프트 토큰(추정)과
+    스트리밍된 청크 수를 먼저 세고, 응답에 사용량이 보고되면 그 값으로 바꿉니다.
+    """
+
+    # 취소 직전의 호출도 집계되도록 이벤트 루프에서 바로 실행
+    run_inline = True
+
+    def __init__(self):
+        self.calls = 0
+        self.completed = 0
+        # run_id -> [입력 토큰, 출력 토큰]
+        self._runs: dict[Any, list] = {}
+
+    def _start(self, run_id, texts: list[str]):
+        self.calls += 1
+        self._runs[run_id] = [sum(count_tokens(text) for text in texts), 0]
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs: Any):
+        self._start(run_id, [get_buffer_string(m) for m in messages])
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs: Any):
+        self._start(run_id, prompts)
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs: Any):
+        run = self._runs.get(run_id)
+        if run is not None and token:
+            run[1] += 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs: Any):
+        self.completed += 1
+        run = self._runs.setdefault(run_id, [0, 0])
+        input_tokens, output_tokens = llm_usage(response)
+        if input_tokens:
+            run[0] = input_tokens
+        if output_tokens:
+            run[1] = output_tokens
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(run[0] for run in self._runs.values())
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(run[1] for run in self._runs.values())
+
+    @property
+    def unfinished_calls(self) -> int:
+        """끝나기 전에 취소되었거나 아직 진행 중인 호출 수"""
+        return max(self.calls - self.completed, 0)
+
+
+class SpeculationStats:
+    """추측 실행으로 절약한 지연시간과 추가 비용 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.skipped = 0
+        self.correct = 0
+        self.saved_seconds = 0.0
+        self.wasted_branches = {"rdb": 0, "vector": 0}
+        self.wasted_llm_calls = 0
+        self.cancelled_llm_calls = 0
+        self.wasted_input_tokens = 0
+        self.wasted_output_tokens = 0
+
+    def record(self, report: "SpeculationReport"):
+        with self._lock:
+            if not report.speculated:
+                self.skipped += 1
+                return
+            self.runs += 1
+            self.saved_seconds += report.saved_seconds
+            if report.route in report.speculated:
+                self.correct += 1
+            for branch in report.wasted:
+                self.wasted_branches[branch] += 1
+            self.wasted_llm_calls += report.wasted_llm_calls
+            self.cancelled_llm_calls += report.cancelled_llm_calls
+            self.wasted_input_tokens += report.wasted_input_tokens
+            self.wasted_output_tokens += report.wasted_output_tokens
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "skipped": self.skipped,
+                "correct": self.correct,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "avg_saved_seconds": (
+                    round(self.saved_seconds / self.runs, 3) if self.runs else 0.0
+                ),
+                "wasted_branches": dict(self.wasted_branches),
+                "wasted_llm_calls": self.wasted_llm_calls,
+                "cancelled_llm_calls": self.cancelled_llm_calls,
+                "wasted_input_tokens": self.wasted_input_tokens,
+                "wasted_output_tokens": self.wasted_output_tokens,
+            }
+
+
+@dataclass
+class SpeculationReport:
+    """질의 한 건의 추측 실행 결과"""
+
+    route: str = ""
+    speculated: list = field(default_factory=list)
+    wasted: list = field(default_factory=list)
+    route_seconds: float = 0.0
+    branch_seconds: float = 0.0
+    total_seconds: float = 0.0
+    wasted_llm_calls: int = 0
+    cancelled_llm_calls: int = 0
+    wasted_input_tokens: int = 0
+    wasted_output_tokens: int = 0
+
+    @property
+    def saved_seconds(self) -> float:
+        """순차 실행(라우팅 후 분기 실행) 대비 절약한 시간"""
+        if not self.speculated:
+            return 0.0
+        return max(self.route_seconds + self.branch_seconds - self.total_seconds, 0.0)
+
+
+class _Branch:
+    """추측 실행 중인 분기 하나"""
+
+    def __init__(self, name: str, make_coro):
+        self.name = name
+        self.usage = TokenUsageHandler()
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.task = asyncio.ensure_future(self._run(make_coro(self.usage)))
+        # 취소된 분기의 예외가 "never retrieved" 경고를 남기지 않도록 소비
+        self.task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _run(self, coro):
+        # 태스크마다 컨텍스트가 복사되므로 이 분기의 호출에만 적용됨
+        _branch_usage.set(self.usage)
+        try:
+            return await coro
+        finally:
+            self.finished = time.perf_counter()
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+
+class SpeculativeExecutor:
+    """라우팅과 동시에 rdb/vector 분기를 미리 실행합니다.
+
+    라우팅 캐시가 적중하면 추측 없이 해당 분기만 실행하고, 가장 가까운 캐시
+    항목과의 유사도가 confidence_threshold 이상이면 예측된 분기만 미리
+    실행합니다. 그 외에는 두 분기를 모두 시작한 뒤 라우팅 결과가 나오면
+    패배한 분기를 취소합니다. SQL은 생성만 미리 하고 실행은 라우팅 확정 후에
+    수행합니다.
+    """
+
+    def __init__(
+        self, router, sql_processor, vector_processor, confidence_threshold=0.9
+    ):
+        self.router = router
+        self.sql_processor = sql_processor
+        self.vector_processor = vector_processor
+        self.confidence_threshold = confidence_threshold
+        self.stats = SpeculationStats()
+
+    def _start(self, name: str, query: str, bid_notice_no: Optional[str]) -> _Branch:
+        if name == "rdb":
+            return _Branch(
+                name,
+                lambda usage: self.sql_processor.agenerate_sql(
+                    query, bid_notice_no, callbacks=[usage]
+                ),
+            )
+        # vector 분기의 LLM 호출은 _branch_usage 컨텍스트로 usage에 집계됨
+        return _Branch(
+            name,
+            lambda usage: self.vector_processor.aprocess(
+                query, namespace=bid_notice_no
+            ),
+        )
+
+    async def run(
+        self, query: str, bid_notice_no: Optional[str] = None
+    ) -> tuple[str, ProcessedResult, SpeculationReport]:
+        started = time.perf_counter()
+        report = SpeculationReport()
+        prediction = await self.router.apredict(query)
+
+        if prediction.hit:
+            candidates = []
+        elif prediction.route and prediction.confidence >= self.confidence_threshold:
+            candidates = [prediction.route]
+        else:
+            candidates = ["rdb", "vector"]
+        # 공고가 선택되지 않았으면 vector 분기는 실행할 수 없음
+        if not bid_notice_no and "vector" in candidates:
+            candidates.remove("vector")
+
+        branches = {
+            name: self._start(name, query, bid_notice_no) for name in candidates
+        }
+        report.speculated = list(branches)
+
+        try:
+            route = await self.router.aroute(query, prediction)
+        except BaseException:
+            for branch in branches.values():
+                branch.task.cancel()
+            raise
+        report.route = route
+        report.route_seconds = time.perf_counter() - started
+
+        # 패배한 분기 취소 및 비용 집계
+        winner_name = "rdb" if route == "rdb" else "vector"
+        for name, branch in branches.items():
+            if name == winner_name:
+                continue
+            branch.task.cancel()
+            report.wasted.append(name)
+            report.wasted_llm_calls += branch.usage.calls
+            report.cancelled_llm_calls += branch.usage.unfinished_calls
+            report.wasted_input_tokens += branch.usage.input_tokens
+            report.wasted_output_tokens += branch.usage.output_tokens
+
+        result = None
+        winner = branches.get(winner_name)
+        if winner is None and (winner_name == "rdb" or bid_notice_no):
+            winner = self._start(winner_name, query, bid_notice_no)
+        if winner is not None:
+            result = await winner.task
+            if winner_name == "rdb":
+                sql_started = time.perf_counter()
+                result = await self.sql_processor.aexecute(result)
+                # SQL 실행 시간은 추측 여부와 무관하므로 분기 시간에 포함
+                report.branch_seconds = winner.seconds + (
+                    time.perf_counter() - sql_started
+                )
+            else:
+                report.branch_seconds = winner.seconds
+
+        report.total_seconds = time.perf_counter() - started
+        self.stats.record(report)
+        logging.info(
+            f"추측 실행 - 라우팅: {route}, 추측 분기: {report.speculated}, "
+            f"절약: {report.saved_seconds:.3f}초, 낭비 분기: {report.wasted}"
+        )
+        return route, result, report
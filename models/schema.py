@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
+import sys
 
 
 class QueryResult(BaseModel):
@@ -12,3 +13,30 @@ class ProcessedResult(BaseModel):
     results: list[QueryResult]
     source_type: str
     raw_response: Optional[Any] = None
+
+
+class ColumnarResult(BaseModel):
+    """SQL 실행 결과 (컬럼명 + 컬럼별 값 배열)"""
+
+    columns: list[str]
+    data: list[list[Any]]
+    row_count: int = 0
+    truncated: bool = False
+
+    def column(self, name: str) -> list[Any]:
+        return self.data[self.columns.index(name)]
+
+    def rows(self) -> Iterator[tuple]:
+        """행 단위로 순회합니다 (복사본을 만들지 않음)."""
+        return zip(*self.data) if self.data else iter(())
+
+    def approx_bytes(self) -> int:
+        """캐시 메모리 예산 계산을 위한 대략적인 크기(바이트)"""
+        size = sum(len(name) for name in self.columns)
+        for values in self.data:
+            size += sys.getsizeof(values)
+            size += sum(
+                len(value.encode("utf-8")) if isinstance(value, str) else 16
+                for value in values
+            )
+        return size
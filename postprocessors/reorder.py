@@ -1,43 +1,69 @@
+from typing import Optional
+
+import numpy as np
+
 from postprocessors.base import BasePostProcessor
 from models.schema import ProcessedResult, QueryResult
 
 
 class DiversityReorder(BasePostProcessor):
-    def __init__(self, diversity_threshold: float = 0.3):
+    def __init__(self, diversity_threshold: float = 0.3, top_k: Optional[int] = None):
         self.diversity_threshold = diversity_threshold
+        self.top_k = top_k
 
     async def process(self, result: ProcessedResult) -> ProcessedResult:
         if len(result.results) <= 1:
             return result
 
-        selected_indices = self._mmr_selection(result.results)
+        selected_indices = self._mmr_selection(result.results, self.top_k)
         result.results = [result.results[i] for i in selected_indices]
         return result
 
-    def _mmr_selection(self, results: list[QueryResult]) -> list[int]:
+    def _mmr_selection(
+        self, results: list[QueryResult], top_k: Optional[int] = None
+    ) -> list[int]:
+        """MMR 방식으로 관련도와 다양성을 함께 고려한 순서를 반환합니다."""
+        n = len(results)
+        limit = n if top_k is None else min(top_k, n)
+        relevance = np.array(
+            [r.score if r.score is not None else 0.0 for r in results], dtype=np.float64
+        )
+        similarity = self._similarity_matrix(results)
+
         selected = []
-        remaining = list(range(len(results)))
-
-        while remaining:
-            if not selected:
-                best_idx = max(remaining, key=lambda i: results[i].score)
-            else:
-                scores = []
-                for i in remaining:
-                    relevance = results[i].score
-                    diversity = max(
-                        self._similarity(results[i], results[j]) for j in selected
-                    )
-                    mmr = relevance - self.diversity_threshold * diversity
-                    scores.append((i, mmr))
-                best_idx = max(scores, key=lambda x: x[1])[0]
+        available = np.ones(n, dtype=bool)
+        # 이미 선택된 문서들과의 최대 유사도
+        max_similarity = np.zeros(n, dtype=np.float64)
+
+        for _ in range(limit):
+            mmr = relevance - self.diversity_threshold * max_similarity
+            mmr[~available] = -np.inf
+            best_idx = int(np.argmax(mmr))
 
             selected.append(best_idx)
-            remaining.remove(best_idx)
+            available[best_idx] = False
+            np.maximum(max_similarity, similarity[best_idx], out=max_similarity)
 
         return selected
 
-    def _similarity(self, doc1: QueryResult, doc2: QueryResult) -> float:
-        return len(set(doc1.content.split()) & set(doc2.content.split())) / len(
-            set(doc1.content.split()) | set(doc2.content.split())
-        )
+    def _similarity_matrix(self, results: list[QueryResult]) -> np.ndarray:
+        """문서별 토큰 집합을 한 번만 만들어 Jaccard 유사도 행렬을 계산합니다."""
+        vocabulary: dict[str, int] = {}
+        token_ids = [
+            [
+                vocabulary.setdefault(token, len(vocabulary))
+                for token in set(r.content.split())
+            ]
+            for r in results
+        ]
+
+        presence = np.zeros((len(results), max(len(vocabulary), 1)), dtype=np.float32)
+        for row, ids in enumerate(token_ids):
+            presence[row, ids] = 1.0
+
+        intersection = presence @ presence.T
+        sizes = presence.sum(axis=1)
+        union = sizes[:, None] + sizes[None, :] - intersection
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarity = np.where(union > 0, intersection / union, 0.0)
+        return similarity
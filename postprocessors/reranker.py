@@ -1,13 +1,13 @@
 import logging
-import cohere
+import threading
 
 from langchain_core.documents import Document
-from langchain_community.cross_encoders import HuggingFaceCrossEncoder
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import CrossEncoderReranker
-from langchain_cohere import CohereRerank
 from models.schema import ProcessedResult, QueryResult
 from config.settings import settings
+from core.metrics import timed
+from core.scheduler import get_scheduler
+from utils.cache import CacheStats, TTLCache, content_hash
+from utils.singleflight import get_flight
 
 
 class HuggingFaceReranker:
@@ -18,6 +18,11 @@ class HuggingFaceReranker:
         model_name: str = "BAAI/bge-reranker-v2-m3",
         top_n: int = 5,
     ):
+        # 크로스 인코더(transformers 등)는 사용할 때만 import
+        from langchain.retrievers import ContextualCompressionRetriever
+        from langchain.retrievers.document_compressors import CrossEncoderReranker
+        from langchain_community.cross_encoders import HuggingFaceCrossEncoder
+
         self.model = HuggingFaceCrossEncoder(model_name=model_name)
         self.compressor = CrossEncoderReranker(model=self.model, top_n=top_n)
         self.compression_retriever = ContextualCompressionRetriever(
@@ -29,25 +34,146 @@ class HuggingFaceReranker:
 
 
 class CohereDocumentReranker:
-    def __init__(self, model: str = "rerank-multilingual-v3.0", top_k: int = 5):
+    """Cohere 클라이언트를 유지하며 (질문, 문서) 점수를 캐시하는 재순위화기"""
+
+    def __init__(
+        self,
+        model: str = "rerank-multilingual-v3.0",
+        top_k: int = 5,
+        cache_size: int = 20000,
+        cache_ttl: float = 3600,
+    ):
         self.model = model
         self.top_k = top_k
         self.api_key = settings.COHERE_API_KEY
         if not self.api_key:
             raise ValueError("COHERE_API_KEY를 찾을 수 없습니다.")
-        self.reranker = self._setup_reranker()
+        self._client = None
+        self._async_client = None
+        self.score_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.stats = CacheStats("rerank")
+        self.flight = get_flight("rerank")
+        self.scheduler = get_scheduler()
+
+    def _setup_client(self):
+        """Cohere 클라이언트 설정"""
+        import cohere
 
-    def _setup_reranker(self):
-        """Cohere Reranker 설정"""
         logging.info(f"Cohere Reranker 모델 '{self.model}' 초기화 중...")
+        return cohere.Client(api_key=self.api_key)
+
+    @property
+    def client(self):
+        """동기 Cohere 클라이언트 (첫 재순위화 시 생성)"""
+        if self._client is None:
+            self._client = self._setup_client()
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            import cohere
+
+            self._async_client = cohere.AsyncClient(api_key=self.api_key)
+        return self._async_client
+
+    def _lookup(self, query: str, contents: list[str]):
+        """캐시된 점수와 API로 보내야 할 문서 목록을 나눕니다."""
+        query_hash = content_hash(self.model, query)
+        doc_hashes = [content_hash(content) for content in contents]
+
+        scores = {}
+        uncached = {}
+        for doc_hash, content in zip(doc_hashes, contents):
+            score = self.score_cache.get((query_hash, doc_hash))
+            if score is None:
+                uncached.setdefault(doc_hash, content)
+            else:
+                scores[doc_hash] = score
+        self.stats.incr("hits", len(contents) - len(uncached))
+        self.stats.incr("misses", len(uncached))
+        return query_hash, doc_hashes, scores, list(uncached.items())
+
+    def _request(self, query: str, pending: list):
+        self.stats.incr("api_calls")
+        return self.scheduler.call(
+            "cohere",
+            self.client.rerank,
+            priority="interactive",
+            model=self.model,
+            query=query,
+            documents=[content for _, content in pending],
+            top_n=len(pending),
+        )
 
-        # cohere.Client를 API 키로 초기화
-        client = cohere.Client(api_key=self.api_key)
+    async def _arequest(self, query: str, pending: list):
+        self.stats.incr("api_calls")
+        return await self.scheduler.acall(
+            "cohere",
+            self.async_client.rerank,
+            priority="interactive",
+            model=self.model,
+            query=query,
+            documents=[content for _, content in pending],
+            top_n=len(pending),
+        )
 
-        # client를 CohereRerank에 전달
-        return CohereRerank(model=self.model, top_n=self.top_k, client=client)
+    def _store(self, query_hash, pending, scores, response):
+        for item in response.results:
+            doc_hash = pending[item.index][0]
+            scores[doc_hash] = item.relevance_score
+            self.score_cache.set((query_hash, doc_hash), item.relevance_score)
+
+    def _score(self, query: str, contents: list[str]) -> list[float]:
+        """캐시되지 않은 문서만 API로 보내 모든 문서의 관련도 점수를 구합니다."""
+        query_hash, doc_hashes, scores, pending = self._lookup(query, contents)
+        if pending:
+            response = self.flight.do(
+                (query_hash, *(doc_hash for doc_hash, _ in pending)),
+                self._request,
+                query,
+                pending,
+            )
+            self._store(query_hash, pending, scores, response)
+        return [scores.get(doc_hash, 0.0) for doc_hash in doc_hashes]
+
+    async def _ascore(self, query: str, contents: list[str]) -> list[float]:
+        query_hash, doc_hashes, scores, pending = self._lookup(query, contents)
+        if pending:
+            response = await self.flight.ado(
+                (query_hash, *(doc_hash for doc_hash, _ in pending)),
+                self._arequest,
+                query,
+                pending,
+            )
+            self._store(query_hash, pending, scores, response)
+        return [scores.get(doc_hash, 0.0) for doc_hash in doc_hashes]
+
+    def _build_result(
+        self, processed_result: ProcessedResult, scores: list[float], top_k: int
+    ) -> ProcessedResult:
+        ranked = sorted(
+            zip(processed_result.results, scores),
+            key=lambda item: item[1],
+            reverse=True,
+        )[: top_k or self.top_k]
+        logging.info(f"재순위화 완료 - 출력 문서 수: {len(ranked)}")
+
+        reranked_results = [
+            QueryResult(content=result.content, metadata=result.metadata, score=score)
+            for result, score in ranked
+        ]
+
+        return ProcessedResult(
+            results=reranked_results,
+            source_type=processed_result.source_type,
+            raw_response=[score for _, score in ranked],
+        )
 
-    def rerank(self, processed_result: ProcessedResult, query: str) -> ProcessedResult:
+    @timed("rerank")
+    def rerank(
+        self, processed_result: ProcessedResult, query: str, top_k: int = None
+    ) -> ProcessedResult:
         """검색 결과 재순위화"""
         try:
             if not processed_result.results:
@@ -58,33 +184,43 @@ class CohereDocumentReranker:
                 f"재순위화 시작 - 입력 문서 수: {len(processed_result.results)}"
             )
 
-            # QueryResult를 Document로 변환
-            documents = [
-                Document(page_content=result.content, metadata=result.metadata)
-                for result in processed_result.results
-            ]
-            logging.info("문서 변환 완료")
-
-            # 재순위화 수행
-            reranked_docs = self.reranker.compress_documents(documents, query)
-            logging.info(f"재순위화 완료 - 출력 문서 수: {len(reranked_docs)}")
-
-            # Document를 QueryResult로 변환
-            reranked_results = [
-                QueryResult(
-                    content=doc.page_content,
-                    metadata=doc.metadata,
-                    score=getattr(doc, "score", 1.0),
-                )
-                for doc in reranked_docs
-            ]
-
-            return ProcessedResult(
-                results=reranked_results,
-                source_type=processed_result.source_type,
-                raw_response=reranked_docs,
+            scores = self._score(
+                query, [result.content for result in processed_result.results]
+            )
+            return self._build_result(processed_result, scores, top_k)
+
+        except Exception as e:
+            logging.error(f"재순위화 실패: {e}")
+            raise
+
+    @timed("rerank")
+    async def arerank(
+        self, processed_result: ProcessedResult, query: str, top_k: int = None
+    ) -> ProcessedResult:
+        """rerank의 비동기 버전"""
+        try:
+            if not processed_result.results:
+                logging.warning("재순위화할 결과가 없습니다.")
+                return processed_result
+
+            scores = await self._ascore(
+                query, [result.content for result in processed_result.results]
             )
+            return self._build_result(processed_result, scores, top_k)
 
         except Exception as e:
             logging.error(f"재순위화 실패: {e}")
             raise
+
+
+_reranker = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker() -> CohereDocumentReranker:
+    """프로세스 전역에서 공유하는 Cohere 재순위화기를 반환합니다."""
+    global _reranker
+    with _reranker_lock:
+        if _reranker is None:
+            _reranker = CohereDocumentReranker()
+        return _reranker
@@ -3,6 +3,13 @@ from langchain.prompts import ChatPromptTemplate
 from typing import List
 from pydantic import BaseModel
 
+from config.settings import settings
+from core.metrics import timed
+from core.scheduler import get_scheduler, llm_options
+from processors.local_keyword_extractor import LocalKeywordExtractor
+from utils.cache import CacheStats, TTLCache, normalize_text
+from utils.singleflight import get_flight
+
 
 class SearchKeywords(BaseModel):
     """공고 검색을 위한 키워드 모델"""
@@ -16,7 +23,9 @@ class KeywordExtractor:
             temperature=0,
             model="gpt-4o-mini",
             model_kwargs={"response_format": {"type": "json_object"}},
+            **llm_options("openai"),
         )
+        self.scheduler = get_scheduler()
 
         self.prompt = ChatPromptTemplate.from_messages(
             [
@@ -40,19 +49,85 @@ class KeywordExtractor:
             ]
         )
 
+        self.local = LocalKeywordExtractor() if settings.KEYWORD_LOCAL_ENABLED else None
+        self.cache = TTLCache(
+            maxsize=settings.KEYWORD_CACHE_SIZE, ttl=settings.KEYWORD_CACHE_TTL
+        )
+        self.stats = CacheStats("keywords")
+        self.flight = get_flight("keywords")
+
+    def _cached(self, query: str):
+        """캐시 또는 로컬 추출 결과 (LLM이 필요하면 None)"""
+        key = normalize_text(query)
+        keywords = self.cache.get(key)
+        if keywords is not None:
+            self.stats.incr("hits")
+            return key, list(keywords)
+        self.stats.incr("misses")
+
+        if self.local is not None:
+            try:
+                result = self.local.extract(query)
+            except Exception as e:
+                print(f"로컬 키워드 추출 중 오류 발생: {str(e)}")
+            else:
+                if result.confidence >= settings.KEYWORD_CONFIDENCE_THRESHOLD:
+                    self.stats.incr("local")
+                    self.cache.set(key, tuple(result.keywords))
+                    return key, result.keywords
+        return key, None
+
+    @timed("keywords")
     def extract(self, query: str) -> List[str]:
         """사용자 쿼리에서 검색 키워드를 추출합니다."""
+        key, keywords = self._cached(query)
+        if keywords is not None:
+            return keywords
+
         try:
-            # LLM 호출
-            messages = self.prompt.format_messages(query=query)
-            response = self.llm.invoke(messages)
+            # 로컬 추출 신뢰도가 낮을 때만 LLM 호출
+            return list(self.flight.do(key, self._llm_extract, key, query))
+
+        except Exception as e:
+            print(f"키워드 추출 중 오류 발생: {str(e)}")
+            return self._default_keywords(query)
 
-            # 결과 파싱
-            result = SearchKeywords.model_validate_json(response.content)
-            return result.search_keywords
+    @timed("keywords")
+    async def aextract(self, query: str) -> List[str]:
+        """extract의 비동기 버전"""
+        key, keywords = self._cached(query)
+        if keywords is not None:
+            return keywords
+
+        try:
+            return list(await self.flight.ado(key, self._allm_extract, key, query))
 
         except Exception as e:
             print(f"키워드 추출 중 오류 발생: {str(e)}")
-            # 오류 발생 시 입력 텍스트에서 기본적인 키워드 추출
-            default_keywords = [w for w in query.split() if len(w) > 1][:3]
-            return default_keywords
+            return self._default_keywords(query)
+
+    def _llm_extract(self, key: str, query: str) -> tuple:
+        self.stats.incr("llm")
+        messages = self.prompt.format_messages(query=query)
+        response = self.scheduler.retry("openai", self.llm.invoke, messages)
+
+        # 결과 파싱
+        keywords = tuple(
+            SearchKeywords.model_validate_json(response.content).search_keywords
+        )
+        self.cache.set(key, keywords)
+        return keywords
+
+    async def _allm_extract(self, key: str, query: str) -> tuple:
+        self.stats.incr("llm")
+        messages = self.prompt.format_messages(query=query)
+        response = await self.scheduler.aretry("openai", self.llm.ainvoke, messages)
+        keywords = tuple(
+            SearchKeywords.model_validate_json(response.content).search_keywords
+        )
+        self.cache.set(key, keywords)
+        return keywords
+
+    def _default_keywords(self, query: str) -> List[str]:
+        # 오류 발생 시 입력 텍스트에서 기본적인 키워드 추출
+        return [w for w in query.split() if len(w) > 1][:3]
@@ -0,0 +1,386 @@
+"""LLM 없이 공고 검색 키워드를 추출하는 로컬 추출기
+
+kiwipiepy가 설치되어 있으면 형태소 분석으로 명사(복합 명사 포함)를 고르고,
+없으면 공백 분리 + 조사/어미 제거 + n-gram 분할로 대신합니다. 후보 단어는
+naramarket_bids 공고명에서 계산한 IDF로 가중치를 매기며, 공고명에 한 번도
+나오지 않는 단어가 많으면 신뢰도가 낮아져 LLM 추출로 넘어갑니다. IDF 파일이
+없으면 형태소 분석기가 일반/고유 명사로 판단한 후보의 비율로만 신뢰도를 매기며,
+규칙 기반 분리는 확인할 어휘가 없으므로 항상 LLM 추출을 사용합니다.
+
+    python -m processors.local_keyword_extractor build-idf
+    python -m processors.local_keyword_extractor test "클라우드 전환 공고 찾아줘"
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from config.settings import settings
+
+# KeywordExtractor 시스템 프롬프트의 제외 단어 + 검색 질문에 흔한 기능어
+STOPWORDS = {
+    "자격요건",
+    "자격",
+    "요건",
+    "조건",
+    "가격",
+    "금액",
+    "예산",
+    "날짜",
+    "일자",
+    "기간",
+    "마감",
+    "찾아줘",
+    "찾아",
+    "검색해줘",
+    "검색",
+    "알려줘",
+    "보여줘",
+    "공고",
+    "공고문",
+    "입찰",
+    "입찰공고",
+    "제안",
+    "제안서",
+    "사업",
+    "용역",
+    "관련",
+    "관련된",
+    "대한",
+    "대해",
+    "있는",
+    "어떤",
+    "무엇",
+    "뭐",
+    "좀",
+    "혹시",
+    "최근",
+    "건",
+    "것",
+    "거",
+    "내용",
+    "정보",
+}
+
+# 긴 것부터 검사하는 조사
+PARTICLES = sorted(
+    [
+        "에서는",
+        "으로는",
+        "에게서",
+        "에서",
+        "으로",
+        "부터",
+        "까지",
+        "에게",
+        "처럼",
+        "보다",
+        "이나",
+        "하고",
+        "과",
+        "와",
+        "은",
+        "는",
+        "이",
+        "가",
+        "을",
+        "를",
+        "의",
+        "에",
+        "로",
+        "도",
+        "만",
+    ],
+    key=len,
+    reverse=True,
+)
+
+# 동사/요청 표현 어미 (키워드 후보에서 제외)
+VERB_ENDINGS = (
+    "줘",
+    "주세요",
+    "줄래",
+    "나요",
+    "까요",
+    "니까",
+    "습니까",
+    "인가요",
+    "있어",
+    "있나",
+    "하는",
+    "되는",
+    "해서",
+    "해요",
+    "하다",
+)
+
+# kiwipiepy 명사 계열 품사 (일반/고유 명사, 외국어, 한자, 어근)
+NOUN_TAGS = {"NNG", "NNP", "SL", "SH", "XR"}
+# IDF 없이 신뢰할 수 있는 품사 (사전에 있는 일반/고유 명사)
+DICTIONARY_NOUN_TAGS = {"NNG", "NNP"}
+# IDF가 없을 때 모든 후보가 사전 명사인 경우의 신뢰도
+NO_IDF_CONFIDENCE = 0.6
+
+_WORD = re.compile(r"\w+")
+
+
+@dataclass
+class KeywordResult:
+    """로컬 키워드 추출 결과"""
+
+    keywords: list[str]
+    confidence: float
+    candidates: list[str] = field(default_factory=list)
+
+
+class TitleIDF:
+    """공고명 단어의 문서 빈도 (부분 문자열 포함 기준, ILIKE 검색과 동일)"""
+
+    def __init__(self, n_docs: int, df: dict[str, int]):
+        self.n_docs = n_docs
+        self.tokens = list(df)
+        self.counts = np.fromiter(df.values(), dtype=np.int64, count=len(df))
+        self.blob = "\n".join(self.tokens) + "\n"
+        lengths = np.fromiter((len(t) + 1 for t in self.tokens), dtype=np.int64)
+        self.starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        self._cache: dict[str, int] = {}
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TitleIDF"]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        return cls(data["n_docs"], data["df"])
+
+    def df(self, term: str) -> int:
+        """term을 포함하는 공고명 수 (근사치)"""
+        cached = self._cache.get(term)
+        if cached is None:
+            positions = [m.start() for m in re.finditer(re.escape(term), self.blob)]
+            if positions:
+                tokens = np.unique(np.searchsorted(self.starts, positions, "right") - 1)
+                cached = int(min(self.counts[tokens].sum(), self.n_docs))
+            else:
+                cached = 0
+            self._cache[term] = cached
+        return cached
+
+    def idf(self, term: str) -> float:
+        return math.log((self.n_docs + 1) / (self.df(term) + 1)) + 1.0
+
+
+def build_title_idf(conn, path: str) -> int:
+    """naramarket_bids 공고명에서 단어별 문서 빈도를 계산해 저장합니다."""
+    df = Counter()
+    n_docs = 0
+    with conn.cursor(name="title_idf") as cur:
+        cur.itersize = 50_000
+        cur.execute("SELECT bid_notice_nm FROM naramarket_bids")
+        for (title,) in cur:
+            n_docs += 1
+            df.update(set(_WORD.findall((title or "").lower())))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"n_docs": n_docs, "df": dict(df)}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return n_docs
+
+
+class LocalKeywordExtractor:
+    """형태소 분석(또는 규칙 기반 분리)과 공고명 IDF로 키워드를 추출합니다."""
+
+    def __init__(
+        self,
+        idf_path: Optional[str] = None,
+        max_keywords: int = 4,
+        max_df_ratio: float = 0.2,
+    ):
+        self.idf_path = idf_path or settings.KEYWORD_IDF_PATH
+        self.max_keywords = max_keywords
+        # 너무 많은 공고명에 등장하는 단어는 검색 변별력이 없으므로 제외
+        self.max_df_ratio = max_df_ratio
+        self._idf: Optional[TitleIDF] = None
+        self._idf_loaded = False
+        self._kiwi = None
+        self._kiwi_loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def idf(self) -> Optional[TitleIDF]:
+        if not self._idf_loaded:
+            with self._lock:
+                if not self._idf_loaded:
+                    self._idf = TitleIDF.load(self.idf_path)
+                    self._idf_loaded = True
+        return self._idf
+
+    @property
+    def kiwi(self):
+        """kiwipiepy 형태소 분석기 (설치되지 않았으면 None)"""
+        if not self._kiwi_loaded:
+            with self._lock:
+                if not self._kiwi_loaded:
+                    try:
+                        from kiwipiepy import Kiwi
+
+                        self._kiwi = Kiwi()
+                    except ImportError:
+                        logging.info("kiwipiepy 미설치 - 규칙 기반 키워드 추출 사용")
+                    self._kiwi_loaded = True
+        return self._kiwi
+
+    # ---- 후보 단어 ----
+
+    def _morph_candidates(self, query: str) -> list[tuple[str, list[str], bool]]:
+        """붙어 있는 명사를 묶어 (복합명사, 구성명사, 사전 명사 여부)로 반환"""
+        groups, tokens, end = [], [], None
+        for token in self.kiwi.tokenize(query):
+            if token.tag in NOUN_TAGS:
+                if tokens and token.start != end:
+                    groups.append(tokens)
+                    tokens = []
+                tokens.append(token)
+                end = token.start + token.len
+            elif tokens:
+                groups.append(tokens)
+                tokens, end = [], None
+        if tokens:
+            groups.append(tokens)
+        return [
+            (
+                "".join(t.form for t in g),
+                [t.form for t in g] if len(g) > 1 else [],
+                all(t.tag in DICTIONARY_NOUN_TAGS for t in g),
+            )
+            for g in groups
+        ]
+
+    def _strip(self, word: str) -> Optional[str]:
+        if word.endswith(VERB_ENDINGS):
+            return None
+        for particle in PARTICLES:
+            # 조사를 떼고도 두 글자 이상 남는 경우에만 제거
+            if word.endswith(particle) and len(word) - len(particle) >= 2:
+                if self.idf is not None and self.idf.df(word):
+                    # 조사처럼 보이지만 공고명에 있는 단어 (예: "어린이")
+                    return word
+                return word[: -len(particle)]
+        return word
+
+    def _segment(self, word: str) -> list[str]:
+        """공고명 어휘의 가장 긴 n-gram부터 잘라 붙어 쓴 단어를 나눕니다."""
+        parts, i = [], 0
+        while i < len(word):
+            for j in range(len(word), i + 1, -1):
+                if self.idf.df(word[i:j]):
+                    parts.append(word[i:j])
+                    i = j
+                    break
+            else:
+                i += 1
+        return parts
+
+    def _rule_candidates(self, query: str) -> list[tuple[str, list[str], bool]]:
+        groups = []
+        for word in _WORD.findall(query.lower()):
+            word = self._strip(word)
+            if not word or len(word) < 2:
+                continue
+            parts = []
+            if self.idf is not None and not self.idf.df(word):
+                parts = [p for p in self._segment(word) if len(p) >= 2]
+            groups.append((word, parts, False))
+        return groups
+
+    # ---- 추출 ----
+
+    def extract(self, query: str) -> KeywordResult:
+        groups = (
+            self._morph_candidates(query)
+            if self.kiwi is not None
+            else self._rule_candidates(query)
+        )
+        groups = [
+            (
+                compound.lower() if compound.lower() not in STOPWORDS else None,
+                [p.lower() for p in parts if p.lower() not in STOPWORDS],
+                known,
+            )
+            for compound, parts, known in groups
+        ]
+        groups = [group for group in groups if group[0] or group[1]]
+        candidates = [
+            term for compound, parts, _ in groups for term in [compound, *parts] if term
+        ]
+        if not groups:
+            return KeywordResult([], 0.0, candidates)
+
+        idf = self.idf
+        if idf is None:
+            # IDF가 없으면 복합 명사를 그대로 사용하고 사전 명사 비율로만 판단
+            keywords = list(
+                dict.fromkeys(compound or parts[0] for compound, parts, _ in groups)
+            )
+            known = sum(1 for *_, known in groups if known) / len(groups)
+            confidence = NO_IDF_CONFIDENCE * known
+            if len(keywords) > self.max_keywords:
+                confidence = max(0.0, confidence - 0.2)
+            return KeywordResult(keywords[: self.max_keywords], confidence, candidates)
+
+        max_df = max(1, int(idf.n_docs * self.max_df_ratio))
+        scored, known_groups = {}, 0
+        for compound, parts, _ in groups:
+            # 복합 명사가 공고명에 있으면 그대로, 없으면 구성 단어 사용
+            if compound and 0 < idf.df(compound) <= max_df:
+                terms = [compound]
+            else:
+                terms = parts
+            terms = [t for t in terms if len(t) >= 2 and 0 < idf.df(t) <= max_df]
+            if terms:
+                known_groups += 1
+            for term in terms:
+                scored[term] = idf.idf(term)
+
+        keywords = sorted(scored, key=scored.get, reverse=True)[: self.max_keywords]
+        # 공고명 어휘로 설명되는 후보 그룹의 비율
+        confidence = known_groups / len(groups) if keywords else 0.0
+        return KeywordResult(keywords, confidence, candidates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 키워드 추출기")
+    parser.add_argument("command", choices=["build-idf", "test"])
+    parser.add_argument("query", nargs="?")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "build-idf":
+        from core.database import get_pool
+
+        with get_pool().connection(readonly=True) as conn:
+            n_docs = build_title_idf(conn, settings.KEYWORD_IDF_PATH)
+        print(f"공고명 {n_docs:,}건으로 IDF 생성: {settings.KEYWORD_IDF_PATH}")
+        return
+
+    result = LocalKeywordExtractor().extract(args.query or "")
+    print(
+        f"키워드: {result.keywords} (신뢰도 {result.confidence:.2f}, "
+        f"후보 {result.candidates})"
+    )
+
+
+if __name__ == "__main__":
+    main()
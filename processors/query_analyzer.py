@@ -4,6 +4,8 @@ from langchain.prompts import ChatPromptTemplate
 from typing import List, Literal
 from pydantic import BaseModel, Field
 
+from core.scheduler import get_scheduler, llm_options
+
 
 class SearchIntentModel(BaseModel):
     """검색 의도를 나타내는 Pydantic 모델"""
@@ -27,7 +29,9 @@ class QueryAnalyzer:
             temperature=0,
             model="gpt-4o-mini",
             model_kwargs={"response_format": {"type": "json_object"}},
+            **llm_options("openai", priority="default"),
         )
+        self.scheduler = get_scheduler()
 
         # JSON 파서 설정
         self.parser = JsonOutputParser(pydantic_object=SearchIntentModel)
@@ -63,7 +67,7 @@ class QueryAnalyzer:
             )
 
             # LLM 호출 및 결과 파싱
-            response = self.llm.invoke(prompt)
+            response = self.scheduler.retry("openai", self.llm.invoke, prompt)
             parsed_response = self.parser.parse(response.content)
 
             return parsed_response
@@ -1,11 +1,44 @@
+import asyncio
 import logging
+import threading
+import time
 from typing import List
 from langchain_community.retrievers import PineconeHybridSearchRetriever
-from langchain_openai import OpenAIEmbeddings
+from pinecone_text.hybrid import hybrid_convex_scale
 from pinecone_text.sparse import BM25Encoder
 from pinecone import Pinecone
 from models.schema import QueryResult
 from config.settings import settings
+from core.metrics import timed
+from utils.cache import CacheStats, TTLCache, normalize_text
+from utils.embedding_cache import get_embeddings
+from utils.singleflight import get_flight
+
+_shared_lock = threading.Lock()
+_index = None
+_sparse_encoder = None
+
+
+def get_pinecone_index():
+    """프로세스 전역에서 공유하는 Pinecone 인덱스 핸들을 반환합니다."""
+    global _index
+    with _shared_lock:
+        if _index is None:
+            pc = Pinecone(
+                api_key=settings.PINECONE_API_KEY,
+                environment=settings.PINECONE_ENVIRONMENT,
+            )
+            _index = pc.Index(settings.PINECONE_INDEX_NAME)
+        return _index
+
+
+def get_sparse_encoder() -> BM25Encoder:
+    """기본 BM25 파라미터는 한 번만 내려받아 공유합니다."""
+    global _sparse_encoder
+    with _shared_lock:
+        if _sparse_encoder is None:
+            _sparse_encoder = BM25Encoder().default()
+        return _sparse_encoder
 
 
 class HybridRetriever:
@@ -22,12 +55,10 @@ class HybridRetriever:
         self.embedding_model = embedding_model
         self.top_k = top_k
         self.alpha = alpha
+        self.flight = get_flight("pinecone_retrieve")
 
-        # Pinecone 인덱스 초기화
-        pc = Pinecone(
-            api_key=settings.PINECONE_API_KEY, environment=settings.PINECONE_ENVIRONMENT
-        )
-        self.index = pc.Index(settings.PINECONE_INDEX_NAME)
+        # 공유 Pinecone 인덱스 사용
+        self.index = get_pinecone_index()
 
         if namespace:
             self.retriever = self._setup_retriever(namespace=namespace)
@@ -39,35 +70,138 @@ class HybridRetriever:
     def _setup_retriever(self, namespace: str = None) -> PineconeHybridSearchRetriever:
         """하이브리드 검색 리트리버 설정"""
         return PineconeHybridSearchRetriever(
-            embeddings=OpenAIEmbeddings(model=self.embedding_model),
-            sparse_encoder=BM25Encoder().default(),
+            embeddings=get_embeddings(self.embedding_model),
+            sparse_encoder=get_sparse_encoder(),
             index=self.index,
             top_k=self.top_k,
             alpha=self.alpha,
             namespace=namespace,
         )
 
+    @timed("pinecone_retrieve")
     def retrieve(self, query: str, namespace: str = None) -> List[QueryResult]:
         """주어진 쿼리에 대한 하이브리드 검색 수행"""
         try:
             logging.info(f"검색 시작 - 쿼리: {query}, 네임스페이스: {namespace}")
 
-            # 검색 수행
-            results = self.retriever.invoke(query)
+            # 검색 수행 (같은 네임스페이스의 같은 질문은 진행 중인 검색과 합침)
+            results = self.flight.do(
+                (self.namespace, normalize_text(query)), self._retrieve, query
+            )
             logging.info(f"검색 완료 - 결과 수: {len(results)}")
+            return list(results)
+
+        except Exception as e:
+            logging.error(f"검색 실패: {e}", exc_info=True)
+            raise RuntimeError(f"Retrieval failed: {str(e)}")
+
+    def _query(self, dense_vec: list, sparse_vec: dict):
+        dense_vec, sparse_vec = hybrid_convex_scale(dense_vec, sparse_vec, self.alpha)
+        sparse_vec["values"] = [float(value) for value in sparse_vec["values"]]
+        return self.index.query(
+            vector=dense_vec,
+            sparse_vector=sparse_vec,
+            top_k=self.top_k,
+            include_metadata=True,
+            namespace=self.namespace,
+        )
+
+    @staticmethod
+    def _to_results(response) -> List[QueryResult]:
+        """Pinecone 응답을 QueryResult로 변환합니다 (동기/비동기 경로 공통)."""
+        query_results = []
+        for match in response["matches"]:
+            metadata = dict(match["metadata"])
+            content = metadata.pop("context")
+            if "score" not in metadata and "score" in match:
+                metadata["score"] = match["score"]
+            metadata.setdefault("chunk_id", match["id"])
+            query_results.append(QueryResult(content=content, metadata=metadata))
+        return query_results
 
-            # 결과 변환
-            query_results = []
-            for doc in results:
-                query_results.append(
-                    QueryResult(
-                        content=doc.page_content,
-                        metadata=doc.metadata,
-                    )
-                )
+    def _retrieve(self, query: str) -> List[QueryResult]:
+        sparse_vec = self.retriever.sparse_encoder.encode_queries(query)
+        dense_vec = self.retriever.embeddings.embed_query(query)
+        return self._to_results(self._query(dense_vec, sparse_vec))
 
+    @timed("pinecone_retrieve")
+    async def aretrieve(self, query: str) -> List[QueryResult]:
+        """retrieve의 비동기 버전
+
+        희소 벡터 인코딩(CPU)과 밀집 임베딩(API) 호출을 동시에 수행하고,
+        Pinecone 조회는 스레드에서 실행하여 이벤트 루프를 막지 않습니다.
+        """
+        results = await self.flight.ado(
+            (self.namespace, normalize_text(query)), self._aretrieve, query
+        )
+        return list(results)
+
+    async def _aretrieve(self, query: str) -> List[QueryResult]:
+        try:
+            logging.info(f"검색 시작 - 쿼리: {query}, 네임스페이스: {self.namespace}")
+
+            sparse_vec, dense_vec = await asyncio.gather(
+                asyncio.to_thread(self.retriever.sparse_encoder.encode_queries, query),
+                self.retriever.embeddings.aembed_query(query),
+            )
+            response = await asyncio.to_thread(self._query, dense_vec, sparse_vec)
+            query_results = self._to_results(response)
+
+            logging.info(f"검색 완료 - 결과 수: {len(query_results)}")
             return query_results
 
         except Exception as e:
             logging.error(f"검색 실패: {e}", exc_info=True)
             raise RuntimeError(f"Retrieval failed: {str(e)}")
+
+
+class RetrieverPool:
+    """네임스페이스별 HybridRetriever 풀 (크기 제한, TTL, LRU 제거)"""
+
+    def __init__(self, maxsize: int = 64, ttl: float = 1800, **retriever_kwargs):
+        self.retrievers = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.retriever_kwargs = retriever_kwargs
+        self.stats = CacheStats("retriever_pool")
+        self.construction_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str) -> HybridRetriever:
+        retriever = self.retrievers.get(namespace)
+        if retriever is not None:
+            self.stats.incr("hits")
+            return retriever
+
+        with self._lock:
+            # 다른 스레드가 먼저 생성했는지 다시 확인
+            retriever = self.retrievers.get(namespace)
+            if retriever is not None:
+                self.stats.incr("hits")
+                return retriever
+
+            self.stats.incr("misses")
+            started = time.perf_counter()
+            retriever = HybridRetriever(namespace, **self.retriever_kwargs)
+            self.construction_seconds += time.perf_counter() - started
+            self.stats.incr("constructions")
+            self.retrievers.set(namespace, retriever)
+            return retriever
+
+    def metrics(self) -> dict:
+        metrics = self.stats.as_dict()
+        metrics["size"] = len(self.retrievers)
+        metrics["construction_seconds"] = round(self.construction_seconds, 4)
+        return metrics
+
+
+_pool = None
+
+
+def get_retriever_pool() -> RetrieverPool:
+    """프로세스 전역 리트리버 풀을 반환합니다."""
+    global _pool
+    with _shared_lock:
+        if _pool is None:
+            _pool = RetrieverPool(
+                maxsize=settings.RETRIEVER_POOL_SIZE, ttl=settings.RETRIEVER_POOL_TTL
+            )
+        return _pool
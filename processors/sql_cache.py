@@ -0,0 +1,248 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Optional
+
+from utils.cache import CacheStats, TTLCache, content_hash, normalize_text
+from utils.sql_prompt import get_schema_info, schema_tables
+
+BID_NOTICE_PARAM = "%(bid_notice_no)s"
+BID_NOTICE_TOKEN = "{bid_notice_no}"
+
+# 결과 캐시 무효화를 위해 버전을 추적하는 테이블 (스키마의 모든 테이블)
+TRACKED_TABLES = schema_tables()
+
+# 문자열/따옴표 식별자, 달러 인용 문자열, 주석
+_SQL_QUOTED = re.compile(
+    r"'(?:[^']|'')*'"
+    r'|"(?:[^"]|"")*"'
+    r"|\$(\w*)\$.*?\$\1\$"
+    r"|--[^\n]*"
+    r"|/\*.*?\*/",
+    re.DOTALL,
+)
+
+
+def prompt_date() -> str:
+    """SQL 생성 프롬프트의 오늘 날짜 (체인이 캐시되므로 호출 시점에 계산)"""
+    return str(date.today())
+
+
+def split_sql(sql: str) -> list[tuple[str, bool]]:
+    """SQL을 (조각, 리터럴/주석 여부) 목록으로 나눕니다."""
+    parts = []
+    position = 0
+    for match in _SQL_QUOTED.finditer(sql):
+        parts.append((sql[position : match.start()], False))
+        parts.append((match.group(), True))
+        position = match.end()
+    parts.append((sql[position:], False))
+    return parts
+
+
+def is_single_statement(sql: str) -> bool:
+    """리터럴과 주석 밖에 문장 구분자(;)가 끝에만 있는지 확인합니다."""
+    code = "".join(text for text, quoted in split_sql(sql) if not quoted)
+    return ";" not in re.sub(r"[\s;]+$", "", code)
+
+
+@dataclass(frozen=True)
+class SQLPlan:
+    """실행할 SQL과 바인드 파라미터"""
+
+    sql: str
+    params: Optional[dict] = field(default=None, hash=False, compare=False)
+
+    def render(self) -> str:
+        """표시용으로 파라미터를 채운 SQL을 반환합니다."""
+        if not self.params:
+            return self.sql
+        bid_notice_no = self.params["bid_notice_no"].replace("'", "''")
+        return self.sql.replace(BID_NOTICE_PARAM, f"'{bid_notice_no}'").replace(
+            "%%", "%"
+        )
+
+
+class SQLPlanCache:
+    """생성된 SQL 캐시
+
+    정규화된 질문과 프롬프트 종류(공고번호 유무)를 키로 사용하며, 공고번호는
+    바인드 파라미터로 바꿔 저장하므로 하나의 계획을 모든 공고에 재사용합니다.
+    get_schema_info의 스키마가 바뀌면 전체 캐시를 비웁니다. 프롬프트의 오늘 날짜로
+    "이번 달", "오늘 마감" 같은 질문의 날짜가 SQL에 고정되므로 날짜도 키에 넣습니다.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: Optional[float] = 86400):
+        self.plans = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.stats = CacheStats("sql_plan")
+        self.schema_hash = self._current_schema_hash()
+
+    @staticmethod
+    def _current_schema_hash() -> str:
+        return content_hash(get_schema_info())
+
+    def _check_schema(self):
+        schema_hash = self._current_schema_hash()
+        if schema_hash != self.schema_hash:
+            self.plans.clear()
+            self.schema_hash = schema_hash
+            self.stats.incr("schema_invalidations")
+
+    def _key(self, question: str, bid_notice_no: Optional[str]) -> tuple:
+        variant = "with_number" if bid_notice_no else "default"
+        if bid_notice_no:
+            # 질문에 공고번호가 포함된 경우에도 같은 키가 되도록 치환
+            question = question.replace(bid_notice_no, BID_NOTICE_TOKEN)
+        return (variant, normalize_text(question), self.schema_hash, prompt_date())
+
+    def get(
+        self, question: str, bid_notice_no: Optional[str] = None
+    ) -> Optional[SQLPlan]:
+        self._check_schema()
+        template = self.plans.get(self._key(question, bid_notice_no))
+        if template is None:
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        if bid_notice_no:
+            return SQLPlan(template, {"bid_notice_no": bid_notice_no})
+        return SQLPlan(template)
+
+    def put(
+        self, question: str, sql: str, bid_notice_no: Optional[str] = None
+    ) -> SQLPlan:
+        """생성된 SQL을 저장하고 실행할 계획을 반환합니다."""
+        if not bid_notice_no:
+            self.plans.set(self._key(question, None), sql)
+            return SQLPlan(sql)
+
+        # 따옴표로 감싼 공고번호 리터럴을 바인드 파라미터로 교체
+        literal = re.compile(r"'" + re.escape(bid_notice_no) + r"'")
+        if not literal.search(sql):
+            # 공고번호를 리터럴로 쓰지 않은 SQL은 재사용이 안전하지 않으므로 캐시하지 않음
+            self.stats.incr("uncacheable")
+            return SQLPlan(sql)
+
+        template = literal.sub(BID_NOTICE_PARAM, sql.replace("%", "%%"))
+        if bid_notice_no in template:
+            # 다른 형태(LIKE 패턴 등)로 남은 공고번호가 있으면 재사용 불가
+            self.stats.incr("uncacheable")
+            return SQLPlan(sql)
+        self.plans.set(self._key(question, bid_notice_no), template)
+        return SQLPlan(template, {"bid_notice_no": bid_notice_no})
+
+    def clear(self):
+        self.plans.clear()
+
+
+def referenced_tables(sql: str) -> set[str]:
+    """SQL에서 참조하는 추적 대상 테이블을 찾습니다."""
+    lowered = sql.lower()
+    return {table for table in TRACKED_TABLES if re.search(rf"\b{table}\b", lowered)}
+
+
+def estimate_size(value: Any) -> int:
+    """캐시 메모리 예산 계산을 위한 대략적인 크기(바이트)"""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if hasattr(value, "approx_bytes"):
+        return value.approx_bytes()
+    return len(repr(value).encode("utf-8"))
+
+
+class SQLResultCache:
+    """생성된 SQL의 실행 결과 캐시
+
+    정규화된 SQL과 파라미터를 키로 사용하며, 저장 시점의 참조 테이블 버전과
+    현재 버전이 다르면 무효화합니다. 버전이 한 번도 기록되지 않은(0) 테이블은
+    적재를 알 수 없으므로 해당 결과를 unversioned_ttl이 지나면 만료합니다.
+    전체 크기는 max_bytes 이내로 유지합니다.
+    """
+
+    def __init__(
+        self,
+        table_versions,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl=None,
+        unversioned_ttl: Optional[float] = 300.0,
+    ):
+        self.table_versions = table_versions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.unversioned_ttl = unversioned_ttl
+        self.stats = CacheStats("sql_result")
+        self.current_bytes = 0
+        # key -> (저장 시각, 테이블 버전, 크기, 결과)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(plan: SQLPlan) -> tuple:
+        # 리터럴 안의 공백은 값의 일부이므로 그 밖의 공백만 정규화
+        sql = "".join(
+            text if quoted else re.sub(r"\s+", " ", text)
+            for text, quoted in split_sql(plan.sql)
+        )
+        sql = sql.strip().rstrip(";").strip()
+        params = tuple(sorted((plan.params or {}).items()))
+        return (sql, params)
+
+    def _remove(self, key):
+        _, _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def get(self, plan: SQLPlan) -> Any:
+        key = self._key(plan)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            self.stats.incr("misses")
+            return None
+
+        stored_at, versions, _, result = entry
+        age = time.monotonic() - stored_at
+        ttl = self.ttl
+        if self.unversioned_ttl is not None and any(v == 0 for _, v in versions):
+            ttl = min(ttl, self.unversioned_ttl) if ttl else self.unversioned_ttl
+        expired = ttl is not None and age > ttl
+        current = self.table_versions.snapshot(table for table, _ in versions)
+        if expired or current != versions:
+            with self._lock:
+                if key in self._entries:
+                    self._remove(key)
+            self.stats.incr("invalidations")
+            self.stats.incr("misses")
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        self.stats.incr("hits")
+        return result
+
+    def put(self, plan: SQLPlan, result: Any):
+        tables = referenced_tables(plan.sql)
+        if not tables:
+            # 의존 테이블을 알 수 없으면 무효화할 수 없으므로 캐시하지 않음
+            return
+        size = estimate_size(result)
+        if size > self.max_bytes:
+            return
+        versions = self.table_versions.snapshot(tables)
+        key = self._key(plan)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic(), versions, size, result)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats.incr("evictions")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
@@ -1,47 +1,149 @@
 # processors/sql_formatter.py
+import asyncio
+import queue
+import threading
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from typing import Any
-import json
+
+from core.metrics import timed
+from core.scheduler import get_scheduler, llm_options
+from models.schema import ColumnarResult
+from processors.sql_renderer import column_label, render_table
+from utils.cache import content_hash
+from utils.singleflight import get_flight
+
+NO_RESULT_MESSAGE = "검색 결과가 없습니다. 다른 검색어나 조건으로 다시 시도해보세요."
+
+# 요약 프롬프트에 넣을 결과 행 수 (출력 토큰과 무관하게 입력만 제한)
+SUMMARY_SAMPLE_ROWS = 10
+
+_DONE = object()
 
 
 class SQLResultFormatter:
+    """SQL 결과 표는 로컬에서 렌더링하고, LLM은 한 문장 요약에만 사용합니다."""
+
     def __init__(self):
-        self.llm = ChatOpenAI(temperature=0, model_name="gpt-4o-mini", streaming=True)
+        self.llm = ChatOpenAI(
+            temperature=0,
+            model_name="gpt-4o-mini",
+            streaming=True,
+            **llm_options("openai"),
+        )
+        self.scheduler = get_scheduler()
 
-        self.format_prompt = ChatPromptTemplate.from_template(
-            """SQL 쿼리 결과를 읽기 쉬운 마크다운 테이블 형식으로 변환해주세요.
+        self.summary_prompt = ChatPromptTemplate.from_template(
+            """SQL 쿼리 결과를 한 문장으로 간단히 설명해주세요.
 
-            다음은 결과를 이해하는데 도움이 되는 정보입니다:
             1. SQL 쿼리: {query}
-            2. 쿼리 결과: {result}
-            3. 결과 존재 여부: {has_result}
+            2. 컬럼: {columns}
+            3. 전체 행 수: {row_count}
+            4. 결과 일부:
+            {sample}
 
-            위 정보를 바탕으로 다음과 같이 응답해주세요:
-
-            결과가 없는 경우:
-            - "검색 결과가 없습니다. 다른 검색어나 조건으로 다시 시도해보세요." 메시지 출력
-
-            위 정보를 바탕으로 다음과 같이 응답해주세요:
-            1. 결과에 대한 간단한 설명을 한 문장으로 작성, 컬럼명은 한글로 변환
-            2. 결과를 마크다운 테이블로 변환, 코드 블록으로 쓰지 말 것
-            3. 필요한 경우 금액은 천 단위 콤마를 추가
-            4. 날짜 형식은 YYYY-MM-DD로 통일
-            5. 컬럼명은 이해하기 쉽게 한글로 변환
+            - 컬럼명은 한글로 표현
+            - 표나 목록은 쓰지 말고 설명 한 문장만 작성
             """
         )
+        self.chain = self.summary_prompt | self.llm
+        self.flight = get_flight("sql_answer")
 
-    def format_result(self, sql_query: str, query_result: Any, has_result):
-        # SQL 결과를 문자열로 변환
-        if isinstance(query_result, str):
-            result_str = query_result
-        else:
-            result_str = json.dumps(query_result, ensure_ascii=False, indent=2)
+    def _inputs(self, sql_query: str, query_result: ColumnarResult) -> dict:
+        row_count = f"{query_result.row_count}"
+        if query_result.truncated:
+            row_count += " 이상"
+        return {
+            "query": sql_query,
+            "columns": ", ".join(column_label(c) for c in query_result.columns),
+            "row_count": row_count,
+            "sample": render_table(query_result, max_rows=SUMMARY_SAMPLE_ROWS),
+        }
 
-        # LLM chain 생성 및 실행
-        chain = self.format_prompt | self.llm
+    def _summary(self, inputs: dict):
+        """같은 결과의 요약 스트림이 진행 중이면 함께 받습니다."""
+        return self.flight.stream(
+            content_hash(*inputs.values()),
+            self.scheduler.retry_stream,
+            "openai",
+            self.chain.stream,
+            inputs,
+        )
 
-        # 스트리밍 응답을 반환
-        return chain.stream(
-            {"query": sql_query, "result": result_str, "has_result": has_result}
+    def _asummary(self, inputs: dict):
+        return self.flight.astream(
+            content_hash(*inputs.values()),
+            self.scheduler.aretry_stream,
+            "openai",
+            self.chain.astream,
+            inputs,
         )
+
+    @staticmethod
+    def _table(query_result: ColumnarResult) -> str:
+        table = render_table(query_result)
+        if query_result.truncated:
+            table += f"\n\n(결과가 많아 상위 {query_result.row_count}건만 표시합니다.)"
+        return table
+
+    @timed("sql_answer")
+    def format_result(self, sql_query: str, query_result: ColumnarResult, has_result):
+        """요약 문장을 스트리밍한 뒤 로컬에서 렌더링한 표를 이어서 반환합니다.
+
+        요약 LLM 호출은 백그라운드 스레드에서 시작되어 표 렌더링과 동시에
+        진행됩니다.
+        """
+        if not has_result or not query_result.row_count:
+            yield NO_RESULT_MESSAGE
+            return
+
+        chunks = queue.Queue()
+
+        def consume():
+            try:
+                for chunk in self._summary(self._inputs(sql_query, query_result)):
+                    chunks.put(chunk.content)
+            except Exception as e:
+                chunks.put(e)
+            finally:
+                chunks.put(_DONE)
+
+        threading.Thread(target=consume, daemon=True).start()
+        table = self._table(query_result)
+
+        while (chunk := chunks.get()) is not _DONE:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+        yield "\n\n" + table
+
+    @timed("sql_answer")
+    async def aformat_result(
+        self, sql_query: str, query_result: ColumnarResult, has_result
+    ):
+        """format_result의 비동기 버전 (비동기 스트림 반환)"""
+        if not has_result or not query_result.row_count:
+            yield NO_RESULT_MESSAGE
+            return
+
+        chunks = asyncio.Queue()
+
+        async def consume():
+            try:
+                async for chunk in self._asummary(
+                    self._inputs(sql_query, query_result)
+                ):
+                    chunks.put_nowait(chunk.content)
+            finally:
+                chunks.put_nowait(_DONE)
+
+        task = asyncio.create_task(consume())
+        table = self._table(query_result)
+
+        try:
+            while (chunk := await chunks.get()) is not _DONE:
+                yield chunk
+            # 요약 호출 중 발생한 예외 전파
+            await task
+        finally:
+            task.cancel()
+        yield "\n\n" + table
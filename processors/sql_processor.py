@@ -1,15 +1,29 @@
-from langchain.chains import create_sql_query_chain
-from langchain_community.utilities import SQLDatabase
-from langchain_anthropic import ChatAnthropic
-from langchain_core.prompts import PromptTemplate
+import asyncio
+from functools import cached_property
 
-import streamlit as st
+from langchain_core.prompts import PromptTemplate
 
 from processors.base import BaseProcessor
-from models.schema import ProcessedResult, QueryResult
+from processors.sql_cache import (
+    SQLPlan,
+    SQLPlanCache,
+    SQLResultCache,
+    is_single_statement,
+    prompt_date,
+)
+from models.schema import ColumnarResult, ProcessedResult, QueryResult
 from config.settings import settings
+from core.database import get_pool, get_table_versions
+from core.metrics import timed
+from core.scheduler import get_scheduler, llm_options
+from utils.cache import normalize_text
+from utils.singleflight import get_flight
+from utils.sql_examples import build_prompt_inputs
 from utils.sql_prompt import generate_prompt, generate_prompt_with_number
 
+# 결과 문자열 값의 길이 제한 (SQLDatabase.run과 동일)
+MAX_STRING_LENGTH = 300
+
 
 def extract_sql_query(response: str) -> str:
     """LLM 응답에서 SQL 쿼리만 추출"""
@@ -22,69 +36,243 @@ def extract_sql_query(response: str) -> str:
 
 
 class SQLProcessor(BaseProcessor):
+    """자연어 질문을 SQL로 변환해 실행하는 처리기
+
+    스키마를 조회하는 SQLDatabase와 LLM 체인은 첫 SQL 생성 시점에 만들고,
+    무거운 모듈(langchain_anthropic, langchain_community, sqlalchemy)도 그때
+    import하여 세션 시작 비용에 포함되지 않도록 합니다.
+    """
+
     def __init__(self):
-        self.db = SQLDatabase.from_uri(settings.POSTGRES_URI)
-        custom_prompt = PromptTemplate(
-            template=generate_prompt("{input}"),
-            input_variables=["input", "table_info", "top_k"],
-            partial_variables={"dialect": "postgresql"},
+        self.plan_cache = SQLPlanCache(
+            maxsize=settings.SQL_PLAN_CACHE_SIZE, ttl=settings.SQL_PLAN_CACHE_TTL
         )
-        custom_prompt_with_number = PromptTemplate(
-            template=generate_prompt_with_number("{input}"),
-            input_variables=["input", "table_info", "top_k", "bid_notice_no"],
-            partial_variables={"dialect": "postgresql"},
+        self.generate_flight = get_flight("sql_generate")
+        self.execute_flight = get_flight("sql_execute")
+        self.scheduler = get_scheduler()
+
+    @cached_property
+    def pool(self):
+        return get_pool()
+
+    @cached_property
+    def result_cache(self) -> SQLResultCache:
+        return SQLResultCache(
+            get_table_versions(),
+            max_bytes=settings.SQL_RESULT_CACHE_MAX_BYTES,
+            unversioned_ttl=settings.SQL_RESULT_CACHE_UNVERSIONED_TTL,
         )
 
-        self.sql_chain = create_sql_query_chain(
-            llm=ChatAnthropic(model="claude-3-5-sonnet-20241022", temperature=0),
-            db=self.db,
-            prompt=custom_prompt,
-            k=10,
+    @cached_property
+    def db(self):
+        from langchain_community.utilities import SQLDatabase
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import NullPool
+
+        # SQLAlchemy 엔진도 공유 커넥션 풀에서 커넥션을 빌려 사용
+        return SQLDatabase(
+            create_engine(
+                "postgresql+psycopg2://", creator=self.pool.borrow, poolclass=NullPool
+            )
         )
 
-        self.sql_chain_with_number = create_sql_query_chain(
-            llm=ChatAnthropic(model="claude-3-5-sonnet-20241022", temperature=0),
+    def _create_chain(self, template: str, input_variables: list[str]):
+        from langchain.chains import create_sql_query_chain
+        from langchain_anthropic import ChatAnthropic
+
+        return create_sql_query_chain(
+            llm=ChatAnthropic(
+                model="claude-3-5-sonnet-20241022",
+                temperature=0,
+                **llm_options("anthropic"),
+            ),
             db=self.db,
-            prompt=custom_prompt_with_number,
+            prompt=PromptTemplate(
+                template=template,
+                input_variables=input_variables,
+                partial_variables={"dialect": "postgresql", "today": prompt_date},
+            ),
             k=10,
         )
 
-    def process(self, query: str) -> ProcessedResult:
-        if st.session_state.selected_bid_no:
-            print("Using namespace:", st.session_state.selected_bid_no)
-            llm_response = self.sql_chain_with_number.invoke(
-                {
-                    "question": query,
-                    "table_names_to_use": [],
-                    "table_info": "",
-                    "bid_notice_no": st.session_state.selected_bid_no,
-                }
-            )
-        else:
-            llm_response = self.sql_chain.invoke(
-                {"question": query, "table_names_to_use": [], "table_info": ""}
-            )
+    @cached_property
+    def sql_chain(self):
+        return self._create_chain(
+            generate_prompt("{input}", schema="{schema}", examples="{examples}"),
+            ["input", "table_info", "top_k", "schema", "examples"],
+        )
+
+    @cached_property
+    def sql_chain_with_number(self):
+        return self._create_chain(
+            generate_prompt_with_number(
+                "{input}", schema="{schema}", examples="{examples}"
+            ),
+            ["input", "table_info", "top_k", "bid_notice_no", "schema", "examples"],
+        )
+
+    def _select_chain(self, query: str, bid_notice_no: str = None):
+        """선택된 공고 여부에 따라 사용할 체인과 입력값을 결정합니다.
+
+        프롬프트의 스키마와 예시는 질문에 맞게 골라 넣습니다 (utils.sql_examples).
+        """
+        inputs = {
+            "question": query,
+            "table_names_to_use": [],
+            "table_info": "",
+            **build_prompt_inputs(query, bid_notice_no),
+        }
+        if bid_notice_no:
+            print("Using namespace:", bid_notice_no)
+            return self.sql_chain_with_number, {
+                **inputs,
+                "bid_notice_no": bid_notice_no,
+            }
+        return self.sql_chain, inputs
+
+    @timed("sql_generate")
+    def _generate_sql(self, query: str, bid_notice_no: str = None) -> SQLPlan:
+        plan = self.plan_cache.get(query, bid_notice_no)
+        if plan is not None:
+            print(f"캐시된 SQL 사용: {plan.sql}")
+            return plan
+
+        return self.generate_flight.do(
+            (normalize_text(query), bid_notice_no),
+            self._llm_generate_sql,
+            query,
+            bid_notice_no,
+        )
+
+    def _llm_generate_sql(self, query: str, bid_notice_no: str = None) -> SQLPlan:
+        chain, inputs = self._select_chain(query, bid_notice_no)
+        llm_response = self.scheduler.retry("anthropic", chain.invoke, inputs)
         print(f"{llm_response=}")
         sql_query = extract_sql_query(llm_response)
         print(f"{sql_query=}")
-        result = self.db.run(sql_query)
+        return self.plan_cache.put(query, sql_query, bid_notice_no)
+
+    def process(self, query: str, bid_notice_no: str = None) -> ProcessedResult:
+        plan = self._generate_sql(query, bid_notice_no)
+        result = self.execute_flight.do(plan.render(), self._run, plan)
+        return self._build_result(plan.render(), result)
+
+    async def aprocess(self, query: str, bid_notice_no: str = None) -> ProcessedResult:
+        """process의 비동기 버전 (선택된 공고번호를 인자로 받음)"""
+        plan = await self.agenerate_sql(query, bid_notice_no)
+        return await self.aexecute(plan)
+
+    @timed("sql_generate")
+    async def agenerate_sql(
+        self, query: str, bid_notice_no: str = None, callbacks: list = None
+    ) -> SQLPlan:
+        """LLM으로 SQL만 생성합니다 (실행하지 않음)."""
+        plan = self.plan_cache.get(query, bid_notice_no)
+        if plan is not None:
+            return plan
+
+        # 합쳐진 호출의 토큰 사용량은 먼저 시작한 호출의 callbacks에만 기록됨
+        return await self.generate_flight.ado(
+            (normalize_text(query), bid_notice_no),
+            self._allm_generate_sql,
+            query,
+            bid_notice_no,
+            callbacks,
+        )
+
+    async def _allm_generate_sql(
+        self, query: str, bid_notice_no: str = None, callbacks: list = None
+    ) -> SQLPlan:
+        chain, inputs = await asyncio.to_thread(
+            self._select_chain, query, bid_notice_no
+        )
+        llm_response = await self.scheduler.aretry(
+            "anthropic", chain.ainvoke, inputs, config={"callbacks": callbacks}
+        )
+        sql_query = extract_sql_query(llm_response)
+        print(f"{sql_query=}")
+        return self.plan_cache.put(query, sql_query, bid_notice_no)
 
-        if result:
-            query_results = [
-                QueryResult(
-                    content=str(row), metadata={"sql_query": sql_query}, score=1.0
+    async def aexecute(self, plan: SQLPlan) -> ProcessedResult:
+        """생성된 SQL을 실행합니다."""
+        result = await self.execute_flight.ado(
+            plan.render(), asyncio.to_thread, self._run, plan
+        )
+        return self._build_result(plan.render(), result)
+
+    @timed("sql_execute")
+    def _run(self, plan: SQLPlan) -> ColumnarResult:
+        """생성된 SQL을 읽기 전용 트랜잭션과 문장 timeout 하에 실행합니다.
+
+        서버 측 커서에서 배치 단위로 읽어 컬럼별 배열에 바로 쌓으며,
+        SQL_MAX_ROWS를 넘는 행은 가져오지 않습니다.
+        """
+        from langchain_community.utilities.sql_database import truncate_word
+
+        # 읽기 전용은 트랜잭션 단위이므로 "SELECT 1; COMMIT; DELETE ..."처럼
+        # 트랜잭션을 끝내고 이어지는 문장은 막을 수 없음
+        if not is_single_statement(plan.sql):
+            raise ValueError("여러 문장으로 된 SQL은 실행하지 않습니다.")
+
+        cached = self.result_cache.get(plan)
+        if cached is not None:
+            return cached
+
+        max_rows = settings.SQL_MAX_ROWS
+        data: list[list] = []
+        row_count = 0
+        truncated = False
+        with self.pool.connection(
+            readonly=True, statement_timeout_ms=settings.SQL_STATEMENT_TIMEOUT_MS
+        ) as conn, conn.cursor(name="sql_result") as cur:
+            cur.execute(plan.sql, plan.params)
+            while True:
+                # 잘림 여부를 알기 위해 한도보다 한 행 더 요청
+                batch = cur.fetchmany(
+                    min(settings.SQL_FETCH_BATCH_SIZE, max_rows - row_count + 1)
                 )
-                for row in result
-            ]
+                if not data:
+                    data = [[] for _ in cur.description or ()]
+                if not batch:
+                    break
+                if row_count + len(batch) > max_rows:
+                    batch = batch[: max_rows - row_count]
+                    truncated = True
+                for values, value in zip(data, zip(*batch)):
+                    values.extend(
+                        truncate_word(v, length=MAX_STRING_LENGTH) for v in value
+                    )
+                row_count += len(batch)
+                if truncated:
+                    break
+            columns = [column.name for column in cur.description or ()]
+
+        result = ColumnarResult(
+            columns=columns, data=data, row_count=row_count, truncated=truncated
+        )
+        self.result_cache.put(plan, result)
+        return result
+
+    def _build_result(self, sql_query: str, result: ColumnarResult) -> ProcessedResult:
+        metadata = {
+            "sql_query": sql_query,
+            "columns": result.columns,
+            "row_count": result.row_count,
+            "truncated": result.truncated,
+        }
+        if result.row_count:
+            query_result = QueryResult(
+                content=f"{result.row_count}건이 조회되었습니다.",
+                metadata=metadata,
+                score=1.0,
+            )
         else:
-            query_results = [
-                QueryResult(
-                    content="검색 결과가 없습니다. 다른 검색어로 다시 시도해보세요.",
-                    metadata={"sql_query": sql_query, "status": "no_results"},
-                    score=0.0,
-                )
-            ]
+            query_result = QueryResult(
+                content="검색 결과가 없습니다. 다른 검색어로 다시 시도해보세요.",
+                metadata={**metadata, "status": "no_results"},
+                score=0.0,
+            )
 
         return ProcessedResult(
-            results=query_results, source_type="sql", raw_response=result
+            results=[query_result], source_type="sql", raw_response=result
         )
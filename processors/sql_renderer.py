@@ -0,0 +1,88 @@
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Optional
+
+from models.schema import ColumnarResult
+from utils.sql_prompt import get_schema_info
+
+# "- column (type): 설명" 형식의 스키마 설명 줄
+_COLUMN_LINE = re.compile(r"-\s*(\w+)\s*\(([^)]*)\)\s*:\s*(.+)")
+
+# 스키마에 없는 집계 컬럼 별칭용 한글 라벨
+_ALIAS_LABELS = {
+    "count": "건수",
+    "cnt": "건수",
+    "total": "합계",
+    "total_count": "총 건수",
+    "fail_count": "유찰 건수",
+    "success_count": "낙찰 건수",
+    "avg_amount": "평균 금액",
+    "total_amount": "총 금액",
+    "year": "연도",
+    "month": "월",
+    "day": "일",
+}
+
+# 천 단위 콤마를 붙이지 않을 숫자 컬럼 (연도, 순위, 번호 등)
+_NO_GROUPING = re.compile(r"(^|_)(year|month|day|rank|no\d*|bizno)$")
+
+
+@lru_cache(maxsize=1)
+def column_labels() -> dict[str, str]:
+    """get_schema_info의 컬럼 설명에서 컬럼명 -> 한글 라벨 매핑을 만듭니다."""
+    labels = dict(_ALIAS_LABELS)
+    for line in get_schema_info().splitlines():
+        match = _COLUMN_LINE.search(line)
+        if match:
+            name, _, description = match.groups()
+            # "입찰진행상태명(null, 유찰, ...)" 같은 부가 설명은 제외
+            labels[name] = description.split("(")[0].strip()
+    return labels
+
+
+def column_label(name: str) -> str:
+    return column_labels().get(name.lower(), name)
+
+
+def _format_number(value, grouping: bool) -> str:
+    if isinstance(value, int):
+        return f"{value:,}" if grouping else str(value)
+    if isinstance(value, Decimal) and value == value.to_integral_value():
+        return f"{int(value):,}" if grouping else str(int(value))
+    text = f"{value:,.2f}" if grouping else f"{value:.2f}"
+    return text.rstrip("0").rstrip(".")
+
+
+def format_value(value: Any, column: str = "") -> str:
+    """값 하나를 마크다운 표 셀 문자열로 변환합니다."""
+    if value is None:
+        return "-"
+    if isinstance(value, bool):
+        return "예" if value else "아니오"
+    if isinstance(value, (int, float, Decimal)):
+        return _format_number(value, not _NO_GROUPING.search(column.lower()))
+    if isinstance(value, datetime):
+        if (value.hour, value.minute, value.second) == (0, 0, 0):
+            return value.strftime("%Y-%m-%d")
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    # 표 구조를 깨는 문자 이스케이프
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def render_table(result: ColumnarResult, max_rows: Optional[int] = None) -> str:
+    """ColumnarResult를 마크다운 테이블로 렌더링합니다."""
+    header = [column_label(name) for name in result.columns]
+    lines = [
+        "| " + " | ".join(header) + " |",
+        "|" + "|".join(" --- " for _ in header) + "|",
+    ]
+    for index, row in enumerate(result.rows()):
+        if max_rows is not None and index >= max_rows:
+            break
+        cells = (format_value(v, name) for v, name in zip(row, result.columns))
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
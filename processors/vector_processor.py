@@ -1,29 +1,44 @@
 import logging
-import streamlit as st
+from functools import cached_property
+
 from langchain_core.prompts import load_prompt
-from langchain_pinecone import PineconeVectorStore
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from postprocessors.reranker import CohereDocumentReranker
+from langchain_openai import ChatOpenAI
+from postprocessors.reranker import get_reranker
 from processors.base import BaseProcessor
-from processors.retriever import HybridRetriever
-from models.schema import ProcessedResult, QueryResult
+from processors.retriever import get_retriever_pool
+from models.schema import ProcessedResult
 from config.settings import settings
+from core.metrics import timed
+from core.scheduler import get_scheduler, llm_options
+from utils.cache import content_hash, normalize_text
+from utils.embedding_cache import get_embeddings
+from utils.singleflight import get_flight
 
 
 class VectorProcessor(BaseProcessor):
     def __init__(self, text_key="context"):
-        # gRPC 클라이언트로 Pinecone 초기화
         self._namespace = None
-        self.embeddings = OpenAIEmbeddings()
-        self.pc = PineconeVectorStore(
-            index_name=settings.PINECONE_INDEX_NAME,
-            embedding=self.embeddings,
-            text_key=text_key,
-        )
+        self.text_key = text_key
+        self.embeddings = get_embeddings()
         self.response_prompt = load_prompt(
             "prompts/vector_process.yaml", encoding="utf-8"
         )
-        self.llm = ChatOpenAI(temperature=0, model_name="gpt-4o")
+        self.llm = ChatOpenAI(
+            temperature=0, model_name="gpt-4o", **llm_options("openai")
+        )
+        self.scheduler = get_scheduler()
+        self.flight = get_flight("vector_answer")
+
+    @cached_property
+    def pc(self):
+        """Pinecone 벡터 스토어 (검색은 리트리버 풀을 사용하므로 필요할 때만 생성)"""
+        from langchain_pinecone import PineconeVectorStore
+
+        return PineconeVectorStore(
+            index_name=settings.PINECONE_INDEX_NAME,
+            embedding=self.embeddings,
+            text_key=self.text_key,
+        )
 
     @property
     def namespace(self):
@@ -33,36 +48,29 @@ class VectorProcessor(BaseProcessor):
     def namespace(self, value):
         self._namespace = value
 
-    def process(self, query: str, top_k: int = 5) -> ProcessedResult:
-        # 쿼리 임베딩 생성
+    def process(
+        self, query: str, top_k: int = 5, namespace: str = None
+    ) -> ProcessedResult:
+        """인스턴스를 여러 세션이 공유하므로 네임스페이스는 인자로 받습니다."""
         try:
             # 1. retriever 단계
-            st.info("Starting Hybrid Retrieval...")
-            retriever = HybridRetriever(self.namespace)
+            logging.info("하이브리드 검색 시작")
+            retriever = get_retriever_pool().get(namespace or self.namespace)
             results = retriever.retrieve(query)
 
             logging.info(f"검색 완료 - 결과 수: {len(results)}")
 
-            # 결과 변환
-            results = [
-                QueryResult(
-                    content=result.content,
-                    metadata=result.metadata,
-                )
-                for result in results
-            ]
-
             # 2. rerank 단계
-            st.info("Starting Reranking...")
-            reranker = CohereDocumentReranker(top_k=top_k)
-            results = reranker.rerank(
+            logging.info("재순위화 시작")
+            results = get_reranker().rerank(
                 ProcessedResult(
                     results=results, source_type="vector", raw_response=results
                 ),
                 query,
+                top_k=top_k,
             )
 
-            st.info("Hybrid Retrieval Completed!")
+            logging.info("하이브리드 검색 완료")
 
             return results
 
@@ -72,8 +80,63 @@ class VectorProcessor(BaseProcessor):
                 results=[], source_type="vector", raw_response=str(e)
             )
 
+    async def aprocess(
+        self, query: str, top_k: int = 5, namespace: str = None
+    ) -> ProcessedResult:
+        """process의 비동기 버전
+
+        여러 세션이 인스턴스를 공유할 수 있도록 네임스페이스를 인자로 받습니다.
+        """
+        try:
+            retriever = get_retriever_pool().get(namespace or self.namespace)
+            results = await retriever.aretrieve(query)
+            logging.info(f"검색 완료 - 결과 수: {len(results)}")
+
+            return await get_reranker().arerank(
+                ProcessedResult(
+                    results=results, source_type="vector", raw_response=results
+                ),
+                query,
+                top_k=top_k,
+            )
+
+        except Exception as e:
+            print(f"Error processing vector query: {e}")
+            return ProcessedResult(
+                results=[], source_type="vector", raw_response=str(e)
+            )
+
+    @timed("vector_answer")
     def response(self, query: str, result: ProcessedResult):
+        """같은 질문과 컨텍스트로 진행 중인 답변 스트림이 있으면 함께 받습니다."""
+        chain = self.response_prompt | self.llm
+        inputs = {"context": self._build_context(result), "query": query}
+        return self.flight.stream(
+            self._answer_key(inputs),
+            self.scheduler.retry_stream,
+            "openai",
+            chain.stream,
+            inputs,
+        )
+
+    @timed("vector_answer")
+    def aresponse(self, query: str, result: ProcessedResult):
+        """response의 비동기 버전 (비동기 스트림 반환)"""
+        chain = self.response_prompt | self.llm
+        inputs = {"context": self._build_context(result), "query": query}
+        return self.flight.astream(
+            self._answer_key(inputs),
+            self.scheduler.aretry_stream,
+            "openai",
+            chain.astream,
+            inputs,
+        )
 
+    @staticmethod
+    def _answer_key(inputs: dict) -> str:
+        return content_hash(normalize_text(inputs["query"]), inputs["context"])
+
+    def _build_context(self, result: ProcessedResult) -> str:
         # 3. response 만들기
         print(f"{len(result.results)} results found")
         # extract_results = [r for r in result.results if r.metadata["type"] == "table"][
@@ -117,9 +180,4 @@ class VectorProcessor(BaseProcessor):
             contexts.append(f"{r.content} {source}")
 
         # context = "\n".join([query_result.content for query_result in extract_results])
-        context = "\n".join(contexts)
-        chain = self.response_prompt | self.llm
-
-        response = chain.stream({"context": context, "query": query})
-
-        return response
+        return "\n".join(contexts)
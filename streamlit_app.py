@@ -1,64 +1,168 @@
-import logging
 import streamlit as st
-from core.router import QueryRouter
-from processors.sql_processor import SQLProcessor
+from config.settings import settings
+from core.metrics import get_metrics, start_metrics_server
+from core.session import SessionState, get_session_store
 from processors.namespace_finder import NamespaceFinder
-from processors.vector_processor import VectorProcessor
-from processors.sql_formatter import SQLResultFormatter
 import os
+import uuid
 
 
-class RAGApp:
-    def __init__(self):
-        self.router = QueryRouter()
-        self.sql_processor = SQLProcessor()
-        self.vector_processor = VectorProcessor()
-        self.sql_formatter = SQLResultFormatter()
-        self.namespace_finder = NamespaceFinder()
-
-    def process_query(self, query: str):
-        # 쿼리 라우팅
-        db_type = self.router.route(query)
-
-        print(f"{db_type} 조회...")
-
-        # 프로세서 선택 및 실행
-        if db_type == "rdb":
-            result = self.sql_processor.process(query)
-            print(f"rdb결과.. {result}")
-            return (
-                self.sql_formatter.format_result(
-                    result.results[0].metadata["sql_query"],
-                    result.raw_response,
-                    bool(result.results[0].score),
-                ),
-                db_type,
+@st.cache_resource(show_spinner=False)
+def get_rag_app():
+    """프로세스 전역에서 공유하는 질의 처리기 (세션마다 새로 만들지 않음)
+
+    RAG_API_URL이 설정되어 있으면 헤드리스 API를 호출하는 클라이언트를,
+    아니면 이 프로세스에서 파이프라인을 실행하는 RAGApp을 반환합니다.
+    """
+    if settings.RAG_API_URL:
+        from api.client import RAGClient
+
+        return RAGClient(settings.RAG_API_URL)
+
+    from core.pipeline import RAGApp
+
+    return RAGApp()
+
+
+def _markdown_table(headers: list[str], rows: list[list]) -> str:
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    lines += ["| " + " | ".join(str(v) for v in row) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+def render_metrics_panel():
+    """단계별 지연 시간, 캐시/토큰 카운터, 대기열 게이지를 사이드바에 표시합니다."""
+    if settings.RAG_API_URL:
+        # 파이프라인 메트릭은 API 워커에서 수집됨
+        try:
+            snapshot = st.session_state.rag_app.metrics_snapshot()
+        except Exception as e:
+            st.caption(f"API 메트릭을 가져오지 못했습니다: {e}")
+            return
+    else:
+        snapshot = get_metrics().snapshot()
+    with st.expander("성능 메트릭"):
+        if not snapshot["stages"]:
+            st.caption("아직 수집된 메트릭이 없습니다.")
+            return
+        if snapshot["recent"]:
+            last = snapshot["recent"][0]
+            st.markdown(f"**최근 요청**: {last['total'] * 1000:,.0f} ms")
+            st.markdown(
+                _markdown_table(
+                    ["단계", "ms"],
+                    [
+                        [span["stage"], f"{span['seconds'] * 1000:,.1f}"]
+                        for span in last["spans"]
+                    ],
+                )
+            )
+        st.markdown("**단계별 지연 시간 (ms)**")
+        st.markdown(
+            _markdown_table(
+                ["단계", "n", "p50", "p95", "p99"],
+                [
+                    [stage, stats["count"]]
+                    + [f"{stats[q] * 1000:,.1f}" for q in ("p50", "p95", "p99")]
+                    for stage, stats in snapshot["stages"].items()
+                ],
+            )
+        )
+        if snapshot["counters"]:
+            st.markdown("**카운터**")
+            st.markdown(
+                _markdown_table(
+                    ["이름", "레이블", "값"],
+                    [
+                        [
+                            counter["name"],
+                            ", ".join(f"{k}={v}" for k, v in counter["labels"].items()),
+                            f"{counter['value']:,}",
+                        ]
+                        for counter in snapshot["counters"]
+                    ],
+                )
+            )
+        # 이전 버전 API 워커의 스냅샷에는 gauges가 없음
+        if snapshot.get("gauges"):
+            st.markdown("**게이지**")
+            st.markdown(
+                _markdown_table(
+                    ["이름", "레이블", "값"],
+                    [
+                        [
+                            gauge["name"],
+                            ", ".join(f"{k}={v}" for k, v in gauge["labels"].items()),
+                            f"{gauge['value']:,}",
+                        ]
+                        for gauge in snapshot["gauges"]
+                    ],
+                )
             )
-        else:
-            logging.info("Processing Vector query...")
-            # Vector 검색을 위한 namespace 찾기
-            if not st.session_state.selected_bid_no:
-                st.session_state.namespace_finder.find_namespace(query)
-                print(f"Found namespace: {st.session_state.selected_bid_no}")
-                if not st.session_state.selected_bid_no:
-                    return None, db_type
-            else:
-                namespace = st.session_state.selected_bid_no
 
-            print("Using namespace:", namespace)
-            self.vector_processor.namespace = namespace
-            result = self.vector_processor.process(query)
 
-            formatted_response = self.vector_processor.response(query, result)
+def render_notice_picker(finder: NamespaceFinder, session: SessionState, query: str):
+    """공고 후보를 보여주고 사용자가 고른 공고를 세션에 저장합니다."""
+    # 이미 선택된 공고가 있다면 반환
+    if session.selected_bid_no and session.search_complete:
+        return session.selected_bid_no
 
-            return formatted_response, db_type
+    # 하이브리드 검색으로 후보 찾기 (후보는 세션에 저장됨)
+    search_result = finder.search(query, session)
+    if not search_result["results"]:
+        return None
+    get_session_store().save(session)
+
+    # 검색에 사용된 키워드 표시
+    st.write(f"검색 키워드: {', '.join(search_result['keywords'])}")
+
+    # 사용자에게 확인 (Streamlit UI에 radio 버튼으로 표시)
+    st.write("### 찾고 계신 공고가 다음 중 하나인가요?")
+
+    # Radio 버튼용 옵션 생성
+    options = []
+    for candidate in session.candidates:
+        bid_url = f"https://www.g2b.go.kr:8101/ep/invitation/publish/bidInfoDtl.do?bidno={candidate['bid_notice_no']}"
+        option_text = (
+            f"{candidate['bid_notice_nm']}\n"
+            f"공고번호: [{candidate['bid_notice_no']}]({bid_url})\n"
+            f"분류: {candidate['ntce_kind_nm']} | {candidate['pub_prcrmnt_clsfc_nm']}\n"
+            f"기관: {candidate['dminstt_nm']}\n"
+            f"유사도 점수: {candidate.get('total_score', candidate.get('score', 0)):.3f}"
+        )
+        options.append(option_text)
+
+    options.append("찾는 공고가 없습니다")
+
+    selected_option = st.radio(
+        "공고를 선택해주세요:", options, key=f"radio_{len(options)}"
+    )
+
+    # 선택 버튼 추가
+    if st.button("선택 완료", key="select_complete"):
+        # "찾는 공고가 없습니다" 선택 시
+        if selected_option == options[-1]:
+            st.warning("다른 키워드로 다시 검색해주세요.")
+            finder.select(session, None)
+            get_session_store().save(session)
+            return None
+
+        bid_notice_no = finder.select(session, options.index(selected_option))
+        get_session_store().save(session)
+
+        st.success(f"선택된 공고번호: {bid_notice_no}")
+        return bid_notice_no
+
+    return None
 
 
 def create_streamlit_app():
     st.title("Advanced RAG Query System")
+    if not settings.RAG_API_URL:
+        start_metrics_server()
 
-    # 환경 변수 설정
-    if "OPENAI_API_KEY" not in os.environ:
+    # 환경 변수 설정 (API 클라이언트 모드에서는 API 서버의 키를 사용)
+    if not settings.RAG_API_URL and "OPENAI_API_KEY" not in os.environ:
         openai_api_key = st.sidebar.text_input("OpenAI API Key", type="password")
         if openai_api_key:
             os.environ["OPENAI_API_KEY"] = openai_api_key
@@ -69,36 +173,38 @@ def create_streamlit_app():
     # 세션 상태 초기화
     if "messages" not in st.session_state:
         st.session_state.messages = []
-    if "selected_bid_no" not in st.session_state:
-        st.session_state.selected_bid_no = None
-    if "candidates" not in st.session_state:
-        st.session_state.candidates = []
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
     if "rag_app" not in st.session_state:
-        st.session_state.rag_app = RAGApp()
+        st.session_state.rag_app = get_rag_app()
     if "namespace_finder" not in st.session_state:
-        st.session_state.namespace_finder = NamespaceFinder()
+        # 검색은 공유 처리기(RAGApp 또는 API 클라이언트)에 위임
+        st.session_state.namespace_finder = NamespaceFinder(st.session_state.rag_app)
     if "current_response" not in st.session_state:
         st.session_state.current_response = None
 
+    # 공고 검색/선택 상태는 세션 저장소에 보관 (SESSION_BACKEND)
+    session = get_session_store().load(st.session_state.session_id)
+
     # 사이드바 설정
     with st.sidebar:
         st.markdown("### System Info")
         st.markdown("- Query Router: LLM based")
         st.markdown("- RDB: PostgreSQL with Langchain")
         st.markdown("- Vector DB: Pinecone with Langchain")
+        render_metrics_panel()
 
         # 선택된 공고 정보 표시
-        if st.session_state.selected_bid_no:
+        if session.selected_bid_no:
             st.markdown("### 선택된 공고")
-            last_selected = st.session_state.get("last_selected")
+            last_selected = session.last_selected
             if last_selected:
                 st.markdown(f"**공고명**: {last_selected['bid_notice_nm']}")
                 st.markdown(f"**공고번호**: {last_selected['bid_notice_no']}")
                 if st.button("공고 선택 초기화"):
-                    st.session_state.selected_bid_no = None
-                    st.session_state.candidates = []
+                    session.reset()
+                    get_session_store().save(session)
                     st.session_state.current_response = None
-                    st.session_state.last_selected = None
                     st.rerun()
 
     # 모든 메시지 표시
@@ -110,16 +216,18 @@ def create_streamlit_app():
             if (
                 message == st.session_state.messages[-1]
                 and message["role"] == "user"
-                and not st.session_state.selected_bid_no
+                and not session.selected_bid_no
             ):
 
                 # 공고 검색 및 선택지 표시
-                st.session_state.namespace_finder.find_namespace(message["content"])
-                if st.session_state.selected_bid_no:
+                render_notice_picker(
+                    st.session_state.namespace_finder, session, message["content"]
+                )
+                if session.selected_bid_no:
                     st.session_state.messages.append(
                         {
                             "role": "system",
-                            "content": f"공고번호: {st.session_state.selected_bid_no}",
+                            "content": f"공고번호: {session.selected_bid_no}",
                         }
                     )
                     st.rerun()
@@ -127,7 +235,7 @@ def create_streamlit_app():
     # 쿼리 입력
     input_placeholder = (
         "질문을 입력하세요"
-        if st.session_state.selected_bid_no
+        if session.selected_bid_no
         else "검색할 공고의 키워드를 입력하세요"
     )
 
@@ -135,51 +243,59 @@ def create_streamlit_app():
         # 사용자 입력 표시
         st.session_state.messages.append({"role": "user", "content": prompt})
 
-        # 먼저 쿼리 타입 확인 (이 부분을 밖으로 뺌)
-        response_stream, db_type = st.session_state.rag_app.process_query(prompt)
-
-        # RDB 쿼리이거나 공고가 선택된 경우에만 답변 생성
-        if db_type == "rdb" or st.session_state.selected_bid_no:
-            try:
-                with st.chat_message("assistant"):
-                    if db_type == "rdb":
-                        message_placeholder = st.empty()
-                        full_response = []
-                        for chunk in response_stream:
-                            content = (
-                                chunk.content
-                                if hasattr(chunk, "content")
-                                else str(chunk)
-                            )
-                            full_response.append(content)
-                            message_placeholder.markdown("".join(full_response) + "▌")
-                        final_response = "".join(full_response)
-                        message_placeholder.markdown(final_response)
-                    else:  # vector DB case
-                        message_placeholder = st.empty()
-                        full_response = []
-                        for chunk in response_stream:
-                            content = (
-                                chunk.content
-                                if hasattr(chunk, "content")
-                                else str(chunk)
-                            )
-                            full_response.append(content)
-                            message_placeholder.markdown("".join(full_response) + "▌")
-                        final_response = "".join(full_response)
-                        message_placeholder.markdown(final_response)
+        # 답변 스트리밍까지 포함한 단계별 소요 시간 기록
+        with get_metrics().trace():
+            # 먼저 쿼리 타입 확인 (이 부분을 밖으로 뺌)
+            response_stream, db_type = st.session_state.rag_app.process_query(
+                prompt, session
+            )
+
+            # RDB 쿼리이거나 공고가 선택된 경우에만 답변 생성
+            if db_type == "rdb" or session.selected_bid_no:
+                try:
+                    with st.chat_message("assistant"):
+                        if db_type == "rdb":
+                            message_placeholder = st.empty()
+                            full_response = []
+                            for chunk in response_stream:
+                                content = (
+                                    chunk.content
+                                    if hasattr(chunk, "content")
+                                    else str(chunk)
+                                )
+                                full_response.append(content)
+                                message_placeholder.markdown(
+                                    "".join(full_response) + "▌"
+                                )
+                            final_response = "".join(full_response)
+                            message_placeholder.markdown(final_response)
+                        else:  # vector DB case
+                            message_placeholder = st.empty()
+                            full_response = []
+                            for chunk in response_stream:
+                                content = (
+                                    chunk.content
+                                    if hasattr(chunk, "content")
+                                    else str(chunk)
+                                )
+                                full_response.append(content)
+                                message_placeholder.markdown(
+                                    "".join(full_response) + "▌"
+                                )
+                            final_response = "".join(full_response)
+                            message_placeholder.markdown(final_response)
 
+                        st.session_state.messages.append(
+                            {"role": "assistant", "content": final_response}
+                        )
+                except Exception as e:
+                    error_message = f"쿼리 처리 중 오류가 발생했습니다: {str(e)}"
+                    st.error(error_message)
                     st.session_state.messages.append(
-                        {"role": "assistant", "content": final_response}
+                        {"role": "assistant", "content": error_message}
                     )
-            except Exception as e:
-                error_message = f"쿼리 처리 중 오류가 발생했습니다: {str(e)}"
-                st.error(error_message)
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": error_message}
-                )
-        else:
-            st.warning("Vector 검색을 위해서는 먼저 공고를 선택해주세요!")
+            else:
+                st.warning("Vector 검색을 위해서는 먼저 공고를 선택해주세요!")
         st.rerun()
 
 
@@ -0,0 +1,2 @@
+# config.settings를 읽기 전에 오프라인 환경 변수를 구성 (import 시 설정됨)
+import benchmarks.run  # noqa: F401
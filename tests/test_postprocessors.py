@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from benchmarks.bench_reorder import legacy_mmr_selection, make_results
+from benchmarks.fakes import FakeCohereClient
+from models.schema import ProcessedResult, QueryResult
+from postprocessors.reorder import DiversityReorder
+from postprocessors.reranker import CohereDocumentReranker
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("threshold", [0.0, 0.3, 0.9])
+def test_diversity_reorder_matches_legacy_order(seed, threshold):
+    results = make_results(40, words_per_doc=15, seed=seed)
+    expected = legacy_mmr_selection(results, threshold)
+
+    reordered = asyncio.run(
+        DiversityReorder(diversity_threshold=threshold).process(
+            ProcessedResult(results=list(results), source_type="vector")
+        )
+    )
+    assert [r.metadata["id"] for r in reordered.results] == expected
+
+
+def test_diversity_reorder_top_k_is_prefix_of_full_order():
+    results = make_results(30, words_per_doc=10, seed=7)
+    reorder = DiversityReorder(diversity_threshold=0.3)
+
+    full = reorder._mmr_selection(results)
+    assert reorder._mmr_selection(results, top_k=5) == full[:5]
+
+
+class CountingCohereClient(FakeCohereClient):
+    """요청별로 보낸 문서를 기록하는 Cohere 대역"""
+
+    latency = 0.0
+
+    def __init__(self):
+        self.requests: list[list[str]] = []
+
+    def rerank(self, model: str, query: str, documents: list[str], top_n: int, **_):
+        self.requests.append(list(documents))
+        return super().rerank(model, query, documents, top_n)
+
+
+def _processed(contents: list[str]) -> ProcessedResult:
+    return ProcessedResult(
+        results=[
+            QueryResult(content=c, metadata={"id": i}) for i, c in enumerate(contents)
+        ],
+        source_type="vector",
+    )
+
+
+@pytest.fixture
+def reranker():
+    reranker = CohereDocumentReranker(top_k=3)
+    reranker._client = CountingCohereClient()
+    return reranker
+
+
+def test_reranker_reuses_cached_scores(reranker):
+    contents = ["입찰 참가 자격 요건", "제안서 평가 기준", "계약 보증금 납부"]
+    first = reranker.rerank(_processed(contents), "참가 자격")
+    second = reranker.rerank(_processed(contents), "참가 자격")
+
+    assert len(reranker.client.requests) == 1
+    assert [r.content for r in second.results] == [r.content for r in first.results]
+    assert second.raw_response == first.raw_response
+    assert reranker.stats.get("hits") == len(contents)
+
+
+def test_reranker_sends_only_uncached_documents(reranker):
+    reranker.rerank(_processed(["입찰 참가 자격 요건", "제안서 평가 기준"]), "자격")
+    reranker.rerank(
+        _processed(["제안서 평가 기준", "계약 보증금 납부", "계약 보증금 납부"]), "자격"
+    )
+
+    # 중복 문서는 한 번만, 이미 점수가 있는 문서는 다시 보내지 않음
+    assert reranker.client.requests[1] == ["계약 보증금 납부"]
+    # 다른 질문은 점수를 공유하지 않음
+    reranker.rerank(_processed(["제안서 평가 기준"]), "평가")
+    assert reranker.client.requests[2] == ["제안서 평가 기준"]
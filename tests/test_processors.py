@@ -0,0 +1,105 @@
+import pytest
+
+from processors import sql_cache
+from processors.sql_cache import SQLPlan, SQLPlanCache, SQLResultCache
+
+MONTHLY_FAILS_SQL = """
+    SELECT COUNT(*) FROM bid_result_fails
+    WHERE openg_dt >= '2026-10-01' AND openg_dt < '2026-11-01'
+"""
+
+
+def test_plan_cache_misses_after_date_changes(monkeypatch):
+    cache = SQLPlanCache()
+    monkeypatch.setattr(sql_cache, "prompt_date", lambda: "2026-10-31")
+    cache.put("이번 달 유찰 공고 수", MONTHLY_FAILS_SQL)
+    assert cache.get("이번 달 유찰 공고 수").sql == MONTHLY_FAILS_SQL
+
+    monkeypatch.setattr(sql_cache, "prompt_date", lambda: "2026-11-01")
+    assert cache.get("이번 달 유찰 공고 수") is None
+
+
+class FixedVersions:
+    """TableVersions 대역 (고정 버전)"""
+
+    def __init__(self, versions: dict):
+        self.versions = versions
+
+    def snapshot(self, tables) -> tuple:
+        return tuple((table, self.versions.get(table, 0)) for table in sorted(tables))
+
+
+def test_result_cache_expires_unversioned_tables(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sql_cache.time, "monotonic", lambda: now[0])
+    plan = SQLPlan("SELECT COUNT(*) FROM naramarket_bids")
+    unversioned = SQLResultCache(FixedVersions({}), unversioned_ttl=300)
+    versioned = SQLResultCache(
+        FixedVersions({"naramarket_bids": 3}), unversioned_ttl=300
+    )
+    for cache in (unversioned, versioned):
+        cache.put(plan, [(1,)])
+        assert cache.get(plan) == [(1,)]
+
+    now[0] += 301
+    assert unversioned.get(plan) is None
+    assert versioned.get(plan) == [(1,)]
+
+
+NOTICE = "R24BK00000001"
+OTHER_NOTICE = "R24BK00000002"
+
+
+def test_plan_cache_reuses_plan_for_other_notices():
+    cache = SQLPlanCache()
+    sql = f"SELECT bid_notice_nm FROM naramarket_bids WHERE bid_notice_no = '{NOTICE}'"
+    plan = cache.put("공고명 알려줘", sql, NOTICE)
+    assert plan.params == {"bid_notice_no": NOTICE}
+    assert sql_cache.BID_NOTICE_PARAM in plan.sql
+
+    cached = cache.get("공고명 알려줘", OTHER_NOTICE)
+    assert cached.sql == plan.sql
+    assert cached.params == {"bid_notice_no": OTHER_NOTICE}
+    assert cached.render() == sql.replace(NOTICE, OTHER_NOTICE)
+    # 질문에 공고번호가 들어 있어도 같은 계획을 사용
+    assert cache.get(f"{OTHER_NOTICE} 공고명 알려줘", OTHER_NOTICE) is None
+    cache.put(f"{NOTICE} 공고명 알려줘", sql, NOTICE)
+    assert cache.get(f"{OTHER_NOTICE} 공고명 알려줘", OTHER_NOTICE) is not None
+
+
+def test_plan_cache_escapes_percent_signs():
+    cache = SQLPlanCache()
+    sql = (
+        "SELECT * FROM naramarket_bids "
+        f"WHERE bid_notice_no = '{NOTICE}' AND bid_notice_nm LIKE '%정보%'"
+    )
+    plan = cache.put("정보 공고", sql, NOTICE)
+    assert "'%%정보%%'" in plan.sql
+    # psycopg2 파라미터 치환과 같은 방식으로 채우면 원래 SQL이 됨
+    assert plan.sql % {"bid_notice_no": f"'{NOTICE}'"} == sql
+    assert cache.get("정보 공고", OTHER_NOTICE).render() == sql.replace(
+        NOTICE, OTHER_NOTICE
+    )
+
+    # 공고번호가 없는 SQL은 그대로 실행되므로 이스케이프하지 않음
+    plain = "SELECT * FROM naramarket_bids WHERE bid_notice_nm LIKE '%정보%'"
+    assert cache.put("정보 공고 전체", plain).sql == plain
+    assert cache.get("정보 공고 전체").sql == plain
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        # 공고번호를 리터럴로 쓰지 않음
+        "SELECT * FROM naramarket_bids ORDER BY bid_notice_date DESC LIMIT 1",
+        # 리터럴 외의 형태(LIKE 패턴)로 공고번호가 남음
+        f"SELECT * FROM naramarket_bids WHERE bid_notice_no LIKE '{NOTICE[:8]}%'"
+        f" OR bid_notice_no = '{NOTICE}' OR bid_notice_nm LIKE '%{NOTICE}%'",
+    ],
+)
+def test_plan_cache_skips_uncacheable_sql(sql):
+    cache = SQLPlanCache()
+    plan = cache.put("공고 알려줘", sql, NOTICE)
+    assert plan.sql == sql and not plan.params
+    assert cache.get("공고 알려줘", NOTICE) is None
+    assert cache.stats.get("uncacheable") == 1
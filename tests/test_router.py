@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings
+from core.route_cache import SemanticRouteCache
+from core.router import QueryRouter
+
+
+class CountingResponder:
+    """라우팅 LLM 대역의 응답 함수 (호출 횟수 기록)"""
+
+    def __init__(self, route: str):
+        self.route = route
+        self.calls = 0
+
+    def __call__(self, prompt: str) -> str:
+        self.calls += 1
+        return self.route
+
+
+@pytest.fixture
+def make_router():
+    def make(route: str = "rdb", threshold: float = 0.75):
+        responder = CountingResponder(route)
+        router = QueryRouter(use_cache=False)
+        router.llm = FakeChatModel(
+            responder=responder, first_token_latency=0, token_latency=0
+        )
+        router.cache = SemanticRouteCache(
+            embed_fn=FakeEmbeddings(dim=256, latency=0).embed_query,
+            similarity_threshold=threshold,
+        )
+        return router, responder
+
+    return make
+
+
+def test_route_is_cached_by_normalized_question(make_router):
+    router, responder = make_router("rdb")
+
+    assert router.route("2024년 유찰 공고 건수 알려줘") == "rdb"
+    assert router.route("  2024년 유찰 공고 건수, 알려줘?") == "rdb"
+    assert responder.calls == 1
+    assert router.cache.stats.get("exact_hits") == 1
+
+
+def test_similar_question_reuses_route(make_router):
+    router, responder = make_router("rdb")
+    router.route("2024년 유찰 공고 건수 월별 알려줘")
+
+    assert router.route("2024년 유찰 공고 건수 월별 보여줘") == "rdb"
+    assert responder.calls == 1
+    assert router.cache.stats.get("semantic_hits") == 1
+
+
+def test_unrelated_question_calls_llm(make_router):
+    router, responder = make_router("vector")
+    router.route("2024년 유찰 공고 건수 알려줘")
+
+    prediction = router.cache.predict("제안서 평가 기준이 뭐야")
+    assert not prediction.hit
+    assert router.route("제안서 평가 기준이 뭐야") == "vector"
+    assert responder.calls == 2
+
+
+def test_invalid_route_is_not_cached(make_router):
+    router, responder = make_router("모르겠습니다")
+
+    router.route("안녕")
+    router.route("안녕")
+    assert responder.calls == 2
+    assert router.cache.predict("안녕").route is None
+
+
+def test_async_route_shares_cache(make_router):
+    router, responder = make_router("vector")
+    router.route("입찰 참가 자격 알려줘")
+
+    assert asyncio.run(router.aroute("입찰 참가 자격 알려줘")) == "vector"
+    assert responder.calls == 1
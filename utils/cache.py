@@ -0,0 +1,122 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from core.metrics import get_metrics
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키 생성을 위해 질문 텍스트를 정규화합니다."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    # 구두점 제거 및 공백 정리
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def content_hash(*parts: str) -> str:
+    """여러 문자열을 묶어 고정 길이 해시 키를 생성합니다."""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """캐시 적중/실패 카운터
+
+    이름을 주면 같은 이름의 모든 인스턴스 카운터가 전역 메트릭
+    (cache_events{cache=이름, event=...})에도 합산됩니다.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self._lock = threading.Lock()
+        self.counters: dict[str, int] = {}
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        if self.name and value:
+            get_metrics().incr("cache_events", value, cache=self.name, event=name)
+
+    def get(self, name: str) -> int:
+        return self.counters.get(name, 0)
+
+    def hit_rate(self) -> float:
+        hits = sum(v for k, v in self.counters.items() if k.endswith("hits"))
+        total = hits + self.get("misses")
+        return hits / total if total else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self.counters)
+        stats["hit_rate"] = round(self.hit_rate(), 4)
+        return stats
+
+
+class TTLCache:
+    """크기 제한과 TTL을 가진 스레드 안전 LRU 캐시"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            stored_at, value = item
+            if self._expired(stored_at, time.monotonic()):
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[1]
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """만료되지 않은 항목을 오래된 순서로 반환합니다."""
+        with self._lock:
+            self.expire()
+            return [(key, value) for key, (_, value) in self._data.items()]
+
+    def expire(self) -> int:
+        """만료된 항목을 정리하고 제거된 개수를 반환합니다."""
+        if self.ttl is None:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (t, _) in self._data.items() if self._expired(t, now)]
+            for key in expired:
+                del self._data[key]
+            return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
@@ -0,0 +1,268 @@
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from psycopg2.extras import RealDictCursor, execute_values
+
+
+@dataclass
+class BackfillStats:
+    """백필 진행 상황"""
+
+    rows: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    last_id: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class EmbeddingBackfill:
+    """content_embedding이 비어 있는 naramarket_bids 레코드를 일괄 임베딩합니다.
+
+    id 기준 키셋 페이지네이션으로 전체 대상을 순회하고, 배치 단위
+    aembed_documents 호출을 동시성 제한 하에 실행한 뒤 스테이징 테이블을
+    거쳐 한 번의 UPDATE ... FROM으로 반영합니다. 앞선 배치가 모두 반영된
+    마지막 id를 체크포인트로 기록하므로 중단 후 이어서 실행할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        conn,
+        embeddings: Embeddings,
+        text_fn: Callable[[dict], str],
+        batch_size: int = 256,
+        concurrency: int = 4,
+        job_name: str = "naramarket_bids",
+        progress_fn: Optional[Callable[[BackfillStats], None]] = None,
+    ):
+        self.conn = conn
+        self.embeddings = embeddings
+        self.text_fn = text_fn
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.job_name = job_name
+        self.progress_fn = progress_fn or self._log_progress
+        # psycopg2 커넥션을 여러 스레드에서 직렬화해 사용
+        self._db_lock = threading.Lock()
+
+    def _setup(self):
+        with self._db_lock, self.conn.cursor() as cur:
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embedding_backfill_checkpoints (
+                    job_name TEXT PRIMARY KEY,
+                    last_id BIGINT NOT NULL,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+                """
+            )
+            cur.execute(
+                """
+                CREATE TEMP TABLE IF NOT EXISTS embedding_staging (
+                    id BIGINT PRIMARY KEY,
+                    content_embedding vector
+                )
+                """
+            )
+            self.conn.commit()
+
+    def _load_checkpoint(self) -> int:
+        with self._db_lock, self.conn.cursor() as cur:
+            cur.execute(
+                "SELECT last_id FROM embedding_backfill_checkpoints WHERE job_name = %s",
+                (self.job_name,),
+            )
+            row = cur.fetchone()
+            self.conn.commit()
+            return row[0] if row else 0
+
+    def reset_checkpoint(self):
+        """체크포인트를 삭제하여 처음부터 다시 순회하도록 합니다."""
+        self._setup()
+        with self._db_lock, self.conn.cursor() as cur:
+            cur.execute(
+                "DELETE FROM embedding_backfill_checkpoints WHERE job_name = %s",
+                (self.job_name,),
+            )
+            self.conn.commit()
+
+    def _fetch_page(self, after_id: int) -> List[dict]:
+        """키셋 페이지네이션으로 다음 배치를 조회합니다."""
+        with self._db_lock, self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                """
+                SELECT
+                    id,
+                    bid_notice_no,
+                    bid_notice_nm,
+                    ntce_kind_nm,
+                    dminstt_nm,
+                    pub_prcrmnt_clsfc_nm
+                FROM naramarket_bids
+                WHERE content_embedding IS NULL
+                  AND id > %s
+                ORDER BY id
+                LIMIT %s
+                """,
+                (after_id, self.batch_size),
+            )
+            rows = cur.fetchall()
+            self.conn.commit()
+            return rows
+
+    def _write_batch(self, ids: List[int], vectors: List[List[float]]):
+        """스테이징 테이블에 적재 후 UPDATE ... FROM으로 일괄 반영합니다."""
+        with self._db_lock:
+            try:
+                with self.conn.cursor() as cur:
+                    execute_values(
+                        cur,
+                        "INSERT INTO embedding_staging (id, content_embedding) VALUES %s",
+                        list(zip(ids, vectors)),
+                        template="(%s, %s::vector)",
+                        page_size=len(ids),
+                    )
+                    cur.execute(
+                        """
+                        UPDATE naramarket_bids nb
+                        SET content_embedding = s.content_embedding
+                        FROM embedding_staging s
+                        WHERE nb.id = s.id
+                        """
+                    )
+                    cur.execute("TRUNCATE embedding_staging")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def _save_checkpoint(self, last_id: int):
+        with self._db_lock, self.conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO embedding_backfill_checkpoints (job_name, last_id)
+                VALUES (%s, %s)
+                ON CONFLICT (job_name)
+                DO UPDATE SET
+                    last_id = GREATEST(embedding_backfill_checkpoints.last_id, EXCLUDED.last_id),
+                    updated_at = now()
+                """,
+                (self.job_name, last_id),
+            )
+            self.conn.commit()
+
+    def _log_progress(self, stats: BackfillStats):
+        logging.info(
+            f"임베딩 백필 진행 - {stats.rows}건, {stats.rows_per_sec:.1f} rows/sec, "
+            f"마지막 id: {stats.last_id}"
+        )
+
+    async def run(self, max_rows: Optional[int] = None) -> BackfillStats:
+        """대상 레코드가 없어질 때까지 백필을 수행합니다."""
+        await asyncio.to_thread(self._setup)
+        last_id = await asyncio.to_thread(self._load_checkpoint)
+        stats = BackfillStats(last_id=last_id)
+        logging.info(f"임베딩 백필 시작 - 체크포인트 id: {last_id}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # 배치 시작 순서대로 완료 여부를 추적하여 연속 완료 지점만 체크포인트로 기록
+        pending: List[list] = []
+        tasks = set()
+
+        def advance_watermark():
+            watermark = None
+            while pending and pending[0][1]:
+                watermark = pending.pop(0)[0]
+            return watermark
+
+        async def process(rows: List[dict], entry: list):
+            try:
+                texts = [self.text_fn(row) for row in rows]
+                vectors = await self.embeddings.aembed_documents(texts)
+                await asyncio.to_thread(
+                    self._write_batch, [row["id"] for row in rows], vectors
+                )
+                entry[1] = True
+                stats.rows += len(rows)
+                stats.batches += 1
+                watermark = advance_watermark()
+                if watermark is not None:
+                    await asyncio.to_thread(self._save_checkpoint, watermark)
+                    stats.last_id = watermark
+                self.progress_fn(stats)
+            except Exception as e:
+                # 실패한 배치는 NULL로 남아 다음 실행에서 다시 처리됨
+                stats.failed_batches += 1
+                logging.error(f"임베딩 백필 배치 실패: {e}", exc_info=True)
+            finally:
+                semaphore.release()
+
+        cursor_id = last_id
+        fetched = 0
+        while max_rows is None or fetched < max_rows:
+            await semaphore.acquire()
+            rows = await asyncio.to_thread(self._fetch_page, cursor_id)
+            if not rows:
+                semaphore.release()
+                break
+            cursor_id = rows[-1]["id"]
+            fetched += len(rows)
+            entry = [cursor_id, False]
+            pending.append(entry)
+            task = asyncio.create_task(process(rows, entry))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+        if stats.failed_batches:
+            logging.warning(
+                f"임베딩 백필 완료 (실패 배치 {stats.failed_batches}개) - "
+                "실패한 구간은 체크포인트 이전이므로 재실행 시 다시 처리됩니다."
+            )
+        logging.info(
+            f"임베딩 백필 완료 - {stats.rows}건, {stats.elapsed:.1f}초, "
+            f"{stats.rows_per_sec:.1f} rows/sec"
+        )
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="naramarket_bids 임베딩 백필")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-rows", type=int, default=None)
+    parser.add_argument(
+        "--reset", action="store_true", help="체크포인트를 지우고 처음부터 실행"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from utils.embedding_utils import EmbeddingManager
+
+    asyncio.run(
+        EmbeddingManager().update_embeddings(
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            max_rows=args.max_rows,
+            reset=args.reset,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
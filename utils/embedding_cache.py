@@ -0,0 +1,245 @@
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+from config.settings import settings
+from core.metrics import timed
+from core.scheduler import get_scheduler
+from utils.cache import CacheStats, TTLCache, content_hash
+from utils.helpers import count_tokens
+from utils.singleflight import get_flight
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+
+
+class EmbeddingCache:
+    """모델명 + 텍스트 해시 기반의 2단계(메모리/SQLite) 임베딩 캐시
+
+    메모리 계층은 벡터를 float32 배열로 보관하고(1536차원 기준 항목당 약 6KB,
+    파이썬 float 리스트의 1/5 수준) 반환할 때만 리스트로 바꿉니다.
+    """
+
+    def __init__(self, path: Optional[str] = None, memory_size: int = 10000):
+        self.memory = TTLCache(maxsize=memory_size)
+        self.stats = CacheStats("embedding")
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+        if path:
+            self._open(path)
+
+    def _open(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return content_hash(model, text)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """캐시에 있는 키의 임베딩만 반환합니다."""
+        found = {}
+        missing = []
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                found[key] = vector.tolist()
+        self.stats.incr("memory_hits", len(found))
+
+        if missing and self._conn is not None:
+            rows = []
+            with self._lock:
+                # SQLite 바인드 변수 제한을 피하기 위해 나눠서 조회
+                for i in range(0, len(missing), 500):
+                    chunk = missing[i : i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows.extend(
+                        self._conn.execute(
+                            f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                            chunk,
+                        ).fetchall()
+                    )
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                self.memory.set(key, vector)
+                found[key] = vector.tolist()
+            self.stats.incr("disk_hits", len(rows))
+
+        self.stats.incr("misses", len(keys) - len(found))
+        return found
+
+    def set_many(self, items: Dict[str, List[float]]):
+        vectors = {
+            key: np.asarray(vector, dtype=np.float32) for key, vector in items.items()
+        }
+        for key, vector in vectors.items():
+            self.memory.set(key, vector)
+        if vectors and self._conn is not None:
+            rows = [(key, vector.tobytes()) for key, vector in vectors.items()]
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+
+class ScheduledEmbeddings(Embeddings):
+    """임베딩 API 호출을 스케줄러 대기열(예상 토큰 수 차감)로 보내는 래퍼"""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        provider: str = "openai",
+        priority: str = "interactive",
+    ):
+        self.embeddings = embeddings
+        self.provider = provider
+        self.priority = priority
+        self.scheduler = get_scheduler()
+
+    def _call(self, fn, value, tokens: int):
+        return self.scheduler.call(
+            self.provider, fn, value, priority=self.priority, tokens=tokens
+        )
+
+    async def _acall(self, fn, value, tokens: int):
+        return await self.scheduler.acall(
+            self.provider, fn, value, priority=self.priority, tokens=tokens
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        tokens = sum(count_tokens(text) for text in texts)
+        return self._call(self.embeddings.embed_documents, texts, tokens)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._call(self.embeddings.embed_query, text, count_tokens(text))
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        tokens = sum(count_tokens(text) for text in texts)
+        return await self._acall(self.embeddings.aembed_documents, texts, tokens)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self._acall(self.embeddings.aembed_query, text, count_tokens(text))
+
+
+def scheduled_embeddings(priority: str = "interactive", **kwargs) -> Embeddings:
+    """스케줄러를 거치는 OpenAIEmbeddings (비활성화되면 SDK 재시도 사용)"""
+    if not settings.SCHEDULER_ENABLED:
+        return OpenAIEmbeddings(**kwargs)
+    return ScheduledEmbeddings(
+        OpenAIEmbeddings(max_retries=0, **kwargs), priority=priority
+    )
+
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 캐시를 거쳐 누락분만 API로 요청하는 Embeddings 래퍼"""
+
+    def __init__(self, embeddings: Embeddings, model: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache
+        # 질문 임베딩은 텍스트가 정확히 같을 때만 합침 (키는 캐시 키)
+        self.flight = get_flight("embedding")
+
+    def _lookup(self, texts: List[str]):
+        keys = [self.cache.make_key(self.model, text) for text in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+        # 중복 텍스트는 한 번만 요청
+        missing = list(
+            dict.fromkeys(text for text, key in zip(texts, keys) if key not in found)
+        )
+        return keys, found, missing
+
+    def _merge(self, keys, found, missing, vectors) -> List[List[float]]:
+        new_items = {
+            self.cache.make_key(self.model, text): vector
+            for text, vector in zip(missing, vectors)
+        }
+        self.cache.set_many(new_items)
+        found.update(new_items)
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._lookup(texts)
+        vectors = self.embeddings.embed_documents(missing) if missing else []
+        return self._merge(keys, found, missing, vectors)
+
+    @timed("embedding")
+    def embed_query(self, text: str) -> List[float]:
+        keys, found, missing = self._lookup([text])
+        vectors = []
+        if missing:
+            vectors = [self.flight.do(keys[0], self.embeddings.embed_query, text)]
+        return self._merge(keys, found, missing, vectors)[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, missing = self._lookup(texts)
+        vectors = await self.embeddings.aembed_documents(missing) if missing else []
+        return self._merge(keys, found, missing, vectors)
+
+    @timed("embedding")
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, missing = self._lookup([text])
+        vectors = []
+        if missing:
+            vectors = [
+                await self.flight.ado(keys[0], self.embeddings.aembed_query, text)
+            ]
+        return self._merge(keys, found, missing, vectors)[0]
+
+
+_cache: Optional[EmbeddingCache] = None
+_embeddings: Dict[str, CachedEmbeddings] = {}
+_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """프로세스 전역 임베딩 캐시를 반환합니다."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = EmbeddingCache(
+                path=settings.EMBEDDING_CACHE_PATH or None,
+                memory_size=settings.EMBEDDING_CACHE_MEMORY_SIZE,
+            )
+            logging.info(f"임베딩 캐시 초기화 완료 - 경로: {_cache.path}")
+        return _cache
+
+
+def get_embeddings(model: str = DEFAULT_EMBEDDING_MODEL) -> CachedEmbeddings:
+    """모델별로 공유되는 캐시 적용 임베딩 인스턴스를 반환합니다."""
+    cache = get_embedding_cache()
+    with _lock:
+        if model not in _embeddings:
+            _embeddings[model] = CachedEmbeddings(
+                scheduled_embeddings(model=model), model=model, cache=cache
+            )
+        return _embeddings[model]
@@ -1,58 +1,129 @@
-from langchain_openai import OpenAIEmbeddings
-import psycopg2
+import asyncio
+
 from psycopg2.extras import RealDictCursor
-from config.settings import settings
+from core.database import bump_table_version, get_async_pool, get_pool
+from core.metrics import get_metrics
 from processors.keyword_extractor import KeywordExtractor
+from utils.embedding_backfill import EmbeddingBackfill
+from utils.embedding_cache import get_embeddings, scheduled_embeddings
+from utils.notice_index import get_notice_index
+from utils.singleflight import get_flight
+from config.settings import settings
+
+# 컬럼별 ILIKE 조건은 pg_trgm GIN 인덱스(core.migrations)의 BitmapOr로,
+# 거리 연산자 오름차순 정렬 + LIMIT은 HNSW 인덱스 스캔으로 처리될 수 있도록
+# 정렬식을 가공하지 않고 필요한 컬럼만 조회합니다.
+HYBRID_SEARCH_QUERY = """
+    SELECT
+        id,
+        bid_notice_no,
+        bid_notice_nm,
+        ntce_kind_nm,
+        dminstt_nm,
+        pub_prcrmnt_clsfc_nm,
+        (content_embedding <#> %(embedding)s::vector) * -1 + 1 as score
+    FROM naramarket_bids
+    WHERE
+        (
+            bid_notice_nm ILIKE ANY(%(patterns)s)
+            OR ntce_kind_nm ILIKE ANY(%(patterns)s)
+            OR dminstt_nm ILIKE ANY(%(patterns)s)
+            OR pub_prcrmnt_clsfc_nm ILIKE ANY(%(patterns)s)
+        )
+        -- 유사도 > 0.6 (음의 내적 < 0.4)
+        AND (content_embedding <#> %(embedding)s::vector) < 0.4
+    ORDER BY content_embedding <#> %(embedding)s::vector
+    LIMIT %(limit)s
+"""
+
+# HNSW 인덱스 스캔은 ef_search개 후보에만 키워드/유사도 조건을 적용하므로, 조건을
+# 만족하는 행을 limit개까지 찾도록 반복 스캔(pgvector >= 0.8)을 켭니다. 반복
+# 스캔이 없는 버전에서는 인덱스 스캔을 끄고 정확한 플랜(GIN + 정렬)을 사용합니다.
+# 트랜잭션 안에서만 적용되므로 검색 쿼리와 같은 트랜잭션에서 실행해야 합니다.
+HYBRID_SEARCH_SETTINGS = """
+    SELECT
+        set_config('hnsw.ef_search', %(ef_search)s, true),
+        CASE
+            WHEN string_to_array(extversion, '.')::int[] >= '{0,8}'
+            THEN set_config('hnsw.iterative_scan', 'strict_order', true)
+            ELSE set_config('enable_indexscan', 'off', true)
+        END
+    FROM pg_extension
+    WHERE extname = 'vector';
+"""
 
 
 class EmbeddingManager:
     def __init__(self):
-        self.embeddings = OpenAIEmbeddings()
+        self.embeddings = get_embeddings()
         self.keyword_extractor = KeywordExtractor()
-        self.conn = psycopg2.connect(settings.POSTGRES_URI)
+        self.pool = get_pool()
+        # 임베딩은 키워드로 만들므로 키워드가 같으면 같은 검색
+        self.flight = get_flight("postgres_search")
 
     def create_document_text(self, row: dict) -> str:
         """검색에 사용될 텍스트 생성"""
         return f"{row['bid_notice_nm']} {row['ntce_kind_nm']} {row['dminstt_nm']} {row['pub_prcrmnt_clsfc_nm']}"
 
-    async def update_embeddings(self, batch_size: int = 100):
+    async def update_embeddings(
+        self,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        max_rows: int = None,
+        reset: bool = False,
+    ):
         """임베딩이 없는 레코드들의 임베딩을 생성하여 저장"""
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # 임베딩이 없는 레코드 조회
-            cur.execute(
-                """
-                SELECT
-                    id,
-                    bid_notice_no,
-                    bid_notice_nm,
-                    ntce_kind_nm,
-                    dminstt_nm,
-                    pub_prcrmnt_clsfc_nm
-                FROM naramarket_bids
-                WHERE content_embedding IS NULL
-                LIMIT %s
-            """,
-                (batch_size,),
+        # 백필은 오래 걸리므로 질의용 풀 커넥션 대신 전용 커넥션 사용 (배치별로 커밋됨)
+        with self.pool.dedicated() as conn:
+            backfill = EmbeddingBackfill(
+                conn,
+                # 공고 본문 임베딩은 재사용되지 않으므로 캐시를 거치지 않고,
+                # 사용자 질문 처리보다 늦게 호출되도록 낮은 우선순위로 요청
+                embeddings=scheduled_embeddings(priority="background"),
+                text_fn=self.create_document_text,
+                batch_size=batch_size,
+                concurrency=concurrency,
             )
+            if reset:
+                backfill.reset_checkpoint()
+            stats = await backfill.run(max_rows=max_rows)
 
-            rows = cur.fetchall()
-
-            for row in rows:
-                # 텍스트 생성 및 임베딩
-                text = self.create_document_text(row)
-                embedding = await self.embeddings.aembed_query(text)
-
-                # DB 업데이트
-                cur.execute(
-                    """
-                    UPDATE naramarket_bids
-                    SET content_embedding = %s
-                    WHERE id = %s
-                """,
-                    (embedding, row["id"]),
-                )
+        # 바뀐 행이 있으면 SQL 결과 캐시 무효화
+        if stats.rows:
+            await asyncio.to_thread(bump_table_version, "naramarket_bids")
 
-            self.conn.commit()
+        # 새로 임베딩된 행을 프로세스 내 인덱스에도 추가
+        if settings.NOTICE_INDEX_ENABLED:
+            with self.pool.connection(readonly=True) as conn:
+                get_notice_index().sync(conn)
+        return stats
+
+    def _search_params(self, keywords: list, query_embedding: list, limit: int):
+        return {
+            "embedding": query_embedding,
+            "patterns": [f"%{keyword}%" for keyword in keywords],
+            "limit": limit,
+            "ef_search": str(max(settings.HYBRID_SEARCH_EF_SEARCH, limit)),
+        }
+
+    def _index_search(self, keywords: list, query_embedding: list, limit: int):
+        """프로세스 내 인덱스 검색 (비활성화되었거나 비어 있으면 None)"""
+        if not settings.NOTICE_INDEX_ENABLED:
+            return None
+        index = get_notice_index()
+        if not index.count:
+            return None
+        with get_metrics().span("notice_index_search"):
+            return index.search(keywords, query_embedding, limit=limit)
+
+    def _postgres_search(self, keywords: list, query_embedding: list, limit: int):
+        with self.pool.connection(readonly=True) as conn, conn.cursor(
+            cursor_factory=RealDictCursor
+        ) as cur:
+            params = self._search_params(keywords, query_embedding, limit)
+            cur.execute(HYBRID_SEARCH_SETTINGS, params)
+            cur.execute(HYBRID_SEARCH_QUERY, params)
+            return cur.fetchall()
 
     def hybrid_search(self, query: str, limit: int = 5):
         """키워드 기반 하이브리드 검색 수행"""
@@ -63,51 +134,29 @@ class EmbeddingManager:
             # 2. 추출된 키워드로 임베딩 생성
             query_embedding = self.embeddings.embed_query(" ".join(keywords))
 
-            with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # 3. 하이브리드 검색 쿼리 실행
-                cur.execute(
-                    """
-                    WITH vector_matches AS (
-                        SELECT
-                            nb.*,
-                            (content_embedding <#> %s::vector) * -1 + 1 as vector_similarity
-                        FROM naramarket_bids nb
-                        WHERE
-                            bid_notice_nm ILIKE ANY(%s)
-                            OR ntce_kind_nm ILIKE ANY(%s)
-                            OR dminstt_nm ILIKE ANY(%s)
-                            OR pub_prcrmnt_clsfc_nm ILIKE ANY(%s)
-                    )
-                    SELECT
-                        id,
-                        bid_notice_no,
-                        bid_notice_nm,
-                        ntce_kind_nm,
-                        dminstt_nm,
-                        pub_prcrmnt_clsfc_nm,
-                        vector_similarity as score
-                    FROM vector_matches
-                    WHERE vector_similarity > 0.6
-                    ORDER BY vector_similarity DESC
-                    LIMIT %s
-                    """,
-                    (
-                        query_embedding,
-                        [f"%{keyword}%" for keyword in keywords],
-                        [f"%{keyword}%" for keyword in keywords],
-                        [f"%{keyword}%" for keyword in keywords],
-                        [f"%{keyword}%" for keyword in keywords],
-                        limit,
-                    ),
-                )
-
-                results = cur.fetchall()
+            results = self._index_search(keywords, query_embedding, limit)
+            if results is not None:
                 return {
-                    "results": list(results),
+                    "results": results,
                     "keywords": keywords,
                     "total_count": len(results),
                 }
 
+            # 3. 하이브리드 검색 쿼리 실행
+            with get_metrics().span("postgres_search"):
+                results = self.flight.do(
+                    (tuple(keywords), limit),
+                    self._postgres_search,
+                    keywords,
+                    query_embedding,
+                    limit,
+                )
+            return {
+                "results": list(results),
+                "keywords": keywords,
+                "total_count": len(results),
+            }
+
         except Exception as e:
             print(f"검색 중 오류 발생: {str(e)}")
             return {
@@ -116,5 +165,29 @@ class EmbeddingManager:
                 "error": str(e),
             }
 
-    def close(self):
-        self.conn.close()
+    async def ahybrid_search(self, query: str, limit: int = 5):
+        """hybrid_search의 비동기 버전"""
+        keywords = []
+        try:
+            keywords = await self.keyword_extractor.aextract(query)
+            query_embedding = await self.embeddings.aembed_query(" ".join(keywords))
+            results = self._index_search(keywords, query_embedding, limit)
+            if results is None:
+                with get_metrics().span("postgres_search"):
+                    results = await self.flight.ado(
+                        (tuple(keywords), limit),
+                        get_async_pool().fetchall,
+                        # autocommit 커넥션에서는 한 번에 보낸 문장들이 하나의
+                        # 암묵적 트랜잭션으로 실행되어 설정이 검색에 적용됨
+                        HYBRID_SEARCH_SETTINGS + HYBRID_SEARCH_QUERY,
+                        self._search_params(keywords, query_embedding, limit),
+                    )
+            return {
+                "results": list(results),
+                "keywords": keywords,
+                "total_count": len(results),
+            }
+
+        except Exception as e:
+            print(f"검색 중 오류 발생: {str(e)}")
+            return {"results": [], "keywords": keywords, "error": str(e)}
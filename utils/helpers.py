@@ -0,0 +1,49 @@
+import logging
+import threading
+from typing import Optional
+
+_encoding = None
+_encoding_thread: Optional[threading.Thread] = None
+_encoding_lock = threading.Lock()
+
+
+def _load_encoding():
+    global _encoding
+    try:
+        import tiktoken
+
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # 인코딩 파일을 내려받을 수 없는 환경에서는 근사치로 계산
+        logging.warning(f"tiktoken 사용 불가, 토큰 수를 근사합니다: {e}")
+
+
+def start_encoding_load() -> threading.Thread:
+    """tiktoken 인코딩을 백그라운드 스레드에서 불러옵니다 (처음 한 번만).
+
+    첫 로드는 인코딩 파일을 내려받을 수 있으므로 이벤트 루프에서 기다리지
+    않도록 별도 스레드에서 실행하며, 완료를 기다리려면 반환값을 join합니다.
+    """
+    global _encoding_thread
+    with _encoding_lock:
+        if _encoding_thread is None:
+            _encoding_thread = threading.Thread(
+                target=_load_encoding, name="tiktoken-load", daemon=True
+            )
+            _encoding_thread.start()
+        return _encoding_thread
+
+
+def encoding_ready() -> bool:
+    """count_tokens가 근사치가 아닌 cl100k_base 토큰 수를 반환하는지 여부"""
+    return _encoding is not None
+
+
+def count_tokens(text: str) -> int:
+    """프롬프트 토큰 수 (cl100k_base 기준, 로드 전이거나 사용할 수 없으면 근사치)"""
+    encoding = _encoding
+    if encoding is not None:
+        return len(encoding.encode(text))
+    start_encoding_load()
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars)
@@ -0,0 +1,527 @@
+"""naramarket_bids 공고 검색용 프로세스 내 인덱스
+
+임베딩은 메모리 매핑된 float32 행렬, id는 int64 배열, 검색 대상 텍스트 필드는
+JSON lines 파일로 디스크에 저장합니다. 여러 워커 프로세스가 같은 파일을
+읽기 전용으로 매핑하므로 페이지 캐시를 공유하며, 키워드 사전 필터링용 역색인만
+프로세스마다 메모리에 만듭니다.
+
+파일은 세대(generation) 번호를 붙여 저장하고 meta.json이 현재 세대와 커밋된
+행 수를 가리킵니다. 추가 쓰기는 파일 잠금 하에 데이터 파일 끝에 이어 쓴 뒤
+meta.json을 원자적으로 교체하므로, 읽는 쪽은 항상 커밋된 행만 봅니다.
+
+    python -m utils.notice_index sync          # Postgres에서 새로 임베딩된 행 추가
+    python -m utils.notice_index rebuild       # 새 세대로 전체 재구축
+    python -m utils.notice_index ivf --lists 1024
+"""
+
+import argparse
+import fcntl
+import json
+import logging
+import mmap
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Sequence
+
+import numpy as np
+
+from config.settings import settings
+
+FIELDS = (
+    "bid_notice_no",
+    "bid_notice_nm",
+    "ntce_kind_nm",
+    "dminstt_nm",
+    "pub_prcrmnt_clsfc_nm",
+)
+# ILIKE 키워드 필터 대상 컬럼 (HYBRID_SEARCH_QUERY와 동일)
+SEARCH_FIELDS = FIELDS[1:]
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+class NoticeIndex:
+    """메모리 매핑 기반 공고 임베딩 인덱스 (키워드 역색인 + brute-force/IVF 검색)"""
+
+    def __init__(
+        self,
+        path: str,
+        dim: int = 1536,
+        nprobe: int = 8,
+        brute_force_limit: int = 20000,
+        refresh_interval: float = 10.0,
+    ):
+        self.path = path
+        self.dim = dim
+        self.nprobe = nprobe
+        self.brute_force_limit = brute_force_limit
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._checked_at = float("-inf")
+        self._meta_mtime = None
+        self._reset_state()
+
+    def _reset_state(self):
+        self.generation = 0
+        self.count = 0
+        self.vectors = np.empty((0, self.dim), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self._offsets = np.empty(0, dtype=np.int64)
+        self._records = None
+        self._records_bytes = 0
+        self._centroids = None
+        self._assign = None
+        # 역색인: 토큰 id -> 행 번호 (CSR) + 이후 추가된 행의 델타
+        self._vocab: dict[str, int] = {}
+        self._tokens: list[str] = []
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._postings = np.empty(0, dtype=np.int32)
+        self._csr_rows = 0
+        self._delta: dict[int, list[int]] = {}
+        self._vocab_blob = ""
+        self._vocab_starts = np.empty(0, dtype=np.int64)
+        self._vocab_dirty = True
+        self._keyword_cache: dict[str, np.ndarray] = {}
+
+    # ---- 파일 ----
+
+    def _file(self, name: str, generation: Optional[int] = None) -> str:
+        generation = self.generation if generation is None else generation
+        return os.path.join(self.path, f"{name}.{generation}")
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(os.path.join(self.path, "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {
+                "generation": 0,
+                "dim": self.dim,
+                "count": 0,
+                "records_bytes": 0,
+                "nlist": 0,
+            }
+
+    def _write_meta(self, meta: dict):
+        tmp = os.path.join(self.path, f"meta.json.{os.getpid()}")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    @contextmanager
+    def _write_lock(self):
+        """프로세스 간 쓰기 잠금"""
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, "lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _map(self, name: str, dtype, count: int, generation: int, width: int = 0):
+        shape = (count, width) if width else (count,)
+        if count == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(
+            self._file(name, generation), dtype=dtype, mode="r", shape=shape
+        )
+
+    # ---- 읽기 ----
+
+    def refresh(self, force: bool = False):
+        """다른 프로세스가 추가한 행을 반영합니다 (refresh_interval마다 한 번 확인)."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(os.path.join(self.path, "meta.json")).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._meta_mtime and not force:
+            return
+
+        with self._lock:
+            meta = self._read_meta()
+            self._meta_mtime = mtime
+            if meta["generation"] != self.generation or meta["count"] < self.count:
+                self._reset_state()
+            if meta["dim"] != self.dim:
+                raise ValueError(f"인덱스 차원 불일치: {meta['dim']} != {self.dim}")
+            self._load(meta)
+
+    def _load(self, meta: dict):
+        generation, count = meta["generation"], meta["count"]
+        previous = self.count
+        self.generation = generation
+        self.vectors = self._map("vectors", np.float32, count, generation, self.dim)
+        self.ids = np.array(self._map("ids", np.int64, count, generation))
+        self._offsets = np.array(self._map("offsets", np.int64, count, generation))
+        self._records_bytes = meta["records_bytes"]
+        if self._records_bytes:
+            with open(self._file("records", generation), "rb") as f:
+                self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if meta.get("nlist"):
+            self._centroids = np.load(self._file("centroids", generation) + ".npy")
+            self._assign = self._map("assign", np.int32, count, generation)
+
+        # 새로 추가된 행 색인
+        for row in range(previous, count):
+            for token in set(self._tokenize_row(self.record(row))):
+                token_id = self._vocab.get(token)
+                if token_id is None:
+                    token_id = self._vocab[token] = len(self._tokens)
+                    self._tokens.append(token)
+                    self._vocab_dirty = True
+                self._delta.setdefault(token_id, []).append(row)
+            # 델타가 커지면 CSR로 합쳐 메모리 사용량을 유지
+            if row + 1 - self._csr_rows >= max(100_000, self._csr_rows // 10):
+                self._compact(row + 1)
+        self.count = count
+        self._keyword_cache.clear()
+
+    def _tokenize_row(self, record: dict) -> list[str]:
+        tokens = []
+        for field in SEARCH_FIELDS:
+            tokens.extend(tokenize(record.get(field)))
+        return tokens
+
+    def _compact(self, rows: int):
+        """rows행까지의 델타 역색인을 CSR 배열로 합칩니다."""
+        counts = np.zeros(len(self._tokens), dtype=np.int64)
+        counts[: len(self._indptr) - 1] = np.diff(self._indptr)
+        for token_id, new_rows in self._delta.items():
+            counts[token_id] += len(new_rows)
+        indptr = np.zeros(len(self._tokens) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        postings = np.empty(indptr[-1], dtype=np.int32)
+        for token_id in range(len(self._tokens)):
+            start = indptr[token_id]
+            old = self._csr_slice(token_id)
+            postings[start : start + len(old)] = old
+            new = self._delta.get(token_id)
+            if new:
+                postings[start + len(old) : indptr[token_id + 1]] = new
+        self._indptr, self._postings = indptr, postings
+        self._delta = {}
+        self._csr_rows = rows
+
+    def _csr_slice(self, token_id: int) -> np.ndarray:
+        if token_id + 1 >= len(self._indptr):
+            return self._postings[:0]
+        return self._postings[self._indptr[token_id] : self._indptr[token_id + 1]]
+
+    def record(self, row: int) -> dict:
+        start = int(self._offsets[row])
+        end = (
+            int(self._offsets[row + 1])
+            if row + 1 < len(self._offsets)
+            else self._records_bytes
+        )
+        values = json.loads(self._records[start:end])
+        return dict(zip(FIELDS, values))
+
+    def _tokens_containing(self, part: str) -> np.ndarray:
+        """부분 문자열 part를 포함하는 어휘 토큰 id 목록"""
+        if self._vocab_dirty:
+            self._vocab_blob = "\n".join(self._tokens) + "\n"
+            lengths = np.fromiter((len(t) + 1 for t in self._tokens), dtype=np.int64)
+            self._vocab_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            self._vocab_dirty = False
+        positions = [m.start() for m in re.finditer(re.escape(part), self._vocab_blob)]
+        if not positions:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.searchsorted(self._vocab_starts, positions, "right") - 1)
+
+    def _keyword_rows(self, keyword: str) -> np.ndarray:
+        """ILIKE '%keyword%'와 같은 조건을 만족하는 행 번호"""
+        key = keyword.lower()
+        cached = self._keyword_cache.get(key)
+        if cached is not None:
+            return cached
+
+        parts = tokenize(key)
+        rows = None
+        for part in parts:
+            chunks = []
+            for token_id in self._tokens_containing(part):
+                chunks.append(self._csr_slice(token_id))
+                if token_id in self._delta:
+                    chunks.append(np.asarray(self._delta[token_id], dtype=np.int32))
+            matched = np.unique(np.concatenate(chunks)) if chunks else np.empty(0, int)
+            rows = matched if rows is None else np.intersect1d(rows, matched)
+        if rows is None:
+            rows = np.empty(0, dtype=np.int32)
+        elif len(parts) > 1 or parts[0] != key:
+            # 공백/기호가 포함된 키워드는 원문에서 다시 확인
+            rows = np.array(
+                [
+                    row
+                    for row in rows
+                    if any(
+                        key in (self.record(row).get(field) or "").lower()
+                        for field in SEARCH_FIELDS
+                    )
+                ],
+                dtype=np.int32,
+            )
+        self._keyword_cache[key] = rows
+        return rows
+
+    def search(
+        self,
+        keywords: Sequence[str],
+        query_vector: Sequence[float],
+        limit: int = 5,
+        min_score: float = 0.6,
+    ) -> list[dict]:
+        """키워드 필터 후 내적 유사도 순으로 정렬 (HYBRID_SEARCH_QUERY와 동일한 결과)"""
+        self.refresh()
+        with self._lock:
+            chunks = [self._keyword_rows(keyword) for keyword in keywords]
+            rows = np.unique(np.concatenate(chunks)) if chunks else np.empty(0, int)
+            if rows.size == 0:
+                return []
+
+            query = np.asarray(query_vector, dtype=np.float32)
+            if rows.size > self.brute_force_limit and self._centroids is not None:
+                # 후보가 많으면 질의와 가까운 nprobe개 IVF 리스트로 제한
+                nprobe = min(self.nprobe, len(self._centroids))
+                lists = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+                rows = rows[np.isin(self._assign[rows], lists)]
+
+            # SQL의 (content_embedding <#> q) * -1 + 1과 같은 점수
+            scores = self.vectors[rows] @ query + 1.0
+            keep = scores > min_score
+            rows, scores = rows[keep], scores[keep]
+            if rows.size > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                rows, scores = rows[top], scores[top]
+            order = np.argsort(-scores, kind="stable")
+
+            return [
+                {
+                    "id": int(self.ids[rows[i]]),
+                    **self.record(int(rows[i])),
+                    "score": float(scores[i]),
+                }
+                for i in order
+            ]
+
+    # ---- 쓰기 ----
+
+    def append(self, rows: Sequence[dict]) -> int:
+        """새로 임베딩된 행을 추가합니다 (이미 있는 id는 건너뜀)."""
+        with self._write_lock():
+            self.refresh(force=True)
+            meta = self._read_meta()
+            if meta["generation"] == 0:
+                meta["generation"] = 1
+                self.generation = 1
+            generation = meta["generation"]
+
+            known = set(self.ids.tolist())
+            rows = [row for row in rows if row["id"] not in known]
+            if not rows:
+                return 0
+
+            vectors = np.asarray(
+                [row["content_embedding"] for row in rows], dtype=np.float32
+            )
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"임베딩 차원 불일치: {vectors.shape[1]}")
+            ids = np.asarray([row["id"] for row in rows], dtype=np.int64)
+            lines = [
+                json.dumps(
+                    [row.get(f) or "" for f in FIELDS], ensure_ascii=False
+                ).encode("utf-8")
+                + b"\n"
+                for row in rows
+            ]
+            offsets = meta["records_bytes"] + np.concatenate(
+                ([0], np.cumsum([len(line) for line in lines])[:-1])
+            ).astype(np.int64)
+
+            count = meta["count"]
+            arrays = [
+                ("vectors", vectors, vectors.itemsize * self.dim),
+                ("ids", ids, ids.itemsize),
+                ("offsets", offsets, offsets.itemsize),
+            ]
+            if meta.get("nlist"):
+                centroids = np.load(self._file("centroids", generation) + ".npy")
+                assign = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+                arrays.append(("assign", assign, assign.itemsize))
+
+            for name, array, row_bytes in arrays:
+                self._append_file(
+                    self._file(name, generation), count * row_bytes, array.tobytes()
+                )
+            self._append_file(
+                self._file("records", generation),
+                meta["records_bytes"],
+                b"".join(lines),
+            )
+
+            meta["count"] = count + len(rows)
+            meta["records_bytes"] += sum(len(line) for line in lines)
+            meta["dim"] = self.dim
+            self._write_meta(meta)
+        self.refresh(force=True)
+        return len(rows)
+
+    @staticmethod
+    def _append_file(path: str, committed: int, data: bytes):
+        """커밋된 길이 뒤의 (중단된 쓰기) 꼬리를 잘라내고 이어 씁니다."""
+        with open(path, "ab") as f:
+            f.truncate(committed)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def reset(self):
+        """새 세대의 빈 인덱스로 전환합니다 (이전 세대 파일은 정리)."""
+        with self._write_lock():
+            meta = self._read_meta()
+            old = meta["generation"]
+            self._write_meta(
+                {
+                    "generation": old + 1,
+                    "dim": self.dim,
+                    "count": 0,
+                    "records_bytes": 0,
+                    "nlist": 0,
+                }
+            )
+            # 이미 매핑한 프로세스는 unlink된 파일을 계속 읽을 수 있음
+            for name in os.listdir(self.path):
+                if name.endswith(f".{old}") or name.endswith(f".{old}.npy"):
+                    os.remove(os.path.join(self.path, name))
+        self.refresh(force=True)
+
+    def build_ivf(self, nlist: int, iterations: int = 10, sample_size: int = 100_000):
+        """구면 k-means로 IVF 리스트를 만들고 모든 행을 할당합니다."""
+        with self._write_lock():
+            self.refresh(force=True)
+            meta = self._read_meta()
+            if self.count < nlist:
+                raise ValueError(f"행 수({self.count})가 리스트 수({nlist})보다 적음")
+            rng = np.random.default_rng(0)
+            sample = np.asarray(
+                self.vectors[
+                    np.sort(rng.choice(self.count, min(sample_size, self.count), False))
+                ]
+            )
+            centroids = sample[rng.choice(len(sample), nlist, replace=False)]
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                order = np.argsort(labels, kind="stable")
+                present, starts = np.unique(labels[order], return_index=True)
+                sums = np.add.reduceat(sample[order], starts, axis=0)
+                # 빈 리스트의 중심은 이전 값 유지
+                centroids[present] = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+
+            assign = np.empty(self.count, dtype=np.int32)
+            for start in range(0, self.count, 50_000):
+                chunk = np.asarray(self.vectors[start : start + 50_000])
+                assign[start : start + len(chunk)] = np.argmax(
+                    chunk @ centroids.T, axis=1
+                )
+            np.save(self._file("centroids", meta["generation"]) + ".npy", centroids)
+            with open(self._file("assign", meta["generation"]), "wb") as f:
+                f.write(assign.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            meta["nlist"] = nlist
+            self._write_meta(meta)
+        self.refresh(force=True)
+
+    def sync(self, conn, batch_size: int = 1000) -> int:
+        """Postgres에서 임베딩이 있지만 인덱스에 없는 행을 추가합니다."""
+        self.refresh(force=True)
+        with conn.cursor(name="notice_index_ids") as cur:
+            cur.itersize = 100_000
+            cur.execute(
+                "SELECT id FROM naramarket_bids WHERE content_embedding IS NOT NULL"
+            )
+            ids = np.fromiter((row[0] for row in cur), dtype=np.int64)
+        missing = np.setdiff1d(ids, self.ids)
+
+        added = 0
+        columns = ", ".join(FIELDS)
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start : start + batch_size].tolist()
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT id, {columns}, content_embedding::real[]
+                    FROM naramarket_bids
+                    WHERE id = ANY(%s)
+                    ORDER BY id
+                    """,
+                    (chunk,),
+                )
+                rows = [
+                    dict(zip(("id", *FIELDS, "content_embedding"), row))
+                    for row in cur.fetchall()
+                ]
+            added += self.append(rows)
+            logging.info(f"공고 인덱스 동기화: {added}/{len(missing)}")
+        return added
+
+
+_index: Optional[NoticeIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_notice_index() -> NoticeIndex:
+    """프로세스 전역 공고 인덱스를 반환합니다."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NoticeIndex(
+                settings.NOTICE_INDEX_PATH,
+                dim=settings.NOTICE_INDEX_DIM,
+                nprobe=settings.NOTICE_INDEX_NPROBE,
+                brute_force_limit=settings.NOTICE_INDEX_BRUTE_FORCE_LIMIT,
+                refresh_interval=settings.NOTICE_INDEX_REFRESH_INTERVAL,
+            )
+            _index.refresh(force=True)
+        return _index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공고 검색 인덱스 관리")
+    parser.add_argument("command", choices=["sync", "rebuild", "ivf"])
+    parser.add_argument("--lists", type=int, default=1024, help="IVF 리스트 수")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    index = get_notice_index()
+    if args.command == "ivf":
+        index.build_ivf(args.lists)
+        print(f"IVF 리스트 {args.lists}개 생성 ({index.count}행)")
+        return
+
+    from core.database import get_pool
+
+    if args.command == "rebuild":
+        index.reset()
+    with get_pool().connection(readonly=True) as conn:
+        added = index.sync(conn, batch_size=args.batch_size)
+    print(f"{added}행 추가 (전체 {index.count}행)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""동시에 진행 중인 같은 호출 합치기 (single-flight)
+
+같은 키로 이미 진행 중인 호출이 있으면 새로 호출하지 않고 그 결과를 함께
+기다립니다. 완료된 결과는 보관하지 않으므로(캐시와 달리) 진행 중인 호출끼리만
+합쳐집니다. 결과 객체는 모든 호출자가 공유하므로 수정하지 않아야 합니다.
+
+- do / ado: 일반 함수와 코루틴 함수
+- stream / astream: (비동기) 스트림. 늦게 합류한 호출자도 첫 청크부터 받습니다.
+
+동기 호출은 스레드 사이(Streamlit 세션)에서, 비동기 호출은 같은 이벤트 루프
+안(API 워커)에서 합쳐집니다. 합쳐진 호출 수는 singleflight_calls{stage, role}
+카운터로 집계됩니다.
+"""
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Callable, Hashable, Iterator, Optional
+
+from config.settings import settings
+from core.metrics import get_metrics
+
+_PULL = object()
+
+
+class _Call:
+    """진행 중인 동기 호출"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncCall:
+    """진행 중인 비동기 호출 (기다리는 호출자가 모두 취소되면 함께 취소)"""
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class _Broadcast:
+    """진행 중인 동기 스트림의 청크 버퍼
+
+    다음 청크가 필요한 구독자 하나가 원본에서 청크를 꺼내 버퍼에 추가하고,
+    나머지 구독자는 버퍼에서 읽습니다.
+    """
+
+    def __init__(self, source: Iterator):
+        self.source = source
+        self.chunks: list = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.pulling = False
+        self.subscribers = 0
+        self.cond = threading.Condition()
+
+
+class _AsyncBroadcast:
+    """진행 중인 비동기 스트림의 청크 버퍼 (원본은 별도 태스크가 소비)"""
+
+    def __init__(self):
+        self.chunks: list = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Event()
+
+    def notify(self):
+        event, self.changed = self.changed, asyncio.Event()
+        event.set()
+
+
+class SingleFlight:
+    """단계 하나의 진행 중인 호출 목록"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._acalls: dict[tuple, _AsyncCall] = {}
+        self._streams: dict[Hashable, _Broadcast] = {}
+        self._astreams: dict[tuple, _AsyncBroadcast] = {}
+        self.counters = {"calls": 0, "coalesced": 0}
+
+    def _record(self, leader: bool):
+        role = "leader" if leader else "coalesced"
+        with self._lock:
+            self.counters["calls"] += 1
+            if not leader:
+                self.counters["coalesced"] += 1
+        get_metrics().incr("singleflight_calls", stage=self.name, role=role)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+            stats["in_flight"] = (
+                len(self._calls)
+                + len(self._acalls)
+                + len(self._streams)
+                + len(self._astreams)
+            )
+        stats["coalesce_rate"] = (
+            round(stats["coalesced"] / stats["calls"], 4) if stats["calls"] else 0.0
+        )
+        return stats
+
+    # ---- 일반 호출 ----
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """fn(*args, **kwargs)를 실행하거나 진행 중인 같은 키의 결과를 기다립니다."""
+        if not settings.SINGLEFLIGHT_ENABLED:
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        self._record(leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """do의 비동기 버전 (fn은 코루틴 함수)"""
+        if not settings.SINGLEFLIGHT_ENABLED:
+            return await fn(*args, **kwargs)
+
+        flight_key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            call = self._acalls.get(flight_key)
+            leader = call is None
+            if leader:
+                call = _AsyncCall(asyncio.ensure_future(fn(*args, **kwargs)))
+                self._acalls[flight_key] = call
+                call.task.add_done_callback(
+                    lambda _: self._forget(self._acalls, flight_key, call)
+                )
+        self._record(leader)
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                self._forget(self._acalls, flight_key, call)
+                call.task.cancel()
+
+    def _forget(self, calls: dict, key, call):
+        with self._lock:
+            if calls.get(key) is call:
+                del calls[key]
+
+    # ---- 스트림 ----
+
+    def stream(self, key: Hashable, factory: Callable, *args, **kwargs) -> Iterator:
+        """factory(*args, **kwargs)가 만드는 스트림을 같은 키의 호출자와 공유합니다.
+
+        factory는 호출 즉시 반환되는 지연 스트림(chain.stream 등)이어야 합니다.
+        구독은 반환된 이터레이터를 처음 읽을 때 시작하므로, 읽지 않고 버린
+        이터레이터는 진행 중인 스트림을 붙잡지 않습니다.
+        """
+        if not settings.SINGLEFLIGHT_ENABLED:
+            return factory(*args, **kwargs)
+        return self._subscribe(key, factory, args, kwargs)
+
+    def _subscribe(self, key, factory: Callable, args, kwargs) -> Iterator:
+        # 제너레이터 본문 안에서 구독해야 시작하지 않은 채 닫혀도 구독 수가 남지 않음
+        with self._lock:
+            broadcast = self._streams.get(key)
+            leader = broadcast is None
+            if leader:
+                broadcast = self._streams[key] = _Broadcast(factory(*args, **kwargs))
+            broadcast.subscribers += 1
+        self._record(leader)
+
+        index = 0
+        try:
+            while True:
+                with broadcast.cond:
+                    while (
+                        index >= len(broadcast.chunks)
+                        and not broadcast.done
+                        and broadcast.pulling
+                    ):
+                        broadcast.cond.wait()
+                    if index < len(broadcast.chunks):
+                        chunk = broadcast.chunks[index]
+                        index += 1
+                    elif broadcast.done:
+                        if broadcast.error is not None:
+                            raise broadcast.error
+                        return
+                    else:
+                        broadcast.pulling = True
+                        chunk = _PULL
+                if chunk is _PULL:
+                    self._pull(key, broadcast)
+                else:
+                    yield chunk
+        finally:
+            with self._lock:
+                broadcast.subscribers -= 1
+                abandoned = not broadcast.subscribers and not broadcast.done
+                if abandoned and self._streams.get(key) is broadcast:
+                    del self._streams[key]
+            # 마지막 구독자가 중간에 나가면 원본 스트림(LLM 호출)도 중단
+            if abandoned and hasattr(broadcast.source, "close"):
+                broadcast.source.close()
+
+    def _pull(self, key, broadcast: _Broadcast):
+        error = None
+        try:
+            chunk = next(broadcast.source)
+        except StopIteration:
+            chunk = _PULL
+        except BaseException as e:
+            chunk, error = _PULL, e
+
+        if chunk is _PULL:
+            self._forget(self._streams, key, broadcast)
+        with broadcast.cond:
+            if chunk is _PULL:
+                broadcast.done = True
+                broadcast.error = error
+            else:
+                broadcast.chunks.append(chunk)
+            broadcast.pulling = False
+            broadcast.cond.notify_all()
+
+    def astream(
+        self, key: Hashable, factory: Callable, *args, **kwargs
+    ) -> AsyncIterator:
+        """stream의 비동기 버전 (이벤트 루프 안에서 읽음, 구독은 처음 읽을 때 시작)"""
+        if not settings.SINGLEFLIGHT_ENABLED:
+            return factory(*args, **kwargs)
+        return self._asubscribe(key, factory, args, kwargs)
+
+    async def _pump(self, flight_key, broadcast: _AsyncBroadcast, source):
+        try:
+            async for chunk in source:
+                broadcast.chunks.append(chunk)
+                broadcast.notify()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            self._forget(self._astreams, flight_key, broadcast)
+            broadcast.done = True
+            broadcast.notify()
+
+    async def _asubscribe(self, key, factory: Callable, args, kwargs) -> AsyncIterator:
+        flight_key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            broadcast = self._astreams.get(flight_key)
+            leader = broadcast is None
+            if leader:
+                broadcast = self._astreams[flight_key] = _AsyncBroadcast()
+                broadcast.task = asyncio.ensure_future(
+                    self._pump(flight_key, broadcast, factory(*args, **kwargs))
+                )
+            broadcast.subscribers += 1
+        self._record(leader)
+
+        index = 0
+        try:
+            while True:
+                if index < len(broadcast.chunks):
+                    index += 1
+                    yield broadcast.chunks[index - 1]
+                elif broadcast.done:
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+                else:
+                    await broadcast.changed.wait()
+        finally:
+            broadcast.subscribers -= 1
+            # 마지막 구독자가 중간에 나가면 원본 스트림(LLM 호출)도 중단
+            if not broadcast.subscribers and not broadcast.done:
+                self._forget(self._astreams, flight_key, broadcast)
+                broadcast.task.cancel()
+
+
+_flights: dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_flight(name: str) -> SingleFlight:
+    """단계 이름별로 프로세스 전역에서 공유하는 SingleFlight를 반환합니다."""
+    with _flights_lock:
+        flight = _flights.get(name)
+        if flight is None:
+            flight = _flights[name] = SingleFlight(name)
+        return flight
+
+
+def flight_stats() -> dict[str, dict]:
+    """단계별 호출 수와 합쳐진 호출 수"""
+    with _flights_lock:
+        flights = dict(_flights)
+    return {name: flight.as_dict() for name, flight in sorted(flights.items())}
@@ -0,0 +1,177 @@
+"""SQL 프롬프트용 동적 few-shot 예시 선택
+
+질문과 의미가 가까운 예시를 토큰 예산 안에서 최대 k개 고르고, 스키마 설명도
+질문과 선택된 예시가 사용하는 테이블로 줄여 프롬프트 토큰을 절약합니다.
+예시 질문 임베딩은 처음 선택할 때 한 번만 계산하며, 임베딩 캐시에도 저장되므로
+재시작 후에는 API를 호출하지 않습니다.
+"""
+
+import logging
+import threading
+from functools import lru_cache
+from typing import Optional, Sequence
+
+import numpy as np
+
+from config.settings import settings
+from core.metrics import get_metrics
+from utils.embedding_cache import get_embeddings
+from utils.helpers import count_tokens, encoding_ready
+from utils.sql_prompt import (
+    EXAMPLES,
+    NOTICE_EXAMPLES,
+    STATIC_EXAMPLE_COUNT,
+    SQLExample,
+    generate_prompt,
+    generate_prompt_with_number,
+    get_schema_info,
+    render_examples,
+)
+
+# 항상 포함하는 테이블 (공고 기본 정보)
+BASE_TABLES = ("naramarket_bids",)
+
+# 질문에 나오면 해당 테이블 스키마를 포함하는 단서 단어
+TABLE_HINTS = {
+    "bid_result_fails": ("유찰", "실패", "무효", "nobid"),
+    "bid_result_successes": (
+        "낙찰",
+        "업체",
+        "회사",
+        "입찰자",
+        "참여",
+        "순위",
+        "투찰",
+        "입찰가",
+        "대표",
+        "사업자",
+    ),
+}
+
+
+def relevant_tables(question: str, examples: Sequence[SQLExample]) -> list[str]:
+    """질문 단서와 선택된 예시로부터 프롬프트에 넣을 테이블을 정합니다."""
+    tables = set(BASE_TABLES)
+    for example in examples:
+        tables.update(example.tables)
+    lowered = question.lower()
+    for table, hints in TABLE_HINTS.items():
+        if any(hint in lowered for hint in hints):
+            tables.add(table)
+    return sorted(tables)
+
+
+class ExampleStore:
+    """질의 예시와 예시 질문 임베딩 행렬"""
+
+    def __init__(self, examples: Sequence[SQLExample], embeddings=None):
+        self.examples = list(examples)
+        self.embeddings = embeddings or get_embeddings()
+        # 자리표시자로 렌더링한 예시별 토큰 수 (공고번호 길이 차이는 무시)
+        self.costs = [
+            count_tokens(example.render(number))
+            for number, example in enumerate(self.examples, start=1)
+        ]
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        with self._lock:
+            if self._matrix is None:
+                vectors = self.embeddings.embed_documents(
+                    [example.question for example in self.examples]
+                )
+                self._matrix = self._normalize(np.asarray(vectors, dtype=np.float32))
+            return self._matrix
+
+    def select(self, question: str, k: int, token_budget: int) -> list[SQLExample]:
+        """유사도 순으로 예시를 고르되 토큰 예산을 넘는 예시는 건너뜁니다."""
+        query = self._normalize(
+            np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        )
+        scores = self.matrix @ query
+
+        selected, used = [], 0
+        for i in np.argsort(-scores):
+            if len(selected) >= k:
+                break
+            if used + self.costs[i] > token_budget:
+                continue
+            selected.append(self.examples[i])
+            used += self.costs[i]
+        return selected
+
+
+_stores: dict[bool, ExampleStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_example_store(with_number: bool = False) -> ExampleStore:
+    """전체 대상(False) 또는 선택된 공고 대상(True) 예시 저장소를 반환합니다."""
+    with _stores_lock:
+        if with_number not in _stores:
+            _stores[with_number] = ExampleStore(
+                NOTICE_EXAMPLES if with_number else EXAMPLES
+            )
+        return _stores[with_number]
+
+
+@lru_cache(maxsize=4)
+def static_prompt_tokens(with_number: bool, exact: bool = True) -> int:
+    """전체 스키마와 고정 예시를 넣은 프롬프트의 토큰 수
+
+    exact는 캐시 키로만 쓰며, tiktoken 로드 전에 센 근사치가 로드 후에도
+    캐시에 남지 않도록 합니다.
+    """
+    template = generate_prompt_with_number if with_number else generate_prompt
+    return count_tokens(template(""))
+
+
+def static_inputs(bid_notice_no: Optional[str] = None) -> dict[str, str]:
+    """전체 스키마와 고정 예시로 만든 프롬프트 입력값
+
+    기존 고정 프롬프트와 같도록 공고 대상 예시에는 실제 공고번호 대신
+    {bid_notice_no} 자리표시자를 그대로 둡니다.
+    """
+    examples = NOTICE_EXAMPLES if bid_notice_no else EXAMPLES
+    return {
+        "schema": get_schema_info(),
+        "examples": render_examples(
+            examples[:STATIC_EXAMPLE_COUNT],
+            "{bid_notice_no}" if bid_notice_no else None,
+        ),
+    }
+
+
+def build_prompt_inputs(
+    question: str, bid_notice_no: Optional[str] = None
+) -> dict[str, str]:
+    """SQL 프롬프트의 schema, examples 입력값을 질문에 맞게 만듭니다."""
+    if not settings.SQL_FEWSHOT_ENABLED:
+        return static_inputs(bid_notice_no)
+
+    with_number = bool(bid_notice_no)
+    try:
+        examples = get_example_store(with_number).select(
+            question, settings.SQL_FEWSHOT_K, settings.SQL_FEWSHOT_TOKEN_BUDGET
+        )
+    except Exception as e:
+        logging.warning(f"few-shot 예시 선택 실패, 고정 예시 사용: {e}")
+        return static_inputs(bid_notice_no)
+
+    inputs = {
+        "schema": get_schema_info(relevant_tables(question, examples)),
+        "examples": render_examples(examples, bid_notice_no),
+    }
+    template = generate_prompt_with_number if with_number else generate_prompt
+    saved = static_prompt_tokens(with_number, encoding_ready()) - count_tokens(
+        template("", **inputs)
+    )
+    get_metrics().incr("sql_prompt_tokens_saved", max(saved, 0))
+    return inputs
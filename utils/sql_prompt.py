@@ -1,7 +1,13 @@
-from datetime import date
+import re
+import textwrap
+from dataclasses import dataclass
+from typing import Iterable, Optional
 
+_TABLE_LINE = re.compile(r"Table:\s*(\w+)")
 
-def get_schema_info():
+
+def get_schema_info(tables: Optional[Iterable[str]] = None):
+    """데이터베이스 스키마 설명 (tables를 주면 해당 테이블만 포함)"""
     schema = """
     -- 실패한 입찰 정보
     Table: bid_result_fails
@@ -51,92 +57,455 @@ def get_schema_info():
         - bid_notice_url (text): 입찰공고URL
         - bid_prgs_stat_nm (text): 입찰진행상태명(null, 유찰, 자체 입찰 공고, 개찰 전, 개찰완료, 개찰 미진행, 직찰)
     """
-    return schema
-
-
-def generate_prompt(user_query):
-    schema = get_schema_info()
-    examples = """
-    Example 1: 월별 유찰 건수 분석
-    질문: 2023년에 유찰된 입찰 건수를 월별로 보여주세요
-    <thought_process>
-    1. 필요한 테이블 식별:
-        - bid_result_fails: 유찰 정보 확인
-        - naramarket_bids: 날짜 정보 확인
-    2. 조인 조건:
-        - 두 테이블을 bid_notice_no로 연결
-    3. 데이터 처리:
-        - 2023년 데이터만 필터링
-        - 월별로 그룹화하여 카운트
-        - 월 순서대로 정렬
-    </thought_process>
-    <sql>
-    SELECT
-        EXTRACT(MONTH FROM nb.bid_notice_date) as month,
-        COUNT(*) as fail_count
-    FROM bid_result_fails brf
-    JOIN naramarket_bids nb ON brf.bid_notice_no = nb.bid_notice_no
-    WHERE EXTRACT(YEAR FROM nb.bid_notice_date) = 2023
-    GROUP BY EXTRACT(MONTH FROM nb.bid_notice_date)
-    ORDER BY month;
-    </sql>
-
-    Example 2: 입찰 성공 업체 분석
-    질문: 입찰 성공 건수가 가장 많은 상위 5개 업체의 평균 입찰가격과 총 낙찰 건수를 보여주세요
-    <thought_process>
-    1. 필요한 데이터 확인:
-        - bid_result_successes 테이블에서 업체 정보와 입찰가격 추출
-        - 낙찰은 openg_rank = 1인 경우를 의미
-    2. 계산 항목:
-        - 업체별 낙찰 건수(openg_rank = 1인 경우의 카운트)
-        - 업체별 평균 입찰가격
-    3. 데이터 정렬:
-        - 낙찰 건수 기준 내림차순
-        - 상위 5개 업체만 선택
-    </thought_process>
-    <sql>
-    SELECT
-        prcbdr_nm as company_name,
-        COUNT(*) as success_count,
-        AVG(bidprc_amt) as avg_bid_amount
-    FROM bid_result_successes
-    WHERE openg_rank = 1
-    GROUP BY prcbdr_nm
-    ORDER BY success_count DESC
-    LIMIT 5;
-    </sql>
-
-    Example 3: 고액 예산 기관 분석
-    질문: 공고기관별 평균 예산금액이 10억 이상인 기관의 총 공고 건수와 평균 예산을 보여주세요
-    <thought_process>
-    1. 데이터 소스:
-        - naramarket_bids 테이블에서 기관정보와 예산정보 사용
-    2. 집계 방법:
-        - 기관별로 그룹화
-        - 평균 예산 계산
-        - 공고 건수 카운트
-    3. 필터링:
-        - 평균 예산 10억 이상 필터 (HAVING 절 사용)
-    4. 정렬:
-        - 평균 예산 기준 내림차순
-    </thought_process>
-    <sql>
-    SELECT
-        ntce_instt_nm as institution_name,
-        COUNT(*) as total_notices,
-        AVG(asign_bdgt_amt) as avg_budget
-    FROM naramarket_bids
-    GROUP BY ntce_instt_nm
-    HAVING AVG(asign_bdgt_amt) >= 1000000000
-    ORDER BY avg_budget DESC;
-    </sql>
+    if tables is None:
+        return schema
+
+    wanted = set(tables)
+    blocks = [
+        block
+        for block in schema.strip("\n").split("\n\n")
+        if _TABLE_LINE.search(block).group(1) in wanted
+    ]
+    return "\n" + "\n\n".join(blocks) + "\n    "
+
+
+def schema_tables() -> tuple[str, ...]:
+    """스키마 설명에 있는 테이블 이름"""
+    return tuple(_TABLE_LINE.findall(get_schema_info()))
+
+
+@dataclass(frozen=True)
+class SQLExample:
+    """SQL 생성 프롬프트에 넣는 질의 예시 (질문, 사고 과정, SQL, 사용 테이블)"""
+
+    title: str
+    question: str
+    thought_process: str
+    sql: str
+    tables: tuple[str, ...]
+
+    def render(self, number: int, bid_notice_no: Optional[str] = None) -> str:
+        sql = textwrap.dedent(self.sql).strip()
+        if bid_notice_no is not None:
+            sql = sql.replace("{bid_notice_no}", bid_notice_no)
+        text = (
+            f"Example {number}: {self.title}\n"
+            f"질문: {self.question}\n"
+            "<thought_process>\n"
+            f"{textwrap.dedent(self.thought_process).strip()}\n"
+            "</thought_process>\n"
+            "<sql>\n"
+            f"{sql}\n"
+            "</sql>"
+        )
+        return textwrap.indent(text, "    ")
+
+
+def render_examples(
+    examples: Iterable[SQLExample], bid_notice_no: Optional[str] = None
+) -> str:
+    rendered = [
+        example.render(number, bid_notice_no)
+        for number, example in enumerate(examples, start=1)
+    ]
+    return "\n" + "\n\n".join(rendered) + "\n    "
+
+
+# 동적 예시 선택을 쓰지 않을 때 프롬프트에 고정으로 넣는 앞쪽 예시 수
+STATIC_EXAMPLE_COUNT = 3
+
+# 전체 데이터 대상 질의 예시
+EXAMPLES = [
+    SQLExample(
+        title="월별 유찰 건수 분석",
+        question="2023년에 유찰된 입찰 건수를 월별로 보여주세요",
+        thought_process="""
+            1. 필요한 테이블 식별:
+                - bid_result_fails: 유찰 정보 확인
+                - naramarket_bids: 날짜 정보 확인
+            2. 조인 조건:
+                - 두 테이블을 bid_notice_no로 연결
+            3. 데이터 처리:
+                - 2023년 데이터만 필터링
+                - 월별로 그룹화하여 카운트
+                - 월 순서대로 정렬
+        """,
+        sql="""
+            SELECT
+                EXTRACT(MONTH FROM nb.bid_notice_date) as month,
+                COUNT(*) as fail_count
+            FROM bid_result_fails brf
+            JOIN naramarket_bids nb ON brf.bid_notice_no = nb.bid_notice_no
+            WHERE EXTRACT(YEAR FROM nb.bid_notice_date) = 2023
+            GROUP BY EXTRACT(MONTH FROM nb.bid_notice_date)
+            ORDER BY month;
+        """,
+        tables=("bid_result_fails", "naramarket_bids"),
+    ),
+    SQLExample(
+        title="입찰 성공 업체 분석",
+        question="입찰 성공 건수가 가장 많은 상위 5개 업체의 평균 입찰가격과 총 낙찰 건수를 보여주세요",
+        thought_process="""
+            1. 필요한 데이터 확인:
+                - bid_result_successes 테이블에서 업체 정보와 입찰가격 추출
+                - 낙찰은 openg_rank = 1인 경우를 의미
+            2. 계산 항목:
+                - 업체별 낙찰 건수(openg_rank = 1인 경우의 카운트)
+                - 업체별 평균 입찰가격
+            3. 데이터 정렬:
+                - 낙찰 건수 기준 내림차순
+                - 상위 5개 업체만 선택
+        """,
+        sql="""
+            SELECT
+                prcbdr_nm as company_name,
+                COUNT(*) as success_count,
+                AVG(bidprc_amt) as avg_bid_amount
+            FROM bid_result_successes
+            WHERE openg_rank = 1
+            GROUP BY prcbdr_nm
+            ORDER BY success_count DESC
+            LIMIT 5;
+        """,
+        tables=("bid_result_successes",),
+    ),
+    SQLExample(
+        title="고액 예산 기관 분석",
+        question="공고기관별 평균 예산금액이 10억 이상인 기관의 총 공고 건수와 평균 예산을 보여주세요",
+        thought_process="""
+            1. 데이터 소스:
+                - naramarket_bids 테이블에서 기관정보와 예산정보 사용
+            2. 집계 방법:
+                - 기관별로 그룹화
+                - 평균 예산 계산
+                - 공고 건수 카운트
+            3. 필터링:
+                - 평균 예산 10억 이상 필터 (HAVING 절 사용)
+            4. 정렬:
+                - 평균 예산 기준 내림차순
+        """,
+        sql="""
+            SELECT
+                ntce_instt_nm as institution_name,
+                COUNT(*) as total_notices,
+                AVG(asign_bdgt_amt) as avg_budget
+            FROM naramarket_bids
+            GROUP BY ntce_instt_nm
+            HAVING AVG(asign_bdgt_amt) >= 1000000000
+            ORDER BY avg_budget DESC;
+        """,
+        tables=("naramarket_bids",),
+    ),
+    SQLExample(
+        title="유찰 사유 분포",
+        question="유찰 사유별 유찰 건수를 많은 순서대로 보여주세요",
+        thought_process="""
+            1. 데이터 소스:
+                - bid_result_fails 테이블의 유찰 사유(nobid_rsn)
+            2. 집계 방법:
+                - 유찰 사유별로 그룹화하여 카운트
+                - 사유가 비어 있는 행은 제외
+            3. 정렬:
+                - 유찰 건수 기준 내림차순
+        """,
+        sql="""
+            SELECT
+                nobid_rsn as fail_reason,
+                COUNT(*) as fail_count
+            FROM bid_result_fails
+            WHERE nobid_rsn IS NOT NULL
+            GROUP BY nobid_rsn
+            ORDER BY fail_count DESC;
+        """,
+        tables=("bid_result_fails",),
+    ),
+    SQLExample(
+        title="수요기관별 공고 현황",
+        question="올해 공고가 가장 많은 수요기관 10곳과 공고 건수, 총 추정가격을 보여주세요",
+        thought_process="""
+            1. 데이터 소스:
+                - naramarket_bids 테이블의 수요기관명과 추정가격
+            2. 필터링:
+                - 공고 일자가 올해인 공고만 선택
+            3. 집계 방법:
+                - 수요기관별 공고 건수와 추정가격 합계
+            4. 정렬 및 제한:
+                - 공고 건수 기준 내림차순, 상위 10개
+        """,
+        sql="""
+            SELECT
+                dminstt_nm as demand_institution,
+                COUNT(*) as total_notices,
+                SUM(presmpt_price) as total_amount
+            FROM naramarket_bids
+            WHERE EXTRACT(YEAR FROM bid_notice_date) = EXTRACT(YEAR FROM CURRENT_DATE)
+            GROUP BY dminstt_nm
+            ORDER BY total_notices DESC
+            LIMIT 10;
+        """,
+        tables=("naramarket_bids",),
+    ),
+    SQLExample(
+        title="분류별 평균 낙찰률",
+        question="공공조달 대분류별 낙찰 건수와 평균 낙찰률을 보여주세요",
+        thought_process="""
+            1. 필요한 테이블 식별:
+                - naramarket_bids: 공공조달대분류명
+                - bid_result_successes: 낙찰자(openg_rank = 1)의 입찰가격비율
+            2. 조인 조건:
+                - 두 테이블을 bid_notice_no로 연결
+            3. 데이터 처리:
+                - 낙찰자(openg_rank = 1)만 필터링
+                - 대분류별 낙찰 건수와 평균 입찰가격비율 계산
+            4. 정렬:
+                - 낙찰 건수 기준 내림차순
+        """,
+        sql="""
+            SELECT
+                nb.pub_prcrmnt_lrg_clsfc_nm as category,
+                COUNT(*) as success_count,
+                AVG(brs.bidprc_rt) as avg_bid_ratio
+            FROM naramarket_bids nb
+            JOIN bid_result_successes brs ON nb.bid_notice_no = brs.bid_notice_no
+            WHERE brs.openg_rank = 1
+            GROUP BY nb.pub_prcrmnt_lrg_clsfc_nm
+            ORDER BY success_count DESC;
+        """,
+        tables=("naramarket_bids", "bid_result_successes"),
+    ),
+    SQLExample(
+        title="마감 임박 공고",
+        question="앞으로 7일 안에 입찰이 마감되는 공고 목록을 마감일 순으로 보여주세요",
+        thought_process="""
+            1. 데이터 소스:
+                - naramarket_bids 테이블의 공고명, 기관, 입찰마감일시
+            2. 필터링:
+                - 입찰마감일시가 현재부터 7일 이내인 공고
+            3. 정렬:
+                - 입찰마감일시 오름차순
+        """,
+        sql="""
+            SELECT
+                bid_notice_no,
+                bid_notice_nm as notice_name,
+                ntce_instt_nm as institution_name,
+                bid_close_dt as bid_close,
+                presmpt_price as estimated_price
+            FROM naramarket_bids
+            WHERE bid_close_dt BETWEEN NOW() AND NOW() + INTERVAL '7 days'
+            ORDER BY bid_close_dt;
+        """,
+        tables=("naramarket_bids",),
+    ),
+    SQLExample(
+        title="업체 낙찰 이력",
+        question="한국정보기술 주식회사가 낙찰받은 공고명과 낙찰 금액을 최근 순으로 보여주세요",
+        thought_process="""
+            1. 필요한 테이블 식별:
+                - bid_result_successes: 업체명과 낙찰 금액
+                - naramarket_bids: 공고명과 공고 일자
+            2. 조인 조건:
+                - 두 테이블을 bid_notice_no로 연결
+            3. 필터링:
+                - 업체명에 검색어가 포함되고 openg_rank = 1인 경우
+            4. 정렬:
+                - 공고 일자 내림차순
+        """,
+        sql="""
+            SELECT
+                nb.bid_notice_nm as notice_name,
+                nb.bid_notice_date as notice_date,
+                brs.prcbdr_nm as company_name,
+                brs.bidprc_amt as winning_amount
+            FROM bid_result_successes brs
+            JOIN naramarket_bids nb ON brs.bid_notice_no = nb.bid_notice_no
+            WHERE brs.prcbdr_nm LIKE '%한국정보기술%'
+                AND brs.openg_rank = 1
+            ORDER BY nb.bid_notice_date DESC;
+        """,
+        tables=("bid_result_successes", "naramarket_bids"),
+    ),
+]
+
+# 선택된 공고 대상 질의 예시 (SQL의 {bid_notice_no}는 공고번호로 치환)
+NOTICE_EXAMPLES = [
+    SQLExample(
+        title="입찰 참여자 상세 정보",
+        question="모든 입찰 참여자의 순위와 상세 정보를 보여주세요",
+        thought_process="""
+            1. 필요한 테이블 식별:
+                - bid_result_successes: 입찰 결과 정보 (순위, 업체정보, 가격정보)
+            2. 필터링 조건:
+                - bid_notice_no로 특정 공고 선택
+            3. 데이터 처리:
+                - 업체 관련 정보(업체명, 대표자명)
+                - 입찰 관련 정보(순위, 가격, 투찰률)
+                - 순위순으로 정렬
+        """,
+        sql="""
+            SELECT
+                openg_rank as rank,
+                prcbdr_nm as company_name,
+                prcbdr_ceo_nm as ceo_name,
+                bidprc_amt as bid_amount,
+                bidprc_rt as bid_ratio,
+                openg_rslt_div_nm as result_status
+            FROM bid_result_successes
+            WHERE bid_notice_no = '{bid_notice_no}'
+            ORDER BY openg_rank;
+        """,
+        tables=("bid_result_successes",),
+    ),
+    SQLExample(
+        title="공고 개요와 낙찰 정보",
+        question="공고 기본정보와 낙찰 결과를 보여주세요",
+        thought_process="""
+            1. 필요한 테이블과 컬럼:
+                - naramarket_bids: 공고 기본정보(공고명, 기관, 예산)
+                - bid_result_successes: 낙찰자 정보(rank 1)
+            2. 조인 조건:
+                - bid_notice_no로 두 테이블 연결
+            3. 데이터 추출:
+                - 공고 기본정보
+                - 낙찰자 정보(rank = 1인 경우)
+        """,
+        sql="""
+            SELECT
+                nb.bid_notice_nm as notice_name,
+                nb.ntce_instt_nm as institution_name,
+                nb.dminstt_nm as demand_institution,
+                nb.asign_bdgt_amt as budget_amount,
+                brs.prcbdr_nm as winner_name,
+                brs.bidprc_amt as winning_amount,
+                brs.bidprc_rt as winning_ratio
+            FROM naramarket_bids nb
+            LEFT JOIN bid_result_successes brs
+                ON nb.bid_notice_no = brs.bid_notice_no
+                AND brs.openg_rank = 1
+            WHERE nb.bid_notice_no = '{bid_notice_no}';
+        """,
+        tables=("naramarket_bids", "bid_result_successes"),
+    ),
+    SQLExample(
+        title="입찰 진행 현황",
+        question="진행상태와 세부 일정을 보여주세요",
+        thought_process="""
+            1. 데이터 소스:
+                - naramarket_bids 테이블의 진행 관련 정보
+            2. 필요한 정보:
+                - 진행상태(bid_prgs_stat_nm)
+                - 입찰/계약 방식
+                - 주요 일정들
+            3. 필터링:
+                - 특정 bid_notice_no만 선택
+        """,
+        sql="""
+            SELECT
+                bid_prgs_stat_nm as status,
+                bid_method_nm as bid_method,
+                cntrct_cncls_method_nm as contract_method,
+                bid_notice_date as notice_date,
+                bid_begin_dt as bid_begin,
+                bid_close_dt as bid_close,
+                openg_dt as open_date,
+                ntce_instt_ofcl_nm as manager_name,
+                ntce_instt_ofcl_tel_no as manager_contact
+            FROM naramarket_bids
+            WHERE bid_notice_no = '{bid_notice_no}';
+        """,
+        tables=("naramarket_bids",),
+    ),
+    SQLExample(
+        title="유찰 사유 확인",
+        question="이 공고가 유찰된 사유를 알려주세요",
+        thought_process="""
+            1. 필요한 테이블 식별:
+                - bid_result_fails: 개찰 결과와 유찰 사유
+                - naramarket_bids: 공고명
+            2. 조인 조건:
+                - bid_notice_no로 두 테이블 연결
+            3. 필터링:
+                - 특정 bid_notice_no만 선택
+        """,
+        sql="""
+            SELECT
+                nb.bid_notice_nm as notice_name,
+                brf.openg_rslt_div_nm as result_status,
+                brf.nobid_rsn as fail_reason
+            FROM bid_result_fails brf
+            JOIN naramarket_bids nb ON brf.bid_notice_no = nb.bid_notice_no
+            WHERE brf.bid_notice_no = '{bid_notice_no}';
+        """,
+        tables=("bid_result_fails", "naramarket_bids"),
+    ),
+    SQLExample(
+        title="투찰 통계",
+        question="참여 업체 수와 평균, 최저, 최고 투찰률을 보여주세요",
+        thought_process="""
+            1. 데이터 소스:
+                - bid_result_successes 테이블의 입찰가격비율
+            2. 집계 방법:
+                - 참여 업체 수(COUNT)
+                - 투찰률의 평균, 최솟값, 최댓값
+            3. 필터링:
+                - 특정 bid_notice_no만 선택
+        """,
+        sql="""
+            SELECT
+                COUNT(*) as bidder_count,
+                AVG(bidprc_rt) as avg_bid_ratio,
+                MIN(bidprc_rt) as min_bid_ratio,
+                MAX(bidprc_rt) as max_bid_ratio
+            FROM bid_result_successes
+            WHERE bid_notice_no = '{bid_notice_no}';
+        """,
+        tables=("bid_result_successes",),
+    ),
+    SQLExample(
+        title="예산 대비 낙찰가",
+        question="배정예산 대비 낙찰 금액 비율을 보여주세요",
+        thought_process="""
+            1. 필요한 테이블 식별:
+                - naramarket_bids: 배정예산금액
+                - bid_result_successes: 낙찰자(openg_rank = 1)의 입찰가격
+            2. 조인 조건:
+                - bid_notice_no로 두 테이블 연결, 낙찰자만 선택
+            3. 계산 항목:
+                - 낙찰 금액 / 배정예산 * 100 (예산이 0이면 NULL)
+        """,
+        sql="""
+            SELECT
+                nb.asign_bdgt_amt as budget_amount,
+                brs.prcbdr_nm as winner_name,
+                brs.bidprc_amt as winning_amount,
+                ROUND(brs.bidprc_amt / NULLIF(nb.asign_bdgt_amt, 0) * 100, 2) as budget_ratio
+            FROM naramarket_bids nb
+            JOIN bid_result_successes brs
+                ON nb.bid_notice_no = brs.bid_notice_no
+                AND brs.openg_rank = 1
+            WHERE nb.bid_notice_no = '{bid_notice_no}';
+        """,
+        tables=("naramarket_bids", "bid_result_successes"),
+    ),
+]
+
+
+def generate_prompt(user_query, schema=None, examples=None):
+    """전체 데이터 대상 SQL 생성 프롬프트
+
+    schema와 examples를 생략하면 전체 스키마와 기본 예시를 넣습니다. 오늘 날짜는
+    {today} 변수로 남겨 두고 체인을 실행할 때 채웁니다.
     """
+    if schema is None:
+        schema = get_schema_info()
+    if examples is None:
+        examples = render_examples(EXAMPLES[:STATIC_EXAMPLE_COUNT])
 
     return f"""당신은 PostgreSQL 전문가 AI 어시스턴트입니다.
 주어진 데이터베이스 스키마를 기반으로 자연어 질의를 SQL로 변환합니다.
 {{table_info}}
 
-오늘 날짜: {date.today()}
+오늘 날짜: {{today}}
 
 데이터베이스 스키마:
 {schema}
@@ -167,95 +536,24 @@ def generate_prompt(user_query):
 6. 결과의 가독성을 위해 적절한 컬럼명을 지정합니다"""
 
 
-def generate_prompt_with_number(user_query):
-    schema = get_schema_info()
-    examples = """
-    Example 1: 입찰 참여자 상세 정보
-    질문: 모든 입찰 참여자의 순위와 상세 정보를 보여주세요
-    <thought_process>
-    1. 필요한 테이블 식별:
-        - bid_result_successes: 입찰 결과 정보 (순위, 업체정보, 가격정보)
-    2. 필터링 조건:
-        - bid_notice_no로 특정 공고 선택
-    3. 데이터 처리:
-        - 업체 관련 정보(업체명, 대표자명)
-        - 입찰 관련 정보(순위, 가격, 투찰률)
-        - 순위순으로 정렬
-    </thought_process>
-    <sql>
-    SELECT
-        openg_rank as rank,
-        prcbdr_nm as company_name,
-        prcbdr_ceo_nm as ceo_name,
-        bidprc_amt as bid_amount,
-        bidprc_rt as bid_ratio,
-        openg_rslt_div_nm as result_status
-    FROM bid_result_successes
-    WHERE bid_notice_no = '{{bid_notice_no}}'
-    ORDER BY openg_rank;
-    </sql>
-
-    Example 2: 공고 개요와 낙찰 정보
-    질문: 공고 기본정보와 낙찰 결과를 보여주세요
-    <thought_process>
-    1. 필요한 테이블과 컬럼:
-        - naramarket_bids: 공고 기본정보(공고명, 기관, 예산)
-        - bid_result_successes: 낙찰자 정보(rank 1)
-    2. 조인 조건:
-        - bid_notice_no로 두 테이블 연결
-    3. 데이터 추출:
-        - 공고 기본정보
-        - 낙찰자 정보(rank = 1인 경우)
-    </thought_process>
-    <sql>
-    SELECT
-        nb.bid_notice_nm as notice_name,
-        nb.ntce_instt_nm as institution_name,
-        nb.dminstt_nm as demand_institution,
-        nb.asign_bdgt_amt as budget_amount,
-        brs.prcbdr_nm as winner_name,
-        brs.bidprc_amt as winning_amount,
-        brs.bidprc_rt as winning_ratio
-    FROM naramarket_bids nb
-    LEFT JOIN bid_result_successes brs
-        ON nb.bid_notice_no = brs.bid_notice_no
-        AND brs.openg_rank = 1
-    WHERE nb.bid_notice_no = '{{bid_notice_no}}';
-    </sql>
-
-    Example 3: 입찰 진행 현황
-    질문: 진행상태와 세부 일정을 보여주세요
-    <thought_process>
-    1. 데이터 소스:
-        - naramarket_bids 테이블의 진행 관련 정보
-    2. 필요한 정보:
-        - 진행상태(bid_prgs_stat_nm)
-        - 입찰/계약 방식
-        - 주요 일정들
-    3. 필터링:
-        - 특정 bid_notice_no만 선택
-    </thought_process>
-    <sql>
-    SELECT
-        bid_prgs_stat_nm as status,
-        bid_method_nm as bid_method,
-        cntrct_cncls_method_nm as contract_method,
-        bid_notice_date as notice_date,
-        bid_begin_dt as bid_begin,
-        bid_close_dt as bid_close,
-        openg_dt as open_date,
-        ntce_instt_ofcl_nm as manager_name,
-        ntce_instt_ofcl_tel_no as manager_contact
-    FROM naramarket_bids
-    WHERE bid_notice_no = '{{bid_notice_no}}';
-    </sql>
+def generate_prompt_with_number(user_query, schema=None, examples=None):
+    """선택된 공고 대상 SQL 생성 프롬프트
+
+    examples를 생략하면 기본 예시를 {bid_notice_no} 자리표시자와 함께 넣습니다.
+    오늘 날짜는 {today} 변수로 남겨 두고 체인을 실행할 때 채웁니다.
     """
+    if schema is None:
+        schema = get_schema_info()
+    if examples is None:
+        examples = render_examples(
+            NOTICE_EXAMPLES[:STATIC_EXAMPLE_COUNT], "{{bid_notice_no}}"
+        )
 
     return f"""당신은 PostgreSQL 전문가 AI 어시스턴트입니다.
 선택된 입찰공고({{bid_notice_no}})에 대한 상세 분석을 위해 자연어 질의를 SQL로 변환합니다.
 {{table_info}}
 
-오늘 날짜: {date.today()}
+오늘 날짜: {{today}}
 
 데이터베이스 스키마:
 {schema}